@@ -29,6 +29,9 @@ import psycopg2
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Days of signals each performance evaluation covers (model_performance.evaluation_period_days)
+SIGNAL_LOOKBACK_DAYS = 30
+
 # Default arguments for the DAG
 default_args = {
     'owner': 'quant-team',
@@ -199,6 +202,7 @@ def calculate_model_performance(model_id: str, **context):
         performance_data = {
             'model_id': model_id,
             'evaluation_date': datetime.now().date(),
+            'evaluation_period_days': SIGNAL_LOOKBACK_DAYS,
             'metrics': metrics,
             'detailed_signals': df[['signal_id', 'ticker', 'actual_return', 'confidence_score']].to_dict('records')
         }
@@ -206,17 +210,16 @@ def calculate_model_performance(model_id: str, **context):
         # Save to database
         insert_query = """
         INSERT INTO model_performance (
-            model_id, run_date, evaluation_date, total_return,
+            model_id, run_date, evaluation_date, evaluation_period_days, total_return,
             avg_return, win_rate, volatility, sharpe_ratio,
             max_drawdown, profit_factor, prediction_accuracy
         ) VALUES (
-            :model_id, :run_date, :evaluation_date, :total_return,
+            :model_id, :run_date, :evaluation_date, :evaluation_period_days, :total_return,
             :avg_return, :win_rate, :volatility, :sharpe_ratio,
             :max_drawdown, :profit_factor, :prediction_accuracy
         )
-        ON CONFLICT (model_id, run_date) 
+        ON CONFLICT (model_id, run_date, evaluation_date, evaluation_period_days) 
         DO UPDATE SET
-            evaluation_date = EXCLUDED.evaluation_date,
             total_return = EXCLUDED.total_return,
             avg_return = EXCLUDED.avg_return,
             win_rate = EXCLUDED.win_rate,
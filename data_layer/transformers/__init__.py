@@ -8,13 +8,21 @@ Transformers convert raw data into analysis-ready datasets for trading models.
 try:
     from .base_transformer import BaseTransformer, TransformationPipeline
     from .technical import TechnicalIndicators, FundamentalRatios, SentimentScores
+    from .incremental import IndicatorState, IncrementalIndicators
+    from .feature_store import FeatureStore
+    from .validation import ValidationReport, validate_frame
     
     __all__ = [
         'BaseTransformer',
         'TransformationPipeline', 
         'TechnicalIndicators',
         'FundamentalRatios',
-        'SentimentScores'
+        'SentimentScores',
+        'IndicatorState',
+        'IncrementalIndicators',
+        'FeatureStore',
+        'ValidationReport',
+        'validate_frame'
     ]
 except ImportError:
     # Handle import errors gracefully
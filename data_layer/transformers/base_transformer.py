@@ -7,12 +7,62 @@ All transformers must inherit from this base class to ensure consistent interfac
 
 from abc import ABC, abstractmethod
 import pandas as pd
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Iterable, Iterator, Optional, List
 import logging
 
+from infrastructure.utils.compact import as_dates
+from .parallel import transform_by_symbol
+from .validation import MAX_MISSING_RATIO, ValidationReport, validate_frame
+
 logger = logging.getLogger(__name__)
 
 
+def stream_transform(transform: Callable[[pd.DataFrame], pd.DataFrame],
+                     chunks: Iterable[pd.DataFrame],
+                     lookback: int) -> Iterator[pd.DataFrame]:
+    """
+    Apply a transform chunk by chunk, carrying a look-back tail between chunks.
+    
+    Chunks must be symbol-contiguous (all rows of a symbol are adjacent in
+    the stream, though they may span several chunks) and sorted by date
+    within each symbol. The last `lookback` rows of the last symbol of a
+    chunk are prepended to the next chunk when that symbol continues there,
+    and the outputs for those carried rows are dropped again, so only one
+    chunk plus the tail is held in memory.
+    
+    Args:
+        transform: Function from an input frame to an output frame with
+            symbol and date columns
+        chunks: Iterator of input chunks
+        lookback: Bars of history the transform needs before a bar
+        
+    Yields:
+        Transformed chunks
+    """
+    tail: Optional[pd.DataFrame] = None
+    
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        
+        carried = tail is not None and chunk['symbol'].iloc[0] == tail['symbol'].iloc[-1]
+        if carried:
+            carried_symbol, carried_end = tail['symbol'].iloc[-1], as_dates(tail['date'].iloc[-1:])[0]
+            chunk = pd.concat([tail, chunk], ignore_index=True)
+        
+        if lookback > 0:
+            tail = chunk.iloc[-lookback:]
+            tail = tail[tail['symbol'] == chunk['symbol'].iloc[-1]].copy()
+        
+        result = transform(chunk)
+        if carried and not result.empty:
+            # Compact outputs hold dates as day numbers
+            in_tail = (result['symbol'] == carried_symbol) & (as_dates(result['date']) <= carried_end)
+            result = result[~in_tail].reset_index(drop=True)
+        
+        yield result
+
+
 class BaseTransformer(ABC):
     """
     Abstract base class for all data transformers.
@@ -21,6 +71,10 @@ class BaseTransformer(ABC):
     This could be technical indicators, fundamental ratios, sentiment scores, etc.
     """
     
+    # Output validation settings (see validate_output)
+    validation_sample_rows: Optional[int] = None
+    max_missing_ratio: float = MAX_MISSING_RATIO
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize the transformer with optional configuration.
@@ -30,6 +84,7 @@ class BaseTransformer(ABC):
         """
         self.config = config or {}
         self.name = self.__class__.__name__
+        self.last_validation: Optional[ValidationReport] = None
         
     @abstractmethod
     def transform(self, data: pd.DataFrame) -> pd.DataFrame:
@@ -66,6 +121,49 @@ class BaseTransformer(ABC):
         """
         return []
     
+    def select_features(self, features: Optional[Iterable[str]]) -> List[str]:
+        """
+        Restrict the output to a set of requested features.
+        
+        Transformers that can compute a subset of their outputs override this;
+        by default everything is computed.
+        
+        Args:
+            features: Requested feature names (None for all)
+            
+        Returns:
+            Names of the features this transformer will compute
+        """
+        return list(self.get_output_schema())
+    
+    def get_lookback(self) -> int:
+        """
+        Return the bars of history needed before a bar to transform it.
+        
+        Used by transform_stream() to size the tail carried between chunks;
+        row-wise transformers need none.
+        
+        Returns:
+            Number of bars
+        """
+        return 0
+    
+    def transform_stream(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Transform an iterator of symbol-contiguous chunks.
+        
+        Peak memory is bounded by one chunk plus get_lookback() bars. Chunks
+        must keep each symbol's rows adjacent and sorted by date, e.g. read
+        with ORDER BY symbol, date.
+        
+        Args:
+            chunks: Iterator of input chunks
+            
+        Yields:
+            Transformed chunks
+        """
+        return stream_transform(self.transform_safe, chunks, self.get_lookback())
+    
     def validate_input(self, data: pd.DataFrame) -> bool:
         """
         Validate that input data meets requirements.
@@ -97,32 +195,35 @@ class BaseTransformer(ABC):
         """
         Validate that output data meets quality standards.
         
+        Null ratios, infinity counts and dtype checks against the output
+        schema are computed in one vectorized pass over the frame's numeric
+        blocks; set validation_sample_rows to check a random sample of rows
+        of larger frames. The report is kept in last_validation.
+        
         Args:
             data: Output DataFrame to validate
             
         Returns:
             True if data passes quality checks
         """
-        if data.empty:
-            logger.warning(f"{self.name}: Output data is empty")
-            return False
+        report = validate_frame(data, self.get_output_schema(), self.validation_sample_rows, self.max_missing_ratio)
+        self.last_validation = report
         
-        # Check for excessive missing values
-        for col in data.columns:
-            if data[col].dtype in ['float64', 'int64']:
-                missing_pct = data[col].isna().mean()
-                if missing_pct > 0.5:  # More than 50% missing
-                    logger.warning(f"{self.name}: Column '{col}' has {missing_pct:.1%} missing values")
+        for message in report.warnings():
+            logger.warning(f"{self.name}: {message}")
         
-        logger.debug(f"{self.name}: Output validation passed")
-        return True
+        if report.is_valid:
+            logger.debug(f"{self.name}: Output validation passed")
+        return report.is_valid
     
-    def transform_safe(self, data: pd.DataFrame) -> pd.DataFrame:
+    def transform_safe(self, data: pd.DataFrame, validate: bool = True) -> pd.DataFrame:
         """
         Transform data with validation and error handling.
         
         Args:
             data: Input DataFrame
+            validate: Validate the output (skipped e.g. between internal
+                pipeline stages)
             
         Returns:
             Transformed DataFrame
@@ -136,7 +237,8 @@ class BaseTransformer(ABC):
             result = self.transform(data)
             
             # Validate output
-            self.validate_output(result)
+            if validate:
+                self.validate_output(result)
             
             logger.info(f"{self.name}: Transformation complete, output has {len(result)} rows")
             return result
@@ -165,18 +267,42 @@ class TransformationPipeline:
     A pipeline that chains multiple transformers together.
     """
     
-    def __init__(self, transformers: List[BaseTransformer]):
+    def __init__(self,
+                 transformers: List[BaseTransformer],
+                 features: Optional[Iterable[str]] = None,
+                 max_workers: Optional[int] = 1,
+                 validate_intermediate: bool = True):
         """
         Initialize pipeline with list of transformers.
         
         Args:
             transformers: List of transformer instances to chain
+            features: Requested features (e.g. the union of the strategies'
+                get_required_features()); transformers that support it
+                compute only these and their dependencies
+            max_workers: Processes to shard the input over by symbol (1 runs
+                in-process, None uses every CPU). Only for transformers that
+                work per symbol.
+            validate_intermediate: Validate the output of every transformer;
+                if False only the final output is validated
         """
         self.transformers = transformers
+        self.features = list(features) if features is not None else None
+        self.max_workers = max_workers
+        self.validate_intermediate = validate_intermediate
+        
+        if self.features is not None:
+            provided = set()
+            for transformer in self.transformers:
+                provided.update(transformer.select_features(self.features))
+            missing = [name for name in self.features if name not in provided]
+            if missing:
+                logger.warning(f"Pipeline: No transformer provides requested features {missing}")
         
     def transform(self, data: pd.DataFrame) -> pd.DataFrame:
         """
-        Apply all transformers in sequence.
+        Apply all transformers in sequence, on symbol shards in parallel
+        unless max_workers is 1.
         
         Args:
             data: Input DataFrame
@@ -184,14 +310,38 @@ class TransformationPipeline:
         Returns:
             DataFrame after all transformations
         """
+        if self.max_workers != 1 and 'symbol' in data.columns:
+            return transform_by_symbol(self._transform_serial, data, self.max_workers)
+        
+        return self._transform_serial(data)
+    
+    def _transform_serial(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Apply all transformers in sequence in this process."""
         result = data.copy()
         
-        for transformer in self.transformers:
+        for i, transformer in enumerate(self.transformers):
             logger.info(f"Pipeline: Applying {transformer.name}")
-            result = transformer.transform_safe(result)
+            final = i == len(self.transformers) - 1
+            result = transformer.transform_safe(result, validate=final or self.validate_intermediate)
             
         return result
     
+    def get_lookback(self) -> int:
+        """Return the bars of history needed before a bar, summed over the chained transformers."""
+        return sum(transformer.get_lookback() for transformer in self.transformers)
+    
+    def transform_stream(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Transform an iterator of symbol-contiguous chunks (see BaseTransformer.transform_stream).
+        
+        Args:
+            chunks: Iterator of input chunks
+            
+        Yields:
+            Transformed chunks
+        """
+        return stream_transform(self.transform, chunks, self.get_lookback())
+    
     def get_metadata(self) -> Dict[str, Any]:
         """
         Return metadata about the entire pipeline.
@@ -201,5 +351,6 @@ class TransformationPipeline:
         """
         return {
             'transformers': [t.get_metadata() for t in self.transformers],
-            'total_transformers': len(self.transformers)
+            'total_transformers': len(self.transformers),
+            'features': self.features
         } 
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Smoothing Kernel Benchmarks
+
+Times the kernels module against pandas ewm on random-walk panels (the
+reference comparisons live in tests/test_smoothing_kernels.py). Run as a
+module to print results:
+
+    python -m data_layer.transformers.benchmarks
+"""
+
+import time
+from typing import Dict
+
+import pandas as pd
+import numpy as np
+
+from . import kernels
+
+
+def _random_walks(n_bars: int, n_symbols: int, missing: float = 0.01, seed: int = 0) -> np.ndarray:
+    """Price paths with ragged starts and scattered missing bars."""
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, n_symbols)), axis=0))
+    prices[rng.random(prices.shape) < missing] = np.nan
+    starts = rng.integers(0, n_bars // 2, n_symbols)
+    prices[np.arange(n_bars)[:, None] < starts] = np.nan
+    return prices
+
+
+def _seconds(fn, repeat: int = 3) -> float:
+    """Best of `repeat` wall-clock timings."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_smoothing(n_bars: int = 2520, n_symbols: int = 1000, span: int = 20) -> Dict[str, float]:
+    """
+    Time the EMA and Wilder kernels against pandas ewm on a (bar x symbol) panel.
+
+    Args:
+        n_bars: Bars per series
+        n_symbols: Number of series
+        span: EMA span (Wilder smoothing uses the equivalent period)
+
+    Returns:
+        Dictionary of seconds per call
+    """
+    prices = np.asfortranarray(_random_walks(n_bars, n_symbols, missing=0.0))
+    frame = pd.DataFrame(prices)
+    period = (span + 1) // 2
+
+    return {
+        'n_bars': n_bars,
+        'n_symbols': n_symbols,
+        'pandas_ewm_seconds': _seconds(lambda: frame.ewm(span=span).mean()),
+        'kernel_ema_seconds': _seconds(lambda: kernels.ema(prices, span)),
+        'pandas_wilder_seconds': _seconds(lambda: frame.ewm(alpha=1 / period, adjust=False).mean()),
+        'kernel_wilder_seconds': _seconds(lambda: kernels.wilder(prices, period)),
+        'kernel_kama_seconds': _seconds(lambda: kernels.kama(prices, 10)),
+        'numba': kernels.HAS_NUMBA
+    }
+
+
+if __name__ == '__main__':
+    for n_bars, n_symbols in [(2520, 1000), (100_000, 50)]:
+        results = benchmark_smoothing(n_bars, n_symbols)
+        print(f"Smoothing at {n_bars} bars x {n_symbols} symbols (numba: {results['numba']})")
+        print(f"pandas ewm(span):        {results['pandas_ewm_seconds']:8.3f}s")
+        print(f"kernels.ema:             {results['kernel_ema_seconds']:8.3f}s")
+        print(f"pandas ewm(alpha=1/n):   {results['pandas_wilder_seconds']:8.3f}s")
+        print(f"kernels.wilder:          {results['kernel_wilder_seconds']:8.3f}s")
+        print(f"kernels.kama:            {results['kernel_kama_seconds']:8.3f}s\n")
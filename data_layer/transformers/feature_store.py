@@ -0,0 +1,257 @@
+"""
+Feature Store
+
+On-disk cache of transformer and pipeline outputs as Parquet files
+partitioned by symbol and year. Each transformer configuration gets its own
+directory, keyed by a hash of its metadata (class, periods, selected
+features), and each partition file is named after a hash of the input bars
+it was computed from. The partition hashes are chained through the years of
+a symbol, because indicators are causal: a change to earlier bars
+invalidates every later partition of that symbol, and nothing else. Only
+symbols with stale partitions are re-transformed, and only those partitions
+are rewritten; a repeated run over unchanged inputs reads everything back
+with memory-mapped columnar reads and does no featurization at all.
+
+Requires pyarrow.
+"""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+
+import pandas as pd
+import numpy as np
+
+from infrastructure.utils.compact import as_dates
+from .base_transformer import BaseTransformer, TransformationPipeline
+
+logger = logging.getLogger(__name__)
+
+Transformer = Union[BaseTransformer, TransformationPipeline]
+
+# Hex digits kept from the hashes in directory and file names
+HASH_LENGTH = 16
+
+
+def _parquet():
+    """Import pyarrow lazily so the transformers work without it."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("FeatureStore requires pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def transformer_key(transformer: Transformer) -> str:
+    """Hash of a transformer's metadata (class, configuration and output schema)."""
+    metadata = json.dumps(transformer.get_metadata(), sort_keys=True, default=str)
+    return hashlib.blake2b(metadata.encode(), digest_size=HASH_LENGTH // 2).hexdigest()
+
+
+class FeatureStore:
+    """
+    Parquet cache of transformer outputs, partitioned by symbol and year.
+
+    Layout:
+        <root>/<transformer key>/metadata.json
+        <root>/<transformer key>/symbol=<symbol>/year=<year>/<input hash>.parquet
+
+    Example:
+        store = FeatureStore('/data/features')
+        features = store.get(TechnicalIndicators(), market_data)  # computes
+        features = store.get(TechnicalIndicators(), market_data)  # reads only
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the cache (created on first write)
+        """
+        self.root = Path(root)
+        self.last_run: Dict[str, int] = {}
+
+    def _directory(self, transformer: Transformer) -> Path:
+        return self.root / transformer_key(transformer)
+
+    def _partition_path(self, directory: Path, symbol: Any, year: int, input_hash: str) -> Path:
+        return directory / f"symbol={symbol}" / f"year={year}" / f"{input_hash}.parquet"
+
+    def partition_hashes(self, market_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Hash the input bars of every (symbol, year) partition.
+
+        Each hash covers the partition's rows and the hash of the symbol's
+        previous year, so it changes whenever any bar up to the end of the
+        partition changes.
+
+        Args:
+            market_data: Input DataFrame with symbol and date columns
+
+        Returns:
+            DataFrame with columns symbol, year, input_hash, in order of
+            first appearance of the symbol and then year
+        """
+        market_data = market_data[market_data['symbol'].notna() & market_data['date'].notna()]
+        symbol_codes, symbols = pd.factorize(market_data['symbol'])
+        dates = as_dates(market_data['date'])
+        years = dates.year.to_numpy()
+
+        row_hashes = pd.util.hash_pandas_object(market_data, index=False).to_numpy()
+        order = np.lexsort((dates.to_numpy(), years, symbol_codes))
+        codes, years, row_hashes = symbol_codes[order], years[order], row_hashes[order]
+
+        boundaries = np.flatnonzero((codes[1:] != codes[:-1]) | (years[1:] != years[:-1])) + 1
+        starts = np.r_[0, boundaries]
+        stops = np.r_[boundaries, len(order)]
+        columns = ','.join(map(str, market_data.columns)).encode()
+
+        hashes = []
+        previous_code, chained = None, b''
+        for start, stop in zip(starts, stops):
+            if codes[start] != previous_code:
+                previous_code, chained = codes[start], columns
+            digest = hashlib.blake2b(chained + row_hashes[start:stop].tobytes(), digest_size=HASH_LENGTH // 2)
+            chained = digest.digest()
+            hashes.append(digest.hexdigest())
+
+        return pd.DataFrame({
+            'symbol': np.asarray(symbols, dtype=object)[codes[starts]],
+            'year': years[starts],
+            'input_hash': hashes
+        })
+
+    def get(self,
+            transformer: Transformer,
+            market_data: pd.DataFrame,
+            columns: Optional[List[str]] = None,
+            start_date: Optional[Union[str, pd.Timestamp]] = None,
+            end_date: Optional[Union[str, pd.Timestamp]] = None) -> pd.DataFrame:
+        """
+        Get the transformer's output for the input, computing stale partitions only.
+
+        Args:
+            transformer: Transformer or pipeline to apply
+            market_data: Full input history (partitions are hashed from it)
+            columns: Output columns to read (default: all)
+            start_date: First output date to return
+            end_date: Last output date to return
+
+        Returns:
+            Transformer output for the input's symbols, grouped by symbol in
+            order of first appearance and sorted by date
+        """
+        table = self.get_table(transformer, market_data, columns, start_date, end_date)
+        return table.to_pandas() if table is not None else pd.DataFrame(columns=columns)
+
+    def get_table(self,
+                  transformer: Transformer,
+                  market_data: pd.DataFrame,
+                  columns: Optional[List[str]] = None,
+                  start_date: Optional[Union[str, pd.Timestamp]] = None,
+                  end_date: Optional[Union[str, pd.Timestamp]] = None):
+        """
+        Like get(), but return the memory-mapped pyarrow Table.
+
+        Returns:
+            pyarrow.Table, or None if there is no output
+        """
+        pa, pq = _parquet()
+        directory = self._directory(transformer)
+        partitions = self.partition_hashes(market_data)
+
+        paths = [self._partition_path(directory, s, y, h)
+                 for s, y, h in zip(partitions['symbol'], partitions['year'], partitions['input_hash'])]
+        stale = np.array([not path.exists() for path in paths], dtype=bool)
+
+        self.last_run = {
+            'partitions': len(paths),
+            'recomputed_partitions': int(stale.sum()),
+            'recomputed_symbols': int(partitions.loc[stale, 'symbol'].nunique())
+        }
+        if stale.any():
+            self._recompute(transformer, market_data, directory, partitions[stale])
+
+        logger.info(f"FeatureStore: {self.last_run['partitions']} partitions, "
+                    f"{self.last_run['recomputed_partitions']} recomputed "
+                    f"({self.last_run['recomputed_symbols']} symbols)")
+
+        keep = np.ones(len(paths), dtype=bool)
+        if start_date is not None:
+            keep &= partitions['year'].to_numpy() >= pd.Timestamp(start_date).year
+        if end_date is not None:
+            keep &= partitions['year'].to_numpy() <= pd.Timestamp(end_date).year
+
+        tables = [pq.read_table(path, columns=columns, memory_map=True)
+                  for path, selected in zip(paths, keep) if selected and path.exists()]
+        if not tables:
+            return None
+
+        table = pa.concat_tables(tables)
+        if start_date is not None or end_date is not None:
+            dates = as_dates(table.column('date').to_pandas()) if 'date' in table.column_names else None
+            if dates is not None:
+                mask = np.ones(len(dates), dtype=bool)
+                if start_date is not None:
+                    mask &= np.asarray(dates >= pd.Timestamp(start_date))
+                if end_date is not None:
+                    mask &= np.asarray(dates <= pd.Timestamp(end_date))
+                table = table.filter(pa.array(mask))
+        return table
+
+    def _recompute(self,
+                   transformer: Transformer,
+                   market_data: pd.DataFrame,
+                   directory: Path,
+                   stale: pd.DataFrame) -> None:
+        """Transform the full history of symbols with stale partitions and write those partitions."""
+        pa, pq = _parquet()
+        symbols = stale['symbol'].unique()
+        subset = market_data[market_data['symbol'].isin(symbols)]
+
+        transform = transformer.transform_safe if isinstance(transformer, BaseTransformer) else transformer.transform
+        output = transform(subset)
+
+        directory.mkdir(parents=True, exist_ok=True)
+        metadata_path = directory / 'metadata.json'
+        if not metadata_path.exists():
+            metadata_path.write_text(json.dumps(transformer.get_metadata(), indent=2, sort_keys=True, default=str))
+
+        if output.empty:
+            return
+
+        # Compact outputs hold day-number dates and categorical symbols
+        output_years = as_dates(output['date']).year.to_numpy()
+        output_symbols = np.asarray(output['symbol'], dtype=object)
+        groups: Dict[Tuple[Any, int], np.ndarray] = {
+            key: rows for key, rows in pd.Series(np.arange(len(output))).groupby(
+                [output_symbols, output_years], sort=False).indices.items()
+        }
+
+        for symbol, year, input_hash in zip(stale['symbol'], stale['year'], stale['input_hash']):
+            rows = groups.get((symbol, year))
+            if rows is None:
+                continue
+
+            path = self._partition_path(directory, symbol, year, input_hash)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for outdated in path.parent.glob('*.parquet'):
+                outdated.unlink()
+
+            partition = output.iloc[rows]
+            # One-entry dictionaries keep the schema of every partition identical
+            partition = partition.assign(**{column: partition[column].cat.remove_unused_categories()
+                                            for column in partition.columns[partition.dtypes == 'category']})
+            table = pa.Table.from_pandas(partition, preserve_index=False)
+            pq.write_table(table, path)
+
+    def clear(self, transformer: Optional[Transformer] = None) -> None:
+        """Delete the cache of one transformer configuration, or everything."""
+        target = self._directory(transformer) if transformer is not None else self.root
+        if target.exists():
+            shutil.rmtree(target)
@@ -0,0 +1,391 @@
+"""
+Incremental Technical Indicators
+
+Stateful versions of the TechnicalIndicators calculations for daily runs.
+Each indicator keeps only what it needs to absorb the next bar: ring buffers
+for rolling windows, the running weights of exponential averages and the
+previous bar for differences. Appending a bar therefore costs the same no
+matter how long the history is, and the state round-trips through plain
+JSON-serializable dicts so a nightly job can load yesterday's state instead
+of reloading history. Fed the same bars, the outputs match
+TechnicalIndicators.transform().
+"""
+
+import math
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional
+import logging
+
+from .technical import DEFAULT_PERIODS, MACD_SIGNAL_SPAN
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of IndicatorState.to_dict() changes
+STATE_VERSION = 1
+
+
+def _is_missing(value: float) -> bool:
+    return value != value
+
+
+def _encode(value: float) -> Optional[float]:
+    """NaN-safe float for JSON."""
+    return None if value is None or _is_missing(value) else float(value)
+
+
+def _decode(value: Optional[float]) -> float:
+    return np.nan if value is None else float(value)
+
+
+class RollingWindow:
+    """
+    Ring buffer over the last `window` values.
+
+    Statistics are NaN until the window is full or while it holds a missing
+    value, like Series.rolling(window) with the default min_periods.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: List[float] = [np.nan] * window
+        self.position = 0
+        self.count = 0
+
+    def update(self, value: float) -> None:
+        """Push a value, dropping the oldest once the window is full."""
+        self.values[self.position] = float(value)
+        self.position = (self.position + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+
+    def is_ready(self) -> bool:
+        return self.count == self.window and not any(_is_missing(v) for v in self.values)
+
+    def mean(self) -> float:
+        if not self.is_ready():
+            return np.nan
+        return math.fsum(self.values) / self.window
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1)."""
+        if not self.is_ready() or self.window < 2:
+            return np.nan
+        mean = math.fsum(self.values) / self.window
+        return math.sqrt(math.fsum((v - mean) ** 2 for v in self.values) / (self.window - 1))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'window': self.window,
+            'values': [_encode(v) for v in self.values],
+            'position': self.position,
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'RollingWindow':
+        window = cls(state['window'])
+        window.values = [_decode(v) for v in state['values']]
+        window.position = state['position']
+        window.count = state['count']
+        return window
+
+
+class ExponentialMean:
+    """
+    Exponentially weighted mean, as Series.ewm(...).mean().
+
+    With adjust=True (the pandas default used by the transformer) the mean
+    is normalized by the sum of the decayed weights; adjust=False gives the
+    recursive form, e.g. alpha=1/n for Wilder smoothing. Missing values
+    decay the weights and leave the mean unchanged.
+    """
+
+    def __init__(self, span: Optional[float] = None, alpha: Optional[float] = None, adjust: bool = True):
+        if (span is None) == (alpha is None):
+            raise ValueError("Specify exactly one of span or alpha")
+        self.span = span
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.adjust = adjust
+        self.weighted = np.nan
+        self.old_weight = 1.0
+
+    def update(self, value: float) -> float:
+        """Absorb a value and return the current mean."""
+        value = float(value)
+        new_weight = 1.0 if self.adjust else self.alpha
+
+        if not _is_missing(self.weighted):
+            self.old_weight *= 1.0 - self.alpha
+            if not _is_missing(value):
+                if self.weighted != value:
+                    self.weighted = (self.old_weight * self.weighted + new_weight * value) / (self.old_weight + new_weight)
+                self.old_weight = self.old_weight + new_weight if self.adjust else 1.0
+        elif not _is_missing(value):
+            self.weighted = value
+
+        return self.weighted
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'span': self.span,
+            'alpha': self.alpha,
+            'adjust': self.adjust,
+            'weighted': _encode(self.weighted),
+            'old_weight': self.old_weight
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'ExponentialMean':
+        if state.get('span') is not None:
+            mean = cls(span=state['span'], adjust=state['adjust'])
+        else:
+            mean = cls(alpha=state['alpha'], adjust=state['adjust'])
+        mean.weighted = _decode(state['weighted'])
+        mean.old_weight = state['old_weight']
+        return mean
+
+
+class IndicatorState:
+    """
+    All TechnicalIndicators outputs for one symbol, updated one bar at a time.
+
+    Example:
+        state = IndicatorState()
+        for bar in bars.itertuples():
+            row = state.update(bar.date, bar.high, bar.low, bar.close, bar.volume)
+        stored = state.to_dict()
+    """
+
+    def __init__(self, periods: Optional[Dict[str, int]] = None):
+        """
+        Initialize an empty state.
+
+        Args:
+            periods: Indicator periods, as for TechnicalIndicators
+        """
+        self.periods = periods if periods is not None else dict(DEFAULT_PERIODS)
+        p = self.periods
+
+        self.sma_short = RollingWindow(p['sma_short'])
+        self.sma_long = RollingWindow(p['sma_long'])
+        self.ema_fast = ExponentialMean(span=p['ema_fast'])
+        self.ema_slow = ExponentialMean(span=p['ema_slow'])
+        self.macd_signal = ExponentialMean(span=MACD_SIGNAL_SPAN)
+        self.rsi_gain = RollingWindow(p['rsi'])
+        self.rsi_loss = RollingWindow(p['rsi'])
+        self.bb = RollingWindow(p['bb'])
+        self.volume = RollingWindow(p['volume_sma'])
+        self.true_range = RollingWindow(p['atr'])
+        self.plus_dm = RollingWindow(p['adx'])
+        self.minus_dm = RollingWindow(p['adx'])
+        self.adx_true_range = RollingWindow(p['adx'])
+        self.dx = RollingWindow(p['adx'])
+
+        self.previous_high = np.nan
+        self.previous_low = np.nan
+        self.previous_close = np.nan
+        self.last_date: Optional[pd.Timestamp] = None
+        self.n_bars = 0
+
+    def update(self, date: Any, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """
+        Absorb one bar.
+
+        Args:
+            date: Bar date (must be after the last bar absorbed)
+            high: Bar high
+            low: Bar low
+            close: Bar close
+            volume: Bar volume
+
+        Returns:
+            Dictionary of indicator values for the bar, keyed like the
+            TechnicalIndicators output columns
+        """
+        high, low, close, volume = (np.float64(x) for x in (high, low, close, volume))
+        result: Dict[str, float] = {}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # === Moving Averages ===
+            self.sma_short.update(close)
+            self.sma_long.update(close)
+            result['sma_20'] = self.sma_short.mean()
+            result['sma_50'] = self.sma_long.mean()
+            result['ema_12'] = self.ema_fast.update(close)
+            result['ema_26'] = self.ema_slow.update(close)
+
+            # === RSI ===
+            delta = close - self.previous_close
+            self.rsi_gain.update(delta if delta > 0 else 0.0)
+            self.rsi_loss.update(-delta if delta < 0 else 0.0)
+            rs = np.float64(self.rsi_gain.mean()) / np.float64(self.rsi_loss.mean())
+            result['rsi_14'] = 100 - (100 / (1 + rs))
+
+            # === MACD ===
+            macd_line = np.float64(result['ema_12']) - result['ema_26']
+            macd_signal = self.macd_signal.update(macd_line)
+            result['macd'] = macd_line
+            result['macd_signal'] = macd_signal
+            result['macd_histogram'] = macd_line - macd_signal
+
+            # === Bollinger Bands ===
+            self.bb.update(close)
+            bb_middle = np.float64(self.bb.mean())
+            bb_std = self.bb.std()
+            result['bb_upper'] = bb_middle + (bb_std * 2)
+            result['bb_middle'] = bb_middle
+            result['bb_lower'] = bb_middle - (bb_std * 2)
+
+            bb_range = result['bb_upper'] - result['bb_lower']
+            result['bb_position'] = (close - result['bb_lower']) / bb_range if bb_range > 0 else 0.5
+            result['bb_width'] = bb_range / bb_middle
+
+            # === Volume Indicators ===
+            self.volume.update(volume)
+            result['volume_sma_20'] = self.volume.mean()
+            result['volume_ratio'] = volume / np.float64(result['volume_sma_20'])
+
+            # === Volatility Indicators ===
+            true_range = np.fmax(np.fmax(high - low, abs(high - self.previous_close)), abs(low - self.previous_close))
+            self.true_range.update(true_range)
+            result['atr_14'] = self.true_range.mean()
+
+            # === Trend Indicators ===
+            up_move = high - self.previous_high
+            down_move = self.previous_low - low
+            self.plus_dm.update(up_move if (up_move > down_move) and (up_move > 0) else 0.0)
+            self.minus_dm.update(down_move if (down_move > up_move) and (down_move > 0) else 0.0)
+            self.adx_true_range.update(true_range)
+
+            tr_smooth = np.float64(self.adx_true_range.mean())
+            plus_di = 100 * (self.plus_dm.mean() / tr_smooth)
+            minus_di = 100 * (self.minus_dm.mean() / tr_smooth)
+            self.dx.update(100 * (abs(plus_di - minus_di) / (plus_di + minus_di)))
+            result['adx_14'] = self.dx.mean()
+
+        self.previous_high, self.previous_low, self.previous_close = high, low, close
+        self.last_date = pd.Timestamp(date)
+        self.n_bars += 1
+
+        return {key: float(value) for key, value in result.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the state to a JSON-compatible dict."""
+        return {
+            'version': STATE_VERSION,
+            'periods': self.periods,
+            'last_date': self.last_date.strftime('%Y-%m-%d') if self.last_date is not None else None,
+            'n_bars': self.n_bars,
+            'previous_bar': [_encode(self.previous_high), _encode(self.previous_low), _encode(self.previous_close)],
+            'windows': {name: getattr(self, name).to_dict() for name in self._windows()},
+            'means': {name: getattr(self, name).to_dict() for name in self._means()}
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'IndicatorState':
+        """Restore a state saved with to_dict()."""
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported indicator state version {state.get('version')}, expected {STATE_VERSION}")
+
+        restored = cls(state['periods'])
+        for name in cls._windows():
+            setattr(restored, name, RollingWindow.from_dict(state['windows'][name]))
+        for name in cls._means():
+            setattr(restored, name, ExponentialMean.from_dict(state['means'][name]))
+
+        restored.previous_high, restored.previous_low, restored.previous_close = (
+            np.float64(_decode(v)) for v in state['previous_bar'])
+        restored.last_date = pd.Timestamp(state['last_date']) if state['last_date'] else None
+        restored.n_bars = state['n_bars']
+        return restored
+
+    @staticmethod
+    def _windows() -> List[str]:
+        return ['sma_short', 'sma_long', 'rsi_gain', 'rsi_loss', 'bb', 'volume',
+                'true_range', 'plus_dm', 'minus_dm', 'adx_true_range', 'dx']
+
+    @staticmethod
+    def _means() -> List[str]:
+        return ['ema_fast', 'ema_slow', 'macd_signal']
+
+
+class IncrementalIndicators:
+    """
+    Per-symbol indicator states for a universe.
+
+    Example:
+        indicators = IncrementalIndicators.from_state(stored_states)
+        new_rows = indicators.update(todays_bars)
+        stored_states = indicators.get_state()
+    """
+
+    def __init__(self, periods: Optional[Dict[str, int]] = None):
+        """
+        Initialize with no symbols.
+
+        Args:
+            periods: Indicator periods for symbols seen for the first time
+        """
+        self.periods = periods if periods is not None else dict(DEFAULT_PERIODS)
+        self.states: Dict[str, IndicatorState] = {}
+
+    @classmethod
+    def from_state(cls, states: Dict[str, Dict[str, Any]],
+                   periods: Optional[Dict[str, int]] = None) -> 'IncrementalIndicators':
+        """
+        Restore from serialized per-symbol states.
+
+        Args:
+            states: Symbol -> IndicatorState.to_dict()
+            periods: Periods for symbols without a state
+        """
+        indicators = cls(periods)
+        for symbol, state in states.items():
+            indicators.states[symbol] = IndicatorState.from_dict(state)
+        return indicators
+
+    def get_state(self) -> Dict[str, Dict[str, Any]]:
+        """Serialize every symbol's state (symbol -> dict)."""
+        return {symbol: state.to_dict() for symbol, state in self.states.items()}
+
+    def update(self, market_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Append new bars.
+
+        Bars dated on or before a symbol's last absorbed bar are skipped, so
+        re-running a day does not double count it.
+
+        Args:
+            market_data: DataFrame with columns [symbol, date, high, low, close, volume]
+
+        Returns:
+            DataFrame of indicator rows for the absorbed bars, with the
+            TechnicalIndicators output columns
+        """
+        rows = []
+        skipped = 0
+        ordered = market_data.sort_values(['symbol', 'date'], kind='stable')
+
+        for symbol, date, high, low, close, volume in zip(
+                ordered['symbol'], ordered['date'], ordered['high'],
+                ordered['low'], ordered['close'], ordered['volume']):
+            state = self.states.get(symbol)
+            if state is None:
+                state = self.states[symbol] = IndicatorState(self.periods)
+            elif state.last_date is not None and pd.Timestamp(date) <= state.last_date:
+                skipped += 1
+                continue
+
+            row = state.update(date, high, low, close, volume)
+            row['symbol'] = symbol
+            row['date'] = date
+            rows.append(row)
+
+        if skipped:
+            logger.debug(f"Skipped {skipped} bars already absorbed into the indicator state")
+
+        if not rows:
+            return pd.DataFrame()
+
+        result = pd.DataFrame(rows)
+        return result[['symbol', 'date'] + [c for c in result.columns if c not in ('symbol', 'date')]]
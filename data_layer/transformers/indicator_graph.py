@@ -0,0 +1,417 @@
+"""
+Indicator Dependency Graph
+
+Indicators are declared as nodes keyed by (operation, *arguments) tuples,
+where arguments may themselves be node keys and plain strings name the raw
+input fields. A graph evaluates a node by first evaluating its
+dependencies, and caches results, so intermediates shared by several
+indicators (shifted closes, true range, rolling means, EMAs) are computed
+once per transform and only the nodes reachable from the requested outputs
+are evaluated at all. Intermediates are released as soon as their last
+dependent has been computed, which keeps peak memory close to the size of
+the outputs.
+
+All arrays are (bar x symbol), one column per symbol history. Recursive
+filters (EMA, Wilder, KAMA) run on all columns at once through the kernels
+module.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple, Union
+from pandas.api.indexers import BaseIndexer
+import logging
+
+from . import kernels
+
+logger = logging.getLogger(__name__)
+
+# A raw input field name, or (operation, *arguments)
+NodeKey = Union[str, Tuple[Hashable, ...]]
+
+_OPERATIONS: Dict[str, Callable[..., np.ndarray]] = {}
+
+# Bars of history an operation reads before the current one, given its arguments
+_LOOKBACKS: Dict[str, Callable[..., int]] = {}
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Weight an EWM may leave on bars older than its look-back
+EWM_TOLERANCE = 1e-10
+
+
+def operation(name: str, lookback: Optional[Callable[..., int]] = None) -> Callable:
+    """
+    Register a node operation.
+
+    The decorated function is called as fn(graph, *arguments) and evaluates
+    its dependencies through graph.evaluate(). lookback(*arguments) gives the
+    bars of history the operation itself reads before the current bar (0 if
+    omitted); the look-back of its dependencies is added automatically.
+    """
+    def decorator(fn: Callable[..., np.ndarray]) -> Callable[..., np.ndarray]:
+        _OPERATIONS[name] = fn
+        if lookback is not None:
+            _LOOKBACKS[name] = lookback
+        return fn
+    return decorator
+
+
+def decay_lookback(decay: float) -> int:
+    """Bars after which a recursive filter's weight on older bars falls below EWM_TOLERANCE."""
+    return int(np.ceil(np.log(EWM_TOLERANCE) / np.log(decay))) if decay > 0 else 0
+
+
+def ewm_lookback(span: int) -> int:
+    """Bars after which an EWM's weight on older bars falls below EWM_TOLERANCE."""
+    return decay_lookback(1.0 - 2.0 / (span + 1))
+
+
+def wilder_lookback(period: int) -> int:
+    """Bars of history for Wilder smoothing: the seed window, then the decay of the recursion."""
+    return period - 1 + decay_lookback(1.0 - 1.0 / period)
+
+
+def kama_lookback(period: int, fast: int = 2, slow: int = 30) -> int:
+    """Bars of history for KAMA: the efficiency window, then the decay at the slowest constant."""
+    return period + decay_lookback(1.0 - (2.0 / (slow + 1)) ** 2)
+
+
+class IndicatorGraph:
+    """
+    Memoized evaluation of indicator nodes over (bar x symbol) inputs.
+
+    Example:
+        graph = IndicatorGraph({'close': close, 'high': high, 'low': low})
+        sma = graph.evaluate(('mean', 'close', 20))
+        bb_middle = graph.evaluate(('mean', 'close', 20))  # cached
+    """
+
+    def __init__(self, inputs: Dict[str, np.ndarray]):
+        """
+        Initialize the graph.
+
+        Args:
+            inputs: Raw fields (e.g. high, low, close, volume) as (bar x symbol) arrays
+        """
+        self.inputs = inputs
+        self._cache: Dict[NodeKey, np.ndarray] = {}
+        self._evaluating: List[NodeKey] = []
+        self._dependencies: Dict[NodeKey, Set[NodeKey]] = {}
+        self._pending: Dict[NodeKey, int] = {}  # Dependents not yet computed, per releasable node
+        self.n_evaluated = 0
+
+    def evaluate(self, key: NodeKey) -> np.ndarray:
+        """Evaluate a node, computing its dependencies once."""
+        if isinstance(key, str):
+            if key not in self.inputs:
+                raise KeyError(f"Indicator input '{key}' is not available")
+            return self.inputs[key]
+
+        if self._evaluating:
+            self._dependencies.setdefault(self._evaluating[-1], set()).add(key)
+
+        result = self._cache.get(key)
+        if result is None:
+            name, *arguments = key
+            if name not in _OPERATIONS:
+                raise KeyError(f"Unknown indicator operation '{name}'")
+
+            self._evaluating.append(key)
+            try:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    result = self._cache[key] = _OPERATIONS[name](self, *arguments)
+            finally:
+                self._evaluating.pop()
+            self.n_evaluated += 1
+            self._release_dependencies(key)
+        return result
+
+    def _release_dependencies(self, key: NodeKey) -> None:
+        """Drop cached dependencies of a node that no remaining node needs."""
+        for dependency in self._dependencies.get(key, ()):
+            if dependency in self._pending:
+                self._pending[dependency] -= 1
+                if self._pending[dependency] == 0:
+                    del self._pending[dependency]
+                    self._cache.pop(dependency, None)
+
+    def _plan(self, keys: List[NodeKey]) -> Dict[NodeKey, Set[NodeKey]]:
+        """Discover the dependencies of each node by evaluating the graph on 1 x 1 inputs."""
+        planner = IndicatorGraph({field: np.full((1, 1), np.nan) for field in self.inputs})
+        for key in keys:
+            planner.evaluate(key)
+        return planner._dependencies
+
+    def lookback(self, keys: List[NodeKey]) -> int:
+        """
+        Bars of history needed before a bar to compute the nodes at that bar.
+
+        Exact for rolling windows and shifts; EWMs and the other recursive
+        filters count the bars until the truncated weight falls below
+        EWM_TOLERANCE.
+
+        Args:
+            keys: Node keys
+
+        Returns:
+            Longest chain of look-backs from any node down to the inputs
+        """
+        dependencies = self._plan(keys)
+        lookbacks: Dict[NodeKey, int] = {}
+
+        def visit(key: NodeKey) -> int:
+            if isinstance(key, str):
+                return 0
+            if key not in lookbacks:
+                name, *arguments = key
+                own = _LOOKBACKS[name](*arguments) if name in _LOOKBACKS else 0
+                lookbacks[key] = own + max((visit(d) for d in dependencies.get(key, ())), default=0)
+            return lookbacks[key]
+
+        return max((visit(key) for key in keys), default=0)
+
+    def evaluate_many(self, nodes: Dict[str, NodeKey]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate named nodes, sharing intermediates between them.
+
+        Args:
+            nodes: Output name -> node key
+
+        Returns:
+            Output name -> (bar x symbol) array
+        """
+        outputs = set(nodes.values())
+        self._dependencies = self._plan(list(nodes.values()))
+
+        # Count the dependents of every intermediate so it can be released after the last one
+        self._pending = {}
+        for dependencies in self._dependencies.values():
+            for dependency in dependencies:
+                if dependency not in outputs:
+                    self._pending[dependency] = self._pending.get(dependency, 0) + 1
+
+        results = {name: self.evaluate(key) for name, key in nodes.items()}
+        logger.debug(f"Evaluated {len(nodes)} indicators from {self.n_evaluated} graph nodes")
+        return results
+
+
+# === Array kernels ===
+
+class _ColumnWindowIndexer(BaseIndexer):
+    """
+    Trailing windows over a column-major flattened (bar x symbol) array.
+
+    Windows are clipped at the start of each column, so a single rolling pass
+    over all symbols never mixes one symbol's bars into another's.
+    """
+
+    def get_window_bounds(self, num_values: int = 0, min_periods: Optional[int] = None,
+                          center: Optional[bool] = None, closed: Optional[str] = None,
+                          step: Optional[int] = None):
+        lengths = np.minimum(np.arange(1, self.column_length + 1), self.window_size)
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = end - np.tile(lengths, num_values // self.column_length)
+        return start, end
+
+
+def _rolling(values: np.ndarray, window: int, statistic: str = 'mean') -> np.ndarray:
+    """Rolling mean/std down each column, NaN until a full window (as Series.rolling(window))."""
+    flat = pd.Series(values.ravel(order='F'))
+    indexer = _ColumnWindowIndexer(window_size=window, column_length=values.shape[0])
+    result = getattr(flat.rolling(indexer, min_periods=window), statistic)()
+    return result.to_numpy().reshape(values.shape, order='F')
+
+
+def _shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Shift each column down by `periods` bars."""
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+# === Building blocks ===
+
+@operation('shift', lookback=lambda node, periods=1: periods)
+def _shift_node(graph: IndicatorGraph, node: NodeKey, periods: int = 1) -> np.ndarray:
+    return _shift(graph.evaluate(node), periods)
+
+
+@operation('diff')
+def _diff_node(graph: IndicatorGraph, node: NodeKey) -> np.ndarray:
+    return graph.evaluate(node) - graph.evaluate(('shift', node))
+
+
+@operation('gain')
+def _gain_node(graph: IndicatorGraph, node: NodeKey, keep_missing: bool = False) -> np.ndarray:
+    """Positive bar changes, 0 otherwise (NaN where the change is missing if keep_missing)."""
+    delta = graph.evaluate(('diff', node))
+    gain = np.where(delta > 0, delta, 0)
+    return np.where(np.isnan(delta), np.nan, gain) if keep_missing else gain
+
+
+@operation('loss')
+def _loss_node(graph: IndicatorGraph, node: NodeKey, keep_missing: bool = False) -> np.ndarray:
+    """Magnitude of negative bar changes, 0 otherwise (NaN where the change is missing if keep_missing)."""
+    delta = graph.evaluate(('diff', node))
+    loss = -np.where(delta < 0, delta, 0)
+    return np.where(np.isnan(delta), np.nan, loss) if keep_missing else loss
+
+
+@operation('mean', lookback=lambda node, window: window - 1)
+def _mean_node(graph: IndicatorGraph, node: NodeKey, window: int) -> np.ndarray:
+    return _rolling(graph.evaluate(node), window)
+
+
+@operation('std', lookback=lambda node, window: window - 1)
+def _std_node(graph: IndicatorGraph, node: NodeKey, window: int) -> np.ndarray:
+    return _rolling(graph.evaluate(node), window, 'std')
+
+
+@operation('ewm', lookback=lambda node, span: ewm_lookback(span))
+def _ewm_node(graph: IndicatorGraph, node: NodeKey, span: int) -> np.ndarray:
+    """Exponentially weighted mean, as Series.ewm(span=span).mean()."""
+    return kernels.ema(graph.evaluate(node), span)
+
+
+@operation('wilder', lookback=lambda node, period: wilder_lookback(period))
+def _wilder_node(graph: IndicatorGraph, node: NodeKey, period: int) -> np.ndarray:
+    """Wilder smoothing (seeded with the simple mean of the first `period` bars)."""
+    return kernels.wilder(graph.evaluate(node), period)
+
+
+@operation('dema', lookback=lambda node, span: 2 * ewm_lookback(span))
+def _dema_node(graph: IndicatorGraph, node: NodeKey, span: int) -> np.ndarray:
+    return 2 * graph.evaluate(('ewm', node, span)) - graph.evaluate(('ewm', ('ewm', node, span), span))
+
+
+@operation('tema', lookback=lambda node, span: 3 * ewm_lookback(span))
+def _tema_node(graph: IndicatorGraph, node: NodeKey, span: int) -> np.ndarray:
+    first = ('ewm', node, span)
+    second = ('ewm', first, span)
+    return 3 * graph.evaluate(first) - 3 * graph.evaluate(second) + graph.evaluate(('ewm', second, span))
+
+
+@operation('kama', lookback=lambda node, *arguments: kama_lookback(*arguments))
+def _kama_node(graph: IndicatorGraph, node: NodeKey, period: int, fast: int = 2, slow: int = 30) -> np.ndarray:
+    """Kaufman adaptive moving average."""
+    return kernels.kama(graph.evaluate(node), period, fast, slow)
+
+
+@operation('ratio')
+def _ratio_node(graph: IndicatorGraph, numerator: NodeKey, denominator: NodeKey) -> np.ndarray:
+    return graph.evaluate(numerator) / graph.evaluate(denominator)
+
+
+@operation('momentum')
+def _momentum_node(graph: IndicatorGraph, node: NodeKey, periods: int) -> np.ndarray:
+    """Return over `periods` bars (periods=1 gives bar returns)."""
+    return graph.evaluate(node) / graph.evaluate(('shift', node, periods)) - 1
+
+
+@operation('volatility')
+def _volatility_node(graph: IndicatorGraph, node: NodeKey, window: int) -> np.ndarray:
+    """Annualized rolling standard deviation of bar returns."""
+    return graph.evaluate(('std', ('momentum', node, 1), window)) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+@operation('true_range')
+def _true_range_node(graph: IndicatorGraph) -> np.ndarray:
+    """True Range (the high-low range on the first bar)."""
+    high, low = graph.evaluate('high'), graph.evaluate('low')
+    previous_close = graph.evaluate(('shift', 'close'))
+
+    tr1 = high - low
+    tr2 = np.abs(high - previous_close)
+    tr3 = np.abs(low - previous_close)
+
+    # fmax skips missing ranges, like a row-wise max
+    return np.fmax(np.fmax(tr1, tr2), tr3)
+
+
+# === Indicators ===
+
+@operation('rsi')
+def _rsi_node(graph: IndicatorGraph, node: NodeKey, period: int, smoothing: str = 'mean') -> np.ndarray:
+    """
+    Relative Strength Index.
+
+    smoothing='mean' averages gains and losses with simple moving averages;
+    'wilder' gives the textbook RSI, Wilder-smoothed from the first change.
+    """
+    keep_missing = smoothing == 'wilder'
+    rs = (graph.evaluate((smoothing, ('gain', node, keep_missing), period))
+          / graph.evaluate((smoothing, ('loss', node, keep_missing), period)))
+    return 100 - (100 / (1 + rs))
+
+
+@operation('macd')
+def _macd_node(graph: IndicatorGraph, fast: int, slow: int) -> np.ndarray:
+    return graph.evaluate(('ewm', 'close', fast)) - graph.evaluate(('ewm', 'close', slow))
+
+
+@operation('macd_histogram')
+def _macd_histogram_node(graph: IndicatorGraph, fast: int, slow: int, signal: int) -> np.ndarray:
+    macd = ('macd', fast, slow)
+    return graph.evaluate(macd) - graph.evaluate(('ewm', macd, signal))
+
+
+@operation('bb_upper')
+def _bb_upper_node(graph: IndicatorGraph, period: int, width: float = 2) -> np.ndarray:
+    return graph.evaluate(('mean', 'close', period)) + (graph.evaluate(('std', 'close', period)) * width)
+
+
+@operation('bb_lower')
+def _bb_lower_node(graph: IndicatorGraph, period: int, width: float = 2) -> np.ndarray:
+    return graph.evaluate(('mean', 'close', period)) - (graph.evaluate(('std', 'close', period)) * width)
+
+
+@operation('bb_range')
+def _bb_range_node(graph: IndicatorGraph, period: int, width: float = 2) -> np.ndarray:
+    return graph.evaluate(('bb_upper', period, width)) - graph.evaluate(('bb_lower', period, width))
+
+
+@operation('bb_position')
+def _bb_position_node(graph: IndicatorGraph, period: int, width: float = 2) -> np.ndarray:
+    """Position within the bands (0 = at lower band, 1 = at upper band)."""
+    bb_range = graph.evaluate(('bb_range', period, width))
+    bb_lower = graph.evaluate(('bb_lower', period, width))
+    return np.where(bb_range > 0, (graph.evaluate('close') - bb_lower) / bb_range, 0.5)
+
+
+@operation('bb_width')
+def _bb_width_node(graph: IndicatorGraph, period: int, width: float = 2) -> np.ndarray:
+    return graph.evaluate(('bb_range', period, width)) / graph.evaluate(('mean', 'close', period))
+
+
+@operation('plus_dm')
+def _plus_dm_node(graph: IndicatorGraph) -> np.ndarray:
+    up_move = graph.evaluate(('diff', 'high'))
+    down_move = -graph.evaluate(('diff', 'low'))
+    return np.where((up_move > down_move) & (up_move > 0), up_move, 0)
+
+
+@operation('minus_dm')
+def _minus_dm_node(graph: IndicatorGraph) -> np.ndarray:
+    up_move = graph.evaluate(('diff', 'high'))
+    down_move = -graph.evaluate(('diff', 'low'))
+    return np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+
+
+@operation('dx')
+def _dx_node(graph: IndicatorGraph, period: int, smoothing: str = 'mean') -> np.ndarray:
+    """Directional movement index from +DM, -DM and true range smoothed with `smoothing` ('mean' or 'wilder')."""
+    tr_smooth = graph.evaluate((smoothing, ('true_range',), period))
+    plus_di = 100 * (graph.evaluate((smoothing, ('plus_dm',), period)) / tr_smooth)
+    minus_di = 100 * (graph.evaluate((smoothing, ('minus_dm',), period)) / tr_smooth)
+
+    di_diff = np.abs(plus_di - minus_di)
+    di_sum = plus_di + minus_di
+    return 100 * (di_diff / di_sum)
+
+
+@operation('adx')
+def _adx_node(graph: IndicatorGraph, period: int, smoothing: str = 'mean') -> np.ndarray:
+    """Average Directional Index."""
+    return graph.evaluate((smoothing, ('dx', period, smoothing), period))
@@ -0,0 +1,256 @@
+"""
+Smoothing Kernels
+
+Recursive filters (EMA, Wilder, DEMA, TEMA, KAMA) over (bar x symbol)
+arrays, each column filtered independently. Filters with a constant
+coefficient run as one scipy.signal.lfilter call over all columns; KAMA's
+coefficient changes every bar, so it runs a row loop over all columns at
+once, compiled with numba when it is installed.
+
+Leading missing values give NaN. Apart from ema(adjust=True), which
+matches pandas ewm(adjust=True).mean() exactly (missing bars decay the
+weights), missing bars are skipped: the filter continues from the previous
+observed bar, and the last value is carried through the gap.
+"""
+
+from typing import Callable, Optional, Tuple
+import logging
+
+import numpy as np
+from scipy.signal import lfilter
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover - numba is optional
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs) -> Callable:
+        """Run undecorated when numba is not installed."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+def _as_2d(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values.reshape(len(values), -1)
+
+
+def _smoothing_factor(span: Optional[float], alpha: Optional[float]) -> float:
+    if alpha is None:
+        if span is None or span < 1:
+            raise ValueError("Provide span >= 1 or alpha")
+        alpha = 2.0 / (span + 1)
+    if not 0 < alpha <= 1:
+        raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+    return alpha
+
+
+def _first_order(inputs: np.ndarray, decay: float) -> np.ndarray:
+    """y[t] = inputs[t] + decay * y[t - 1] down each column."""
+    # Filtering the last axis of the transpose is contiguous for column-major panels
+    return lfilter([1.0], [1.0, -decay], inputs.T, axis=-1).T
+
+
+def _align(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Move each column's observed values to the top of the column, in order.
+
+    Returns:
+        Tuple of (aligned array, NaN-padded at the bottom; index into the
+        aligned column of the last observed value at or before every cell,
+        -1 before the first)
+    """
+    observed = ~np.isnan(values)
+    counts = observed.sum(axis=0)
+    aligned = np.full((max(int(counts.max(initial=0)), 1), values.shape[1]), np.nan, order='F')
+    # One boolean gather per column is far faster than a 2-D fancy index over all cells
+    for column in range(values.shape[1]):
+        aligned[:counts[column], column] = values[observed[:, column], column]
+    return aligned, np.cumsum(observed, axis=0) - 1
+
+
+def _restore(aligned: np.ndarray, position: np.ndarray) -> np.ndarray:
+    """Scatter filtered aligned columns back, carrying values through missing bars."""
+    result = np.empty(position.shape, order='F')
+    for column in range(position.shape[1]):
+        result[:, column] = aligned[np.maximum(position[:, column], 0), column]
+    result[position < 0] = np.nan
+    return result
+
+
+def _skipping_missing(kernel: Callable[..., np.ndarray]) -> Callable[..., np.ndarray]:
+    """Apply a kernel written for gap-free columns to columns with missing bars."""
+    def wrapper(values: np.ndarray, *args, **kwargs) -> np.ndarray:
+        shape = np.shape(values)
+        values = _as_2d(values)
+        if values.size == 0:
+            return values.reshape(shape)
+        if not np.isnan(values).any():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return kernel(values, *args, **kwargs).reshape(shape)
+        aligned, position = _align(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return _restore(kernel(aligned, *args, **kwargs), position).reshape(shape)
+    wrapper.__name__ = kernel.__name__
+    wrapper.__doc__ = kernel.__doc__
+    return wrapper
+
+
+@_skipping_missing
+def _ema_recursive(values: np.ndarray, alpha: float) -> np.ndarray:
+    """y[0] = x[0], y[t] = (1 - alpha) * y[t - 1] + alpha * x[t]."""
+    inputs = alpha * values
+    inputs[0] = values[0]
+    return _first_order(inputs, 1.0 - alpha)
+
+
+def ema(values: np.ndarray,
+        span: Optional[float] = None,
+        alpha: Optional[float] = None,
+        adjust: bool = True) -> np.ndarray:
+    """
+    Exponential moving average down each column.
+
+    Args:
+        values: (bar x symbol) array
+        span: Span (alpha = 2 / (span + 1))
+        alpha: Smoothing factor, instead of span
+        adjust: Divide by the decaying sum of weights, like pandas
+            ewm(adjust=True); otherwise the recursive form seeded with the
+            first value
+
+    Returns:
+        Array of the same shape, as DataFrame.ewm(span, alpha, adjust).mean()
+    """
+    alpha = _smoothing_factor(span, alpha)
+    if not adjust:
+        return _ema_recursive(values, alpha)
+
+    shape = np.shape(values)
+    values = _as_2d(values)
+    observed = ~np.isnan(values)
+    decay = 1.0 - alpha
+
+    # Weighted sum and sum of weights; a missing bar adds nothing and decays both
+    filled = values.copy(order='K')
+    filled[~observed] = 0.0
+    result = _first_order(filled, decay)
+    if observed.all():
+        weights = ((1.0 - decay ** np.arange(1, len(values) + 1)) / alpha)[:, None]
+    else:
+        weights = _first_order(observed.astype(np.float64, order='K'), decay)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(result, weights, out=result)
+    return result.reshape(shape)
+
+
+@_skipping_missing
+def wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder smoothing down each column (as in RSI, ATR and ADX).
+
+    The first value is the simple mean of the first `period` bars; after
+    that y[t] = y[t - 1] + (x[t] - y[t - 1]) / period.
+
+    Args:
+        values: (bar x symbol) array
+        period: Smoothing period
+
+    Returns:
+        Array of the same shape, NaN until `period` bars have been observed
+    """
+    if period < 1:
+        raise ValueError(f"period must be >= 1, got {period}")
+    if len(values) < period:
+        return np.full_like(values, np.nan)
+
+    alpha = 1.0 / period
+    inputs = alpha * values
+    inputs[:period - 1] = 0.0
+    inputs[period - 1] = values[:period].mean(axis=0)
+
+    smoothed = _first_order(inputs, 1.0 - alpha)
+    smoothed[:period - 1] = np.nan
+    return smoothed
+
+
+def dema(values: np.ndarray, span: float, adjust: bool = True) -> np.ndarray:
+    """
+    Double exponential moving average, 2 * EMA - EMA(EMA).
+
+    Args:
+        values: (bar x symbol) array
+        span: EMA span
+        adjust: As in ema()
+
+    Returns:
+        Array of the same shape
+    """
+    first = ema(values, span, adjust=adjust)
+    return 2 * first - ema(first, span, adjust=adjust)
+
+
+def tema(values: np.ndarray, span: float, adjust: bool = True) -> np.ndarray:
+    """
+    Triple exponential moving average, 3 * EMA - 3 * EMA(EMA) + EMA(EMA(EMA)).
+
+    Args:
+        values: (bar x symbol) array
+        span: EMA span
+        adjust: As in ema()
+
+    Returns:
+        Array of the same shape
+    """
+    first = ema(values, span, adjust=adjust)
+    second = ema(first, span, adjust=adjust)
+    return 3 * first - 3 * second + ema(second, span, adjust=adjust)
+
+
+@njit(cache=True)
+def _adaptive_filter(values: np.ndarray, coefficients: np.ndarray, start: int) -> np.ndarray:
+    """y[start] = x[start], y[t] = y[t - 1] + c[t] * (x[t] - y[t - 1]), NaN before start."""
+    result = np.full(values.shape, np.nan)
+    result[start] = values[start]
+    for t in range(start + 1, values.shape[0]):
+        result[t] = result[t - 1] + coefficients[t] * (values[t] - result[t - 1])
+    return result
+
+
+@_skipping_missing
+def kama(values: np.ndarray, period: int = 10, fast: int = 2, slow: int = 30) -> np.ndarray:
+    """
+    Kaufman adaptive moving average down each column.
+
+    The smoothing constant moves between the fast and slow EMA factors with
+    the efficiency ratio |x[t] - x[t - period]| / sum of |bar changes| over
+    the last `period` bars. The average starts at x[period - 1].
+
+    Args:
+        values: (bar x symbol) array
+        period: Efficiency ratio window
+        fast: Fast EMA span
+        slow: Slow EMA span
+
+    Returns:
+        Array of the same shape, NaN for the first period - 1 bars
+    """
+    if len(values) <= period:
+        return np.full_like(values, np.nan)
+
+    change = np.abs(values[period:] - values[:-period])
+    steps = np.abs(np.diff(values, axis=0))
+    cumulative = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(np.nan_to_num(steps), axis=0)])
+    volatility = cumulative[period:] - cumulative[:-period]
+    efficiency = np.where(volatility > 0, change / volatility, 0.0)
+
+    fast_factor, slow_factor = 2.0 / (fast + 1), 2.0 / (slow + 1)
+    coefficients = np.full_like(values, np.nan)
+    coefficients[period:] = (efficiency * (fast_factor - slow_factor) + slow_factor) ** 2
+
+    return _adaptive_filter(np.ascontiguousarray(values), coefficients, period - 1)
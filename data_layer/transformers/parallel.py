@@ -0,0 +1,218 @@
+"""
+Parallel Transformation
+
+Shards long-format input by symbol across a process pool. The input is
+published once as a shared memory frame (one block, one contiguous array per
+column; strings and categoricals as integer codes) and every task only
+receives a row range, so no DataFrames are pickled in either direction:
+workers publish their outputs as shared memory frames too and return the
+spec. Shards are contiguous runs of symbols in order of first appearance,
+so concatenating them reproduces the serial output of transformers that
+work per symbol.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Shards per worker, so uneven symbols still balance across the pool
+SHARDS_PER_WORKER = 4
+
+# Column arrays start on this byte boundary within the block
+_ALIGNMENT = 64
+
+# Per-process state populated by _init_worker
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _encode_column(series: pd.Series) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Split a column into a fixed-width array and the metadata to rebuild it."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), {'kind': 'category', 'categories': series.cat.categories,
+                                             'ordered': series.cat.ordered}
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+        return series.to_numpy(), {'kind': 'array'}
+
+    codes, uniques = pd.factorize(series)
+    return codes, {'kind': 'codes', 'uniques': np.asarray(uniques, dtype=object)}
+
+
+def _decode_column(values: np.ndarray, meta: Dict[str, Any]) -> Any:
+    """Rebuild a column from its shared array (copies out of the block)."""
+    if meta['kind'] == 'category':
+        return pd.Categorical.from_codes(values, meta['categories'], ordered=meta['ordered'])
+    if meta['kind'] == 'codes':
+        return np.append(meta['uniques'], None)[values]
+    return values.copy()
+
+
+def frame_to_shared_memory(frame: pd.DataFrame) -> Tuple[SharedMemory, Dict[str, Any]]:
+    """
+    Copy a DataFrame's columns into a new shared memory block.
+
+    The caller owns the block and must close() and unlink() it when done.
+    The index is not shared.
+
+    Args:
+        frame: DataFrame to publish
+
+    Returns:
+        Tuple of (shared memory block, picklable spec for frame_from_shared_memory)
+    """
+    encoded = [_encode_column(frame[column]) for column in frame.columns]
+
+    offsets, size = [], 0
+    for values, _ in encoded:
+        offsets.append(size)
+        size += -(-values.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    shm = SharedMemory(create=True, size=max(size, 1))
+    columns = []
+    for column, offset, (values, meta) in zip(frame.columns, offsets, encoded):
+        shared = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, offset=offset)
+        shared[:] = values
+        columns.append({'name': column, 'offset': offset, 'dtype': values.dtype.str, **meta})
+
+    spec = {'name': shm.name, 'length': len(frame), 'columns': columns}
+    return shm, spec
+
+
+def frame_from_shared_memory(spec: Dict[str, Any],
+                             start: int = 0,
+                             stop: Optional[int] = None) -> Tuple[pd.DataFrame, SharedMemory]:
+    """
+    Read rows [start, stop) of a frame published with frame_to_shared_memory.
+
+    Args:
+        spec: Spec returned by frame_to_shared_memory
+        start: First row
+        stop: End row (default: all rows)
+
+    Returns:
+        Tuple of (DataFrame copy of the rows, shared memory handle)
+    """
+    shm = SharedMemory(name=spec['name'])
+    stop = spec['length'] if stop is None else stop
+
+    data = {}
+    for column in spec['columns']:
+        values = np.ndarray((spec['length'],), dtype=np.dtype(column['dtype']), buffer=shm.buf,
+                            offset=column['offset'])
+        data[column['name']] = _decode_column(values[start:stop], column)
+
+    frame = pd.DataFrame(data, columns=[column['name'] for column in spec['columns']])
+    return frame, shm
+
+
+def _release(shm: SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+def _init_worker(input_spec: Dict[str, Any], transform: Callable[[pd.DataFrame], pd.DataFrame]) -> None:
+    """Keep the shared input spec and the transform in a pool worker."""
+    _WORKER_STATE.update({'input_spec': input_spec, 'transform': transform})
+
+
+def _transform_shard(start: int, stop: int) -> Optional[Dict[str, Any]]:
+    """Pool task: transform rows [start, stop) and publish the output."""
+    shard, shm = frame_from_shared_memory(_WORKER_STATE['input_spec'], start, stop)
+    shm.close()
+
+    output = _WORKER_STATE['transform'](shard)
+    if output is None or output.empty:
+        return None
+
+    output_shm, spec = frame_to_shared_memory(output)
+    output_shm.close()
+    return spec
+
+
+def shard_bounds(symbol_codes: np.ndarray, n_shards: int) -> List[Tuple[int, int]]:
+    """
+    Split rows sorted by symbol into contiguous shards of whole symbols.
+
+    Args:
+        symbol_codes: Sorted symbol code of every row
+        n_shards: Target number of shards
+
+    Returns:
+        List of (start, stop) row ranges with roughly equal row counts
+    """
+    symbol_starts = np.flatnonzero(np.r_[True, symbol_codes[1:] != symbol_codes[:-1]])
+    targets = np.linspace(0, len(symbol_codes), n_shards + 1)[1:-1]
+    cuts = np.unique(symbol_starts[np.clip(np.searchsorted(symbol_starts, targets), 0, len(symbol_starts) - 1)])
+    bounds = np.r_[0, cuts[cuts > 0], len(symbol_codes)]
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def transform_by_symbol(transform: Callable[[pd.DataFrame], pd.DataFrame],
+                        data: pd.DataFrame,
+                        max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Apply a transform to symbol shards of the input on a process pool.
+
+    The transform must be picklable (e.g. a bound method of a transformer or
+    pipeline) and must not need rows of other symbols. On a pool, rows
+    without a symbol are dropped.
+
+    Args:
+        transform: Function from an input frame to an output frame
+        data: Long-format input with a symbol column
+        max_workers: Pool size (defaults to CPU count; 1 runs in-process)
+
+    Returns:
+        Shard outputs concatenated in order of first appearance of the
+        symbols, with a fresh RangeIndex
+    """
+    max_workers = max_workers or os.cpu_count()
+    if max_workers <= 1:
+        return transform(data)
+
+    symbol_codes, _ = pd.factorize(data['symbol'])
+    if (symbol_codes < 0).any():
+        logger.warning(f"Dropping {(symbol_codes < 0).sum()} rows without a symbol")
+
+    order = np.argsort(symbol_codes, kind='stable')
+    order = order[symbol_codes[order] >= 0]
+    shards = shard_bounds(symbol_codes[order], max_workers * SHARDS_PER_WORKER)
+    logger.info(f"Transforming {len(data)} rows in {len(shards)} symbol shards on {max_workers} workers")
+
+    input_shm, input_spec = frame_to_shared_memory(data.iloc[order])
+    output_specs: List[Dict[str, Any]] = []
+    error: Optional[BaseException] = None
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(input_spec, transform)) as executor:
+            futures = [executor.submit(_transform_shard, start, stop) for start, stop in shards]
+            for future in futures:
+                try:
+                    spec = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if spec is not None:
+                    output_specs.append(spec)
+    finally:
+        _release(input_shm)
+
+    outputs: List[pd.DataFrame] = []
+    for spec in output_specs:
+        frame, shm = frame_from_shared_memory(spec)
+        _release(shm)
+        outputs.append(frame)
+
+    if error is not None:
+        raise error
+
+    if not outputs:
+        return pd.DataFrame()
+    return pd.concat(outputs, ignore_index=True)
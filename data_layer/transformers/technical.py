@@ -5,14 +5,54 @@ Transforms raw OHLCV market data into technical analysis indicators.
 This replaces the complex "feature store" with a simple, focused transformer.
 """
 
+import re
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple
 import logging
 from .base_transformer import BaseTransformer
+from .indicator_graph import IndicatorGraph, NodeKey
+from infrastructure.utils.compact import COMPACT_FLOAT, to_day_numbers
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PERIODS = {
+    'rsi': 14,
+    'sma_short': 20,
+    'sma_long': 50,
+    'ema_fast': 12,
+    'ema_slow': 26,
+    'bb': 20,
+    'atr': 14,
+    'adx': 14,
+    'volume_sma': 20
+}
+
+# Raw fields the indicator graph reads
+INPUT_FIELDS = ('high', 'low', 'close', 'volume')
+
+# Span of the MACD signal line
+MACD_SIGNAL_SPAN = 9
+
+# Graph operation smoothing RSI, ATR and ADX, per `smoothing` option
+SMOOTHING_OPERATIONS = {'sma': 'mean', 'wilder': 'wilder'}
+
+# Parametric feature names, as returned by BaseStrategy.get_required_features();
+# builders take the period and the smoothing operation
+FEATURE_PATTERNS: List[Tuple[Pattern, Callable[[int, str], NodeKey]]] = [
+    (re.compile(r'^sma_(\d+)$'), lambda n, smoothing: ('mean', 'close', n)),
+    (re.compile(r'^ema_(\d+)$'), lambda n, smoothing: ('ewm', 'close', n)),
+    (re.compile(r'^dema_(\d+)$'), lambda n, smoothing: ('dema', 'close', n)),
+    (re.compile(r'^tema_(\d+)$'), lambda n, smoothing: ('tema', 'close', n)),
+    (re.compile(r'^kama_(\d+)$'), lambda n, smoothing: ('kama', 'close', n)),
+    (re.compile(r'^rsi_(\d+)$'), lambda n, smoothing: ('rsi', 'close', n, smoothing)),
+    (re.compile(r'^volume_(?:sma|ma)_(\d+)$'), lambda n, smoothing: ('mean', 'volume', n)),
+    (re.compile(r'^momentum_(\d+)d?$'), lambda n, smoothing: ('momentum', 'close', n)),
+    (re.compile(r'^volatility_(\d+)d?$'), lambda n, smoothing: ('volatility', 'close', n)),
+    (re.compile(r'^atr_(\d+)$'), lambda n, smoothing: (smoothing, ('true_range',), n)),
+    (re.compile(r'^adx_(\d+)$'), lambda n, smoothing: ('adx', n, smoothing)),
+]
+
 
 class TechnicalIndicators(BaseTransformer):
     """
@@ -22,25 +62,87 @@ class TechnicalIndicators(BaseTransformer):
     like RSI, MACD, Bollinger Bands, moving averages, etc.
     """
     
-    def __init__(self, periods: Optional[Dict[str, int]] = None):
+    def __init__(self,
+                 periods: Optional[Dict[str, int]] = None,
+                 features: Optional[Iterable[str]] = None,
+                 compact: bool = False,
+                 smoothing: str = 'sma'):
         """
         Initialize technical indicators transformer.
         
         Args:
             periods: Dictionary of periods for various indicators
+            features: Features to compute (default: all columns of the output
+                schema). Besides the schema columns, parametric names such as
+                sma_10, ema_50, dema_20, tema_20, kama_10, rsi_7,
+                volume_ma_20, momentum_20d, volatility_60d, atr_20 and
+                adx_28 are accepted. Only the requested features and their
+                dependencies are evaluated.
+            compact: Output float32 indicators, a categorical symbol column
+                and int32 day-number dates (indicators are still computed
+                in float64)
+            smoothing: How RSI, ATR and ADX average their inputs: 'sma'
+                (simple moving averages, the default and the only mode
+                IncrementalIndicators reproduces) or 'wilder' (Wilder's
+                recursive smoothing, as in the textbook definitions)
         """
-        self.periods = periods if periods is not None else {
-            'rsi': 14,
-            'sma_short': 20,
-            'sma_long': 50,
-            'ema_fast': 12,
-            'ema_slow': 26,
-            'bb': 20,
-            'atr': 14,
-            'adx': 14,
-            'volume_sma': 20
-        }
-        super().__init__({'periods': self.periods})
+        if smoothing not in SMOOTHING_OPERATIONS:
+            raise ValueError(f"Unknown smoothing '{smoothing}', expected one of {list(SMOOTHING_OPERATIONS)}")
+        
+        self.periods = periods if periods is not None else dict(DEFAULT_PERIODS)
+        self.features: Optional[List[str]] = None
+        self.compact = compact
+        self.smoothing = smoothing
+        
+        if features is not None:
+            features = list(dict.fromkeys(features))
+            unknown = [name for name in features if self.resolve_feature(name) is None]
+            if unknown:
+                raise ValueError(f"Unknown technical indicators: {unknown}")
+            self.features = features
+        
+        super().__init__({'periods': self.periods, 'features': self.features, 'compact': self.compact,
+                          'smoothing': self.smoothing})
+    
+    def resolve_feature(self, name: str) -> Optional[NodeKey]:
+        """
+        Get the graph node computing a feature.
+        
+        Args:
+            name: Output schema column or parametric feature name
+            
+        Returns:
+            Node key, or None if this transformer cannot compute the feature
+        """
+        node = self._indicator_nodes().get(name)
+        if node is not None:
+            return node
+        
+        for pattern, build in FEATURE_PATTERNS:
+            match = pattern.match(name)
+            if match:
+                return build(int(match.group(1)), SMOOTHING_OPERATIONS[self.smoothing])
+        return None
+    
+    def select_features(self, features: Optional[Iterable[str]]) -> List[str]:
+        """
+        Restrict the output to the requested features this transformer can compute.
+        
+        Args:
+            features: Requested feature names (None computes everything);
+                names this transformer does not know are ignored
+            
+        Returns:
+            The features that will be computed
+        """
+        if features is None:
+            self.features = None
+            return list(self._indicator_nodes())
+        
+        self.features = [name for name in dict.fromkeys(features) if self.resolve_feature(name) is not None]
+        self.config['features'] = self.features
+        logger.debug(f"{self.name}: Computing {len(self.features)} requested features")
+        return list(self.features)
     
     def get_required_columns(self) -> List[str]:
         """Return required input columns."""
@@ -50,149 +152,132 @@ class TechnicalIndicators(BaseTransformer):
         """
         Transform OHLCV data into technical indicators.
         
+        The data is sorted once and scattered into (bar x symbol) arrays, where
+        row k holds each symbol's k-th bar by date, and every indicator is
+        computed for all symbols in one pass over those arrays. Symbols with
+        shorter histories are padded with trailing NaNs, which never reach
+        their own earlier bars, so results are the same as computing each
+        symbol on its own.
+        
         Args:
             market_data: DataFrame with columns [symbol, date, open, high, low, close, volume]
             
         Returns:
-            DataFrame with technical indicators
+            DataFrame with technical indicators, grouped by symbol in order of
+            first appearance and sorted by date within each symbol
         """
-        results = []
-        
-        for symbol in market_data['symbol'].unique():
-            symbol_data = market_data[market_data['symbol'] == symbol].copy()
-            symbol_data = symbol_data.sort_values(['date']).reset_index(drop=True)
-            
-            # Calculate all indicators for this symbol
-            indicators = self._calculate_indicators(symbol_data)
-            results.append(indicators)
+        symbol_codes, symbols = pd.factorize(market_data['symbol'])
+        date_codes, _ = pd.factorize(market_data['date'], sort=True)
+        date_codes = np.where(date_codes < 0, len(market_data), date_codes)  # Missing dates sort last
         
-        if results:
-            return pd.concat(results, ignore_index=True)
-        else:
+        order = np.lexsort((date_codes, symbol_codes))
+        order = order[symbol_codes[order] >= 0]  # Rows without a symbol are dropped
+        if len(order) == 0:
             return pd.DataFrame()
-    
-    def _calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Calculate all technical indicators for a single symbol."""
-        
-        # Create base result DataFrame
-        result = pd.DataFrame({
-            'symbol': data['symbol'],
-            'date': data['date']
-        })
-        
-        # Price data as Series
-        high = pd.Series(data['high'].values, index=data.index)
-        low = pd.Series(data['low'].values, index=data.index)
-        close = pd.Series(data['close'].values, index=data.index)
-        volume = pd.Series(data['volume'].values, index=data.index)
         
-        # === Moving Averages ===
-        result['sma_20'] = close.rolling(self.periods['sma_short']).mean()
-        result['sma_50'] = close.rolling(self.periods['sma_long']).mean()
-        result['ema_12'] = close.ewm(span=self.periods['ema_fast']).mean()
-        result['ema_26'] = close.ewm(span=self.periods['ema_slow']).mean()
+        # Position of every sorted row in the column-major flattened panel
+        columns = symbol_codes[order]
+        counts = np.bincount(columns, minlength=len(symbols))
+        starts = np.cumsum(counts) - counts
+        shape = (counts.max(), len(symbols))
+        cells = np.arange(len(order)) - starts[columns] + columns * shape[0]
         
-        # === RSI ===
-        result['rsi_14'] = self._calculate_rsi(close, self.periods['rsi'])
+        prices = {}
+        for field in INPUT_FIELDS:
+            panel = np.full(shape[0] * shape[1], np.nan)
+            panel[cells] = market_data[field].to_numpy(dtype=np.float64)[order]
+            prices[field] = panel.reshape(shape, order='F')
         
-        # === MACD ===
-        macd_line = result['ema_12'] - result['ema_26']
-        macd_signal = macd_line.ewm(span=9).mean()
-        result['macd'] = macd_line
-        result['macd_signal'] = macd_signal
-        result['macd_histogram'] = macd_line - macd_signal
+        indicators = self._calculate_indicators(prices)
         
-        # === Bollinger Bands ===
-        bb_period = self.periods['bb']
-        bb_middle = close.rolling(bb_period).mean()
-        bb_std = close.rolling(bb_period).std()
-        result['bb_upper'] = bb_middle + (bb_std * 2)
-        result['bb_middle'] = bb_middle
-        result['bb_lower'] = bb_middle - (bb_std * 2)
+        # Gather into one float block, releasing each panel as soon as it is copied
+        names = list(indicators)
+        values = np.empty((len(order), len(names)), dtype=COMPACT_FLOAT if self.compact else np.float64, order='F')
+        for j, name in enumerate(names):
+            values[:, j] = indicators.pop(name).ravel(order='F')[cells]
         
-        # Bollinger Band position (0 = at lower band, 1 = at upper band)
-        bb_range = result['bb_upper'] - result['bb_lower']
-        result['bb_position'] = np.where(bb_range > 0, 
-                                       (close - result['bb_lower']) / bb_range, 
-                                       0.5)
-        result['bb_width'] = bb_range / bb_middle
-        
-        # === Volume Indicators ===
-        result['volume_sma_20'] = volume.rolling(self.periods['volume_sma']).mean()
-        result['volume_ratio'] = volume / result['volume_sma_20']
-        
-        # === Volatility Indicators ===
-        result['atr_14'] = self._calculate_atr(data, self.periods['atr'])
-        
-        # === Trend Indicators ===
-        result['adx_14'] = self._calculate_adx(data, self.periods['adx'])
+        result = pd.DataFrame(values, columns=names, copy=False)
+        if self.compact:
+            result.insert(0, 'symbol', pd.Categorical.from_codes(columns, pd.Index(np.asarray(symbols, dtype=object))))
+            dates = market_data['date'].to_numpy()[order]
+            result.insert(1, 'date', dates if pd.api.types.is_integer_dtype(dates) else to_day_numbers(dates))
+        else:
+            result.insert(0, 'symbol', market_data['symbol'].to_numpy()[order])
+            result.insert(1, 'date', market_data['date'].to_numpy()[order])
         
+        logger.debug(f"Calculated technical indicators for {len(symbols)} symbols, {len(result)} rows")
         return result
     
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate Relative Strength Index."""
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        
-        avg_gain = gain.rolling(period).mean()
-        avg_loss = loss.rolling(period).mean()
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+    def get_lookback(self) -> int:
+        """
+        Return the bars of history needed before a bar.
         
-        return rsi
+        Exact for the rolling indicators; recursive ones (EMA, MACD, Wilder
+        smoothing, KAMA) count the bars until the weight left on older
+        history falls below EWM_TOLERANCE.
+        """
+        return IndicatorGraph(dict.fromkeys(INPUT_FIELDS)).lookback(list(self._requested_nodes().values()))
     
-    def _calculate_atr(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
-        """Calculate Average True Range."""
-        high = pd.Series(data['high'].values, index=data.index)
-        low = pd.Series(data['low'].values, index=data.index)
-        close = pd.Series(data['close'].values, index=data.index)
-        
-        tr1 = high - low
-        tr2 = np.abs(high - close.shift())
-        tr3 = np.abs(low - close.shift())
-        
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return true_range.rolling(period).mean()
+    def _requested_nodes(self) -> Dict[str, NodeKey]:
+        """Graph node of every requested feature."""
+        if self.features is None:
+            return self._indicator_nodes()
+        return {name: self.resolve_feature(name) for name in self.features}
     
-    def _calculate_adx(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
-        """Calculate Average Directional Index."""
-        high = pd.Series(data['high'].values, index=data.index)
-        low = pd.Series(data['low'].values, index=data.index)
-        
-        # Calculate Directional Movement
-        up_move = high - high.shift()
-        down_move = low.shift() - low
-        
-        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+    def _indicator_nodes(self) -> Dict[str, NodeKey]:
+        """Graph node of every output column, for the configured periods."""
+        p = self.periods
+        smoothing = SMOOTHING_OPERATIONS[self.smoothing]
+        macd = ('macd', p['ema_fast'], p['ema_slow'])
+        volume_sma = ('mean', 'volume', p['volume_sma'])
         
-        # Convert to Series
-        plus_dm_series = pd.Series(plus_dm, index=data.index)
-        minus_dm_series = pd.Series(minus_dm, index=data.index)
-        
-        # Calculate True Range for this calculation
-        atr_series = self._calculate_atr(data, 1)  # 1-period TR
-        
-        # Smooth the values
-        plus_dm_smooth = plus_dm_series.rolling(period).mean()
-        minus_dm_smooth = minus_dm_series.rolling(period).mean()
-        tr_smooth = atr_series.rolling(period).mean()
+        return {
+            # Moving averages
+            'sma_20': ('mean', 'close', p['sma_short']),
+            'sma_50': ('mean', 'close', p['sma_long']),
+            'ema_12': ('ewm', 'close', p['ema_fast']),
+            'ema_26': ('ewm', 'close', p['ema_slow']),
+            # RSI
+            'rsi_14': ('rsi', 'close', p['rsi'], smoothing),
+            # MACD
+            'macd': macd,
+            'macd_signal': ('ewm', macd, MACD_SIGNAL_SPAN),
+            'macd_histogram': ('macd_histogram', p['ema_fast'], p['ema_slow'], MACD_SIGNAL_SPAN),
+            # Bollinger Bands
+            'bb_upper': ('bb_upper', p['bb']),
+            'bb_middle': ('mean', 'close', p['bb']),
+            'bb_lower': ('bb_lower', p['bb']),
+            'bb_position': ('bb_position', p['bb']),
+            'bb_width': ('bb_width', p['bb']),
+            # Volume
+            'volume_sma_20': volume_sma,
+            'volume_ratio': ('ratio', 'volume', volume_sma),
+            # Volatility
+            'atr_14': (smoothing, ('true_range',), p['atr']),
+            # Trend
+            'adx_14': ('adx', p['adx'], smoothing)
+        }
+    
+    def _calculate_indicators(self, data: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Calculate the requested technical indicators.
         
-        # Calculate Directional Indicators
-        plus_di = 100 * (plus_dm_smooth / tr_smooth)
-        minus_di = 100 * (minus_dm_smooth / tr_smooth)
+        Intermediates shared between indicators (e.g. the 20-bar mean behind
+        sma_20 and bb_middle, or the true range behind ATR and ADX) are
+        computed once, and nodes not needed by the requested outputs are
+        never evaluated.
         
-        # Calculate ADX
-        di_diff = np.abs(plus_di - minus_di)
-        di_sum = plus_di + minus_di
-        dx = 100 * (di_diff / di_sum)
-        return dx.rolling(period).mean()
+        Args:
+            data: high, low, close and volume as (bar x symbol) arrays
+            
+        Returns:
+            Dictionary of indicator name -> (bar x symbol) array
+        """
+        return IndicatorGraph(data).evaluate_many(self._requested_nodes())
     
     def get_output_schema(self) -> Dict[str, str]:
         """Return the schema of transformed data."""
-        return {
+        schema = {
             'symbol': 'VARCHAR(10)',
             'date': 'DATE',
             # Moving averages
@@ -220,6 +305,10 @@ class TechnicalIndicators(BaseTransformer):
             # Trend
             'adx_14': 'DECIMAL(6,2)'
         }
+        
+        if self.features is not None:
+            schema = {name: schema.get(name, 'DECIMAL(12,6)') for name in ['symbol', 'date'] + self.features}
+        return schema
 
 
 class FundamentalRatios(BaseTransformer):
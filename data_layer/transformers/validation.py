@@ -0,0 +1,180 @@
+"""
+Output Validation
+
+Null ratios, infinity counts and dtype checks for transformer outputs,
+computed with one vectorized reduction per pandas block (all float64
+columns of a frame usually live in a single 2D block), without copying the
+frame. Very large frames can be validated on a random sample of rows.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Columns with a larger share of missing values are reported
+MAX_MISSING_RATIO = 0.5
+
+# Rows reduced at a time, keeping the temporary masks small
+CHUNK_ROWS = 1 << 16
+
+# SQL types of the output schemas that must be stored in numeric columns
+NUMERIC_SQL_TYPES = ('DECIMAL', 'NUMERIC', 'FLOAT', 'DOUBLE', 'REAL', 'INTEGER', 'BIGINT', 'SMALLINT')
+
+
+@dataclass
+class ValidationReport:
+    """Data quality summary of a transformer output."""
+    n_rows: int
+    n_sampled: int
+    null_ratio: Dict[str, float] = field(default_factory=dict)  # Numeric columns
+    inf_count: Dict[str, int] = field(default_factory=dict)  # Numeric columns with infinities (in the sample)
+    dtype_mismatches: Dict[str, str] = field(default_factory=dict)  # Column -> dtype, for non-numeric schema columns
+    max_missing_ratio: float = MAX_MISSING_RATIO
+
+    @property
+    def sparse_columns(self) -> Dict[str, float]:
+        """Numeric columns whose missing ratio exceeds max_missing_ratio."""
+        return {column: ratio for column, ratio in self.null_ratio.items() if ratio > self.max_missing_ratio}
+
+    @property
+    def is_valid(self) -> bool:
+        """False if the output is empty or a numeric schema column is not numeric."""
+        return self.n_rows > 0 and not self.dtype_mismatches
+
+    def warnings(self) -> List[str]:
+        """Human readable findings."""
+        messages = []
+        if self.n_rows == 0:
+            messages.append("Output data is empty")
+        for column, ratio in self.sparse_columns.items():
+            messages.append(f"Column '{column}' has {ratio:.1%} missing values")
+        for column, count in self.inf_count.items():
+            messages.append(f"Column '{column}' has {count} infinite values")
+        for column, dtype in self.dtype_mismatches.items():
+            messages.append(f"Column '{column}' should be numeric but has dtype {dtype}")
+        return messages
+
+
+def _internal_blocks(data: pd.DataFrame) -> Optional[List[Tuple[np.ndarray, np.ndarray]]]:
+    """
+    Numeric block arrays from pandas' block manager, without copying.
+
+    This reads private pandas internals, so any layout it does not recognize
+    returns None and the caller falls back to the public API.
+    """
+    try:
+        blocks = [(np.asarray(block.mgr_locs.as_array), block.values) for block in data._mgr.blocks]
+    except AttributeError:
+        return None
+
+    numeric = []
+    for positions, values in blocks:
+        if not isinstance(values, np.ndarray) or values.dtype.kind not in 'fiub':
+            continue
+        if values.size != len(positions) * len(data):
+            return None
+        numeric.append((positions, values.reshape(len(positions), len(data))))
+    return numeric
+
+
+def _dtype_groups(data: pd.DataFrame) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Numeric columns grouped by dtype through the public API (one copy per group)."""
+    groups: Dict[np.dtype, List[int]] = {}
+    for position, dtype in enumerate(data.dtypes):
+        if isinstance(dtype, np.dtype) and dtype.kind in 'fiub':
+            groups.setdefault(dtype, []).append(position)
+    return [(np.asarray(positions), data.iloc[:, positions].to_numpy(dtype=dtype).T)
+            for dtype, positions in groups.items()]
+
+
+def _numeric_blocks(data: pd.DataFrame) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Get (column positions, columns x rows array) for the numeric columns.
+
+    Uses the frame's own block storage when the pandas internals look as
+    expected (all float64 columns usually share one block, so nothing is
+    copied), and select-by-dtype copies otherwise.
+    """
+    blocks = _internal_blocks(data)
+    if blocks is None:
+        logger.debug("Unrecognized pandas block layout, validating per dtype group")
+        return _dtype_groups(data)
+    return blocks
+
+
+def validate_frame(data: pd.DataFrame,
+                   schema: Optional[Dict[str, str]] = None,
+                   sample_rows: Optional[int] = None,
+                   max_missing_ratio: float = MAX_MISSING_RATIO,
+                   seed: int = 0) -> ValidationReport:
+    """
+    Summarize the quality of a frame in one pass over its numeric blocks.
+
+    Args:
+        data: Frame to validate
+        schema: Column name -> SQL type; numeric types must be held in
+            numeric columns
+        sample_rows: Validate a random sample of this many rows when the
+            frame is larger (None scans every row)
+        max_missing_ratio: Missing share above which a column is reported
+        seed: Seed of the row sample
+
+    Returns:
+        ValidationReport
+    """
+    n_rows = len(data)
+    rows = None
+    if sample_rows is not None and n_rows > sample_rows:
+        rows = np.sort(np.random.default_rng(seed).choice(n_rows, size=sample_rows, replace=False))
+    n_sampled = n_rows if rows is None else len(rows)
+
+    report = ValidationReport(n_rows=n_rows, n_sampled=n_sampled, max_missing_ratio=max_missing_ratio)
+    if n_rows == 0:
+        return report
+
+    if rows is not None:
+        chunks = [rows[start:start + CHUNK_ROWS] for start in range(0, n_sampled, CHUNK_ROWS)]
+    else:
+        chunks = [slice(start, start + CHUNK_ROWS) for start in range(0, n_rows, CHUNK_ROWS)]
+
+    columns = data.columns
+    numeric_positions: List[int] = []
+    for positions, values in _numeric_blocks(data):
+        numeric_positions.extend(positions)
+        nulls = np.zeros(len(positions), dtype=np.int64)
+        infs = np.zeros(len(positions), dtype=np.int64)
+
+        if values.dtype.kind == 'f':  # Integer and boolean blocks hold no missing values
+            for chunk in chunks:
+                sample = values[:, chunk]
+                mask = np.isnan(sample)
+                nulls += [np.count_nonzero(column) for column in mask]
+                mask = np.isinf(sample, out=mask)
+                infs += [np.count_nonzero(column) for column in mask]
+
+        for position, null_count, inf_count in zip(positions, nulls, infs):
+            report.null_ratio[columns[position]] = float(null_count / n_sampled)
+            if inf_count:
+                report.inf_count[columns[position]] = int(inf_count)
+
+    # Nullable extension columns (Int64, Float64) are not numpy blocks
+    block_positions = set(numeric_positions)
+    for position, dtype in enumerate(data.dtypes):
+        if position not in block_positions and not isinstance(dtype, np.dtype) \
+                and pd.api.types.is_numeric_dtype(dtype):
+            series = data.iloc[:, position]
+            report.null_ratio[columns[position]] = float(
+                (series.iloc[rows] if rows is not None else series).isna().mean())
+
+    if schema:
+        for column, sql_type in schema.items():
+            if (column in columns and sql_type.upper().startswith(NUMERIC_SQL_TYPES)
+                    and not pd.api.types.is_numeric_dtype(data[column])):
+                report.dtype_mismatches[column] = str(data[column].dtype)
+
+    return report
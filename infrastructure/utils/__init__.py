@@ -1,5 +1,6 @@
 from .config import Config
 from .data_loader import DataLoader
 from .logger import setup_logging
+from .compact import compact_frame, expand_frame
 
-__all__ = ['Config', 'DataLoader', 'setup_logging']
\ No newline at end of file
+__all__ = ['Config', 'DataLoader', 'setup_logging', 'compact_frame', 'expand_frame']
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Compact Frame Representation
+
+Opt-in memory-saving dtypes for market and feature frames: float32 values,
+categorical symbols and int32 day numbers (days since 1970-01-01) for
+dates. A compact frame takes about half the memory of the float64 /
+object / datetime64 original; prices and indicators keep about 7
+significant digits.
+"""
+
+from typing import Dict, Iterable, Union
+import logging
+
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COMPACT_FLOAT = np.float32
+
+# Bound on relative_errors() of compact technical indicators against float64
+FLOAT32_TOLERANCE = 1e-5
+
+# Day number stored for missing dates
+MISSING_DAY = np.iinfo(np.int32).min
+
+# Columns holding symbols and dates in loader and transformer frames
+SYMBOL_COLUMNS = ('ticker', 'symbol')
+DATE_COLUMNS = ('date',)
+
+
+def to_day_numbers(dates: Union[pd.Series, pd.Index, np.ndarray]) -> np.ndarray:
+    """
+    Convert dates to int32 days since 1970-01-01.
+
+    Args:
+        dates: Dates (anything pd.to_datetime accepts)
+
+    Returns:
+        int32 array, MISSING_DAY for missing dates
+    """
+    values = pd.to_datetime(dates)
+    values = np.asarray(values, dtype='datetime64[ns]')
+    days = values.astype('datetime64[D]').astype(np.int64)
+    return np.where(np.isnat(values), MISSING_DAY, days).astype(np.int32)
+
+
+def from_day_numbers(days: Union[pd.Series, np.ndarray]) -> pd.DatetimeIndex:
+    """
+    Convert int32 day numbers back to dates.
+
+    Args:
+        days: Days since 1970-01-01
+
+    Returns:
+        DatetimeIndex (NaT for MISSING_DAY)
+    """
+    days = np.asarray(days, dtype=np.int64)
+    values = days.astype('datetime64[D]').astype('datetime64[ns]')
+    values[days == MISSING_DAY] = np.datetime64('NaT')
+    return pd.DatetimeIndex(values)
+
+
+def as_dates(dates: Union[pd.Series, pd.Index, np.ndarray]) -> pd.DatetimeIndex:
+    """
+    Read a date column in either representation.
+
+    Args:
+        dates: Day numbers (integer dtype) or anything pd.to_datetime accepts
+
+    Returns:
+        DatetimeIndex
+    """
+    if pd.api.types.is_integer_dtype(dates):
+        return from_day_numbers(dates)
+    return pd.DatetimeIndex(pd.to_datetime(dates))
+
+
+def compact_frame(frame: pd.DataFrame,
+                  symbol_columns: Iterable[str] = SYMBOL_COLUMNS,
+                  date_columns: Iterable[str] = DATE_COLUMNS) -> pd.DataFrame:
+    """
+    Convert a frame to the compact representation.
+
+    float64 columns become float32, symbol columns become categorical and
+    date columns become int32 day numbers. Integer columns (e.g. volume)
+    are left alone, since float32 cannot hold large counts exactly.
+
+    Args:
+        frame: Market or feature DataFrame
+        symbol_columns: Columns to store as categoricals
+        date_columns: Columns to store as day numbers
+
+    Returns:
+        New DataFrame in compact dtypes
+    """
+    symbol_columns, date_columns = set(symbol_columns), set(date_columns)
+    columns = {}
+    for column in frame.columns:
+        series = frame[column]
+        if column in date_columns and not pd.api.types.is_integer_dtype(series):
+            columns[column] = to_day_numbers(series)
+        elif column in symbol_columns and not isinstance(series.dtype, pd.CategoricalDtype):
+            columns[column] = series.astype('category')
+        elif series.dtype == np.float64:
+            columns[column] = series.to_numpy(dtype=COMPACT_FLOAT)
+        else:
+            columns[column] = series
+    result = pd.DataFrame(columns, index=frame.index)
+
+    logger.debug(f"Compacted frame from {frame.memory_usage(deep=True).sum() / 1e6:.1f} MB "
+                 f"to {result.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    return result
+
+
+def expand_frame(frame: pd.DataFrame, date_columns: Iterable[str] = DATE_COLUMNS) -> pd.DataFrame:
+    """
+    Convert a compact frame back to float64 values, object symbols and datetime dates.
+
+    Args:
+        frame: Compact DataFrame
+        date_columns: Columns holding day numbers
+
+    Returns:
+        New DataFrame in the default dtypes
+    """
+    date_columns = set(date_columns)
+    columns = {}
+    for column in frame.columns:
+        series = frame[column]
+        if column in date_columns and pd.api.types.is_integer_dtype(series):
+            columns[column] = from_day_numbers(series)
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            columns[column] = series.astype(object)
+        elif series.dtype == COMPACT_FLOAT:
+            columns[column] = series.to_numpy(dtype=np.float64)
+        else:
+            columns[column] = series
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def relative_errors(reference: pd.DataFrame, compact: pd.DataFrame) -> Dict[str, float]:
+    """
+    Largest deviation of every float column of a compact frame from a float64 reference.
+
+    Deviations are scaled by the largest absolute reference value of the
+    column, so columns that cross zero (MACD) are not inflated. Values that
+    are missing in exactly one frame count as an infinite error.
+
+    Args:
+        reference: float64 frame
+        compact: Same rows and columns in compact dtypes
+
+    Returns:
+        Column -> max |compact - reference| / max |reference|
+    """
+    errors = {}
+    for column in reference.columns:
+        if column not in compact.columns or not pd.api.types.is_float_dtype(reference[column]):
+            continue
+        expected = reference[column].to_numpy(dtype=np.float64)
+        actual = compact[column].to_numpy(dtype=np.float64)
+        if (np.isnan(expected) != np.isnan(actual)).any():
+            errors[column] = np.inf
+            continue
+
+        scale = np.nanmax(np.abs(expected)) if not np.isnan(expected).all() else 0.0
+        deviation = np.nanmax(np.abs(actual - expected)) if scale > 0 else 0.0
+        errors[column] = float(deviation / scale) if scale > 0 else 0.0
+    return errors
@@ -5,6 +5,8 @@ from typing import List, Optional, Dict, Any, Tuple
 import logging
 from datetime import datetime, timedelta
 
+from .compact import compact_frame
+
 logger = logging.getLogger(__name__)
 
 class DataLoader:
@@ -15,21 +17,25 @@ class DataLoader:
     and prepare it for strategy backtesting and analysis.
     """
     
-    def __init__(self, db_connection: str):
+    def __init__(self, db_connection: str, compact: bool = False):
         """
         Initialize DataLoader.
         
         Args:
             db_connection: Database connection string
+            compact: Return daily data with float32 prices, categorical
+                tickers and int32 day-number dates (see utils.compact)
         """
         self.db_connection = db_connection
         self.engine = create_engine(db_connection)
+        self.compact = compact
         
     def load_daily_data(self, 
                        symbols: List[str],
                        start_date: Optional[str] = None,
                        end_date: Optional[str] = None,
-                       columns: Optional[List[str]] = None) -> pd.DataFrame:
+                       columns: Optional[List[str]] = None,
+                       compact: Optional[bool] = None) -> pd.DataFrame:
         """
         Load daily market data for specified symbols.
         
@@ -38,6 +44,7 @@ class DataLoader:
             start_date: Start date (YYYY-MM-DD format)
             end_date: End date (YYYY-MM-DD format)
             columns: Specific columns to load (defaults to all)
+            compact: Use the compact representation (defaults to the loader setting)
             
         Returns:
             DataFrame with daily market data
@@ -70,6 +77,9 @@ class DataLoader:
             df = pd.read_sql_query(text(query), self.engine, params=params)
             df['date'] = pd.to_datetime(df['date'])
             
+            if self.compact if compact is None else compact:
+                df = compact_frame(df)
+            
             logger.info(f"Loaded {len(df)} daily records for {len(symbols)} symbols")
             return df
             
@@ -1,5 +1,12 @@
 from .engine import BacktestEngine
 from .events import Event, MarketEvent, SignalEvent, OrderEvent, FillEvent
-from .metrics import PerformanceMetrics
+from .metrics import PerformanceMetrics, OnlineMetrics
+from .order_book import OrderBook
+from .panel import MarketPanel
+from .rolling import RollingMetrics, write_model_performance
+from .sweep import ParameterSweep
+from .walk_forward import WalkForwardOptimizer
 
-__all__ = ['BacktestEngine', 'Event', 'MarketEvent', 'SignalEvent', 'OrderEvent', 'FillEvent', 'PerformanceMetrics']
\ No newline at end of file
+__all__ = ['BacktestEngine', 'Event', 'MarketEvent', 'SignalEvent', 'OrderEvent', 'FillEvent', 'PerformanceMetrics',
+           'OnlineMetrics', 'MarketPanel', 'OrderBook', 'RollingMetrics', 'write_model_performance',
+           'ParameterSweep', 'WalkForwardOptimizer']
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Backtesting Micro-Benchmarks
+
+Standalone timing helpers for the hot paths of the backtesting engine.
+Run as a module to print results:
+
+    python -m model_testing.backtesting.benchmarks
+"""
+
+import queue
+import time
+from typing import Dict
+
+import pandas as pd
+
+from .event_bus import EventBus
+from .events import (
+    EventType, MarketEvent, SignalEvent, OrderEvent, FillEvent, OrderType, OrderDirection
+)
+
+
+def _signal_events(timestamp: pd.Timestamp, n_symbols: int):
+    return [
+        SignalEvent(timestamp=timestamp, symbol=f"SYM{i}", signal_type=1, price=100.0)
+        for i in range(n_symbols)
+    ]
+
+
+def _order_for(signal: SignalEvent) -> OrderEvent:
+    return OrderEvent(
+        timestamp=signal.timestamp,
+        symbol=signal.symbol,
+        order_type=OrderType.MARKET,
+        quantity=1.0,
+        direction=OrderDirection.BUY
+    )
+
+
+def _fill_for(order: OrderEvent) -> FillEvent:
+    return FillEvent(
+        timestamp=order.timestamp,
+        symbol=order.symbol,
+        quantity=order.quantity,
+        direction=order.direction,
+        fill_price=100.0
+    )
+
+
+def _run_legacy_queue(n_symbols: int, n_bars: int) -> int:
+    """Replicates the original queue.Queue loop, including the queue scan on each order."""
+    events = queue.Queue()
+    dispatched = 0
+
+    for bar in range(n_bars):
+        timestamp = pd.Timestamp('2024-01-01') + pd.Timedelta(days=bar)
+        events.put(MarketEvent(timestamp=timestamp, data={}))
+
+        while not events.empty():
+            try:
+                event = events.get(False)
+            except queue.Empty:
+                break
+            dispatched += 1
+
+            if event.type == EventType.MARKET:
+                for signal in _signal_events(event.timestamp, n_symbols):
+                    events.put(signal)
+            elif event.type == EventType.SIGNAL:
+                events.put(_order_for(event))
+            elif event.type == EventType.ORDER:
+                market_event = None
+                temp_events = []
+                while not events.empty():
+                    try:
+                        temp_event = events.get(False)
+                        temp_events.append(temp_event)
+                        if temp_event.type == EventType.MARKET:
+                            market_event = temp_event
+                            break
+                    except queue.Empty:
+                        break
+                for temp_event in temp_events:
+                    events.put(temp_event)
+                if market_event is not None:
+                    events.put(_fill_for(event))
+
+    return dispatched
+
+
+def _run_event_bus(n_symbols: int, n_bars: int) -> int:
+    """Same workload on the deque-backed EventBus with current-bar lookup."""
+    bus = EventBus()
+    bus.subscribe(EventType.MARKET, lambda event: [bus.put(s) for s in _signal_events(event.timestamp, n_symbols)])
+    bus.subscribe(EventType.SIGNAL, lambda event: bus.put(_order_for(event)))
+    bus.subscribe(EventType.ORDER, lambda event: bus.current_bar is not None and bus.put(_fill_for(event)))
+
+    dispatched = 0
+    for bar in range(n_bars):
+        timestamp = pd.Timestamp('2024-01-01') + pd.Timedelta(days=bar)
+        bus.put(MarketEvent(timestamp=timestamp, data={}))
+        dispatched += bus.dispatch()
+
+    return dispatched
+
+
+def benchmark_event_throughput(n_symbols: int = 1000, n_bars: int = 5) -> Dict[str, float]:
+    """
+    Compare event throughput of the legacy queue loop and the EventBus.
+
+    Each bar publishes one market event, one signal and one order per symbol,
+    and (on the bus) one fill per order.
+
+    Args:
+        n_symbols: Number of symbols signalling on every bar
+        n_bars: Number of bars to simulate
+
+    Returns:
+        Dictionary with events/sec for both implementations and the speedup
+    """
+    start = time.perf_counter()
+    legacy_events = _run_legacy_queue(n_symbols, n_bars)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bus_events = _run_event_bus(n_symbols, n_bars)
+    bus_seconds = time.perf_counter() - start
+
+    legacy_rate = legacy_events / legacy_seconds
+    bus_rate = bus_events / bus_seconds
+
+    return {
+        'n_symbols': n_symbols,
+        'n_bars': n_bars,
+        'legacy_events': legacy_events,
+        'legacy_events_per_sec': legacy_rate,
+        'event_bus_events': bus_events,
+        'event_bus_events_per_sec': bus_rate,
+        'speedup': bus_rate / legacy_rate
+    }
+
+
+if __name__ == '__main__':
+    results = benchmark_event_throughput()
+    print(f"Event throughput at {results['n_symbols']} symbols x {results['n_bars']} bars")
+    print(f"queue.Queue (legacy): {results['legacy_events_per_sec']:>12,.0f} events/sec")
+    print(f"EventBus:             {results['event_bus_events_per_sec']:>12,.0f} events/sec")
+    print(f"Speedup:              {results['speedup']:>12.1f}x")
@@ -0,0 +1,167 @@
+"""
+Bootstrap Confidence Intervals
+
+Resamples a return series with the stationary or moving-block bootstrap and
+reports confidence intervals for Sharpe ratio, CAGR and maximum drawdown.
+Each chunk of resamples is drawn as a single (samples x T) index matrix and
+scored with the batched metrics kernel, so no Python loop runs per resample.
+Chunks get independent random streams spawned from one seed, which makes the
+results identical however the chunks are spread over worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Union
+import logging
+
+import pandas as pd
+import numpy as np
+
+from .metrics import TRADING_DAYS_PER_YEAR, compute_metrics_batch
+
+logger = logging.getLogger(__name__)
+
+# Metrics reported by bootstrap_metrics (keys of compute_metrics_batch)
+BOOTSTRAP_METRICS = ['sharpe_ratio', 'annualized_return', 'max_drawdown']
+
+BOOTSTRAP_METHODS = ('stationary', 'block')
+
+
+def bootstrap_indices(rng: np.random.Generator,
+                      n_samples: int,
+                      n_periods: int,
+                      block_size: int,
+                      method: str = 'stationary') -> np.ndarray:
+    """
+    Draw a matrix of resampling indices.
+
+    Args:
+        rng: Random generator
+        n_samples: Number of resampled series (rows)
+        n_periods: Length of each series (columns)
+        block_size: Block length (expected block length for the stationary bootstrap)
+        method: 'stationary' (Politis-Romano, geometric block lengths) or
+            'block' (circular moving blocks of fixed length)
+
+    Returns:
+        Integer array with shape (n_samples, n_periods) indexing into the series
+    """
+    if method == 'block':
+        n_blocks = -(-n_periods // block_size)
+        starts = rng.integers(0, n_periods, size=(n_samples, n_blocks))
+        indices = (starts[:, :, None] + np.arange(block_size)).reshape(n_samples, -1)[:, :n_periods]
+        return indices % n_periods
+
+    if method == 'stationary':
+        # A new block starts at each position with probability 1 / block_size;
+        # otherwise the series continues from the previous index (circularly)
+        new_block = rng.random((n_samples, n_periods)) < 1.0 / block_size
+        new_block[:, 0] = True
+        starts = rng.integers(0, n_periods, size=(n_samples, n_periods))
+
+        positions = np.arange(n_periods)
+        block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+        offsets = positions - block_start
+        return (np.take_along_axis(starts, block_start, axis=1) + offsets) % n_periods
+
+    raise ValueError(f"Unknown bootstrap method '{method}', expected one of {BOOTSTRAP_METHODS}")
+
+
+def _bootstrap_chunk(returns: np.ndarray,
+                     n_samples: int,
+                     block_size: int,
+                     method: str,
+                     seed_sequence: np.random.SeedSequence,
+                     risk_free_rate: float,
+                     periods_per_year: int) -> Dict[str, np.ndarray]:
+    """Resample and score one chunk; also the process pool task."""
+    rng = np.random.default_rng(seed_sequence)
+    indices = bootstrap_indices(rng, n_samples, len(returns), block_size, method)
+
+    # Equity curves starting at 1.0, one column per resample
+    curves = np.ones((len(returns) + 1, n_samples))
+    np.cumprod(1 + returns[indices].T, axis=0, out=curves[1:])
+
+    metrics = compute_metrics_batch(curves, len(returns) / periods_per_year, risk_free_rate=risk_free_rate)
+    return {key: metrics[key] for key in BOOTSTRAP_METRICS}
+
+
+def bootstrap_metrics(returns: Union[pd.Series, np.ndarray],
+                      n_samples: int = 10000,
+                      block_size: Optional[int] = None,
+                      method: str = 'stationary',
+                      confidence_level: float = 0.95,
+                      chunk_size: int = 1000,
+                      seed: Optional[int] = None,
+                      max_workers: int = 1,
+                      risk_free_rate: float = 0.02,
+                      periods_per_year: int = TRADING_DAYS_PER_YEAR) -> pd.DataFrame:
+    """
+    Bootstrap confidence intervals for Sharpe ratio, CAGR and maximum drawdown.
+
+    Metrics are computed exactly as PerformanceMetrics does, on equity curves
+    compounded from the resampled returns, annualized over len(returns) /
+    periods_per_year years.
+
+    Args:
+        returns: Periodic (daily) returns; NaNs are dropped
+        n_samples: Number of bootstrap resamples
+        block_size: (Expected) block length; defaults to round(T ** (1/3))
+        method: 'stationary' or 'block'
+        confidence_level: Two-sided confidence level of the percentile intervals
+        chunk_size: Resamples drawn per batch, bounding peak memory to about
+            chunk_size x T index and return matrices
+        seed: Seed for reproducible results (independent of max_workers)
+        max_workers: Processes to spread chunks over (1 runs in-process)
+        risk_free_rate: Annual risk-free rate for the Sharpe ratio
+        periods_per_year: Periods per year used to annualize
+
+    Returns:
+        DataFrame indexed by metric with columns estimate (full sample),
+        mean, std, lower and upper
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[~np.isnan(returns)]
+    n_periods = len(returns)
+    if n_periods < 2:
+        raise ValueError("At least two returns are required to bootstrap")
+
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unknown bootstrap method '{method}', expected one of {BOOTSTRAP_METHODS}")
+
+    block_size = int(block_size or max(1, round(n_periods ** (1 / 3))))
+    chunk_sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    logger.info(f"Bootstrapping {n_samples} resamples of {n_periods} returns "
+                f"({method}, block size {block_size}) in {len(chunk_sizes)} chunks")
+
+    tasks = [
+        (returns, size, block_size, method, seed_sequence, risk_free_rate, periods_per_year)
+        for size, seed_sequence in zip(chunk_sizes, seed_sequences)
+    ]
+    if max_workers <= 1:
+        chunks = [_bootstrap_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(_bootstrap_chunk, *zip(*tasks)))
+
+    curve = np.ones((n_periods + 1, 1))
+    np.cumprod(1 + returns, out=curve[1:, 0])
+    estimate = compute_metrics_batch(curve, n_periods / periods_per_year, risk_free_rate=risk_free_rate)
+
+    alpha = (1 - confidence_level) / 2
+    rows: List[Dict[str, float]] = []
+    for key in BOOTSTRAP_METRICS:
+        samples = np.concatenate([chunk[key] for chunk in chunks])
+        samples = samples[np.isfinite(samples)]
+        lower, upper = np.quantile(samples, [alpha, 1 - alpha]) if len(samples) else (np.nan, np.nan)
+        rows.append({
+            'metric': key,
+            'estimate': float(estimate[key][0]),
+            'mean': float(samples.mean()) if len(samples) else np.nan,
+            'std': float(samples.std(ddof=1)) if len(samples) > 1 else np.nan,
+            'lower': float(lower),
+            'upper': float(upper)
+        })
+
+    return pd.DataFrame(rows).set_index('metric')
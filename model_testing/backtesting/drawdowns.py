@@ -0,0 +1,163 @@
+"""
+Drawdown Episode Analysis
+
+Underwater curves and drawdown episodes (peak, trough, recovery, depth and
+durations) for one or many equity curves. Episodes are located from the
+transitions of the underwater mask and their troughs from segment reductions
+over the flattened curves, so the whole batch is processed in linear time
+without a Python loop per curve or per episode.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Any, List, Optional, Sequence, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+EPISODE_COLUMNS = [
+    'curve', 'episode', 'peak_index', 'trough_index', 'recovery_index', 'peak_date', 'trough_date',
+    'recovery_date', 'depth', 'decline_bars', 'recovery_bars', 'duration_bars', 'recovered'
+]
+
+
+def _as_curve_matrix(equity_curves: Union[pd.DataFrame, pd.Series, np.ndarray]) -> np.ndarray:
+    """Convert input curves to a (time x curves) float array."""
+    if isinstance(equity_curves, (pd.DataFrame, pd.Series)):
+        values = equity_curves.to_numpy(dtype=np.float64)
+    else:
+        values = np.asarray(equity_curves, dtype=np.float64)
+    return values.reshape(len(values), -1)
+
+
+def underwater_curve(equity_curves: Union[pd.DataFrame, pd.Series, np.ndarray]) -> np.ndarray:
+    """
+    Drawdown from the running peak at every bar.
+
+    Args:
+        equity_curves: Equity values, one curve or (time x curves)
+
+    Returns:
+        Array of the same shape with values <= 0 (0 at new highs)
+    """
+    values = np.asarray(equity_curves, dtype=np.float64)
+    running_max = np.fmax.accumulate(values, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return values / running_max - 1
+
+
+def drawdown_episodes(equity_curves: Union[pd.DataFrame, pd.Series, np.ndarray],
+                      dates: Optional[Sequence] = None,
+                      names: Optional[List[Any]] = None) -> pd.DataFrame:
+    """
+    List every drawdown episode of one or many equity curves.
+
+    An episode starts at the bar after a running peak where the curve first
+    falls below it, reaches its deepest point at the trough, and ends at the
+    recovery bar where the curve is back at (or above) the peak. Episodes
+    still open at the end have no recovery.
+
+    Args:
+        equity_curves: Equity values, one curve or (time x curves); a
+            DataFrame/Series index is used as dates and columns as names
+        dates: Dates of the rows (optional)
+        names: Curve labels (defaults to DataFrame columns or 0..n-1)
+
+    Returns:
+        DataFrame with one row per episode, columns as in EPISODE_COLUMNS.
+        depth is positive (0.25 = 25% below peak); bar counts are measured
+        from the peak bar.
+    """
+    if isinstance(equity_curves, pd.DataFrame):
+        names = names if names is not None else list(equity_curves.columns)
+    elif isinstance(equity_curves, pd.Series):
+        names = names if names is not None else [equity_curves.name if equity_curves.name is not None else 0]
+    if isinstance(equity_curves, (pd.DataFrame, pd.Series)) and dates is None:
+        dates = equity_curves.index
+
+    values = _as_curve_matrix(equity_curves)
+    n_bars, n_curves = values.shape
+    names = names if names is not None else list(range(n_curves))
+
+    underwater = underwater_curve(values).T  # (curves x time), rows contiguous
+    in_drawdown = underwater < 0
+
+    # Transitions of the underwater mask, padded with False at both ends
+    padded = np.zeros((n_curves, n_bars + 2), dtype=bool)
+    padded[:, 1:-1] = in_drawdown
+    start_curve, start_bar = np.nonzero(~padded[:, :-1] & padded[:, 1:])
+    _, end_bar = np.nonzero(padded[:, :-1] & ~padded[:, 1:])
+    n_episodes = len(start_bar)
+
+    if n_episodes == 0:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    # Trough: deepest point of each [start, end) segment of the flattened curves
+    flat = np.append(underwater.ravel(), np.nan)
+    seg_start = start_curve * n_bars + start_bar
+    seg_stop = start_curve * n_bars + end_bar
+    bounds = np.column_stack((seg_start, seg_stop)).ravel()
+    depth = np.fmin.reduceat(flat, bounds)[::2]
+
+    lengths = seg_stop - seg_start
+    segment = np.repeat(np.arange(n_episodes), lengths)
+    positions = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(seg_start, lengths)
+    hits = flat[positions] == depth[segment]
+    _, first_hit = np.unique(segment[hits], return_index=True)
+    trough_bar = positions[hits][first_hit] - start_curve * n_bars
+
+    peak_bar = start_bar - 1
+    recovered = end_bar < n_bars
+    recovery_bar = np.where(recovered, end_bar, -1)
+
+    episodes = pd.DataFrame({
+        'curve': np.asarray(names, dtype=object)[start_curve],
+        'episode': np.arange(n_episodes) - np.searchsorted(start_curve, start_curve),
+        'peak_index': peak_bar,
+        'trough_index': trough_bar,
+        'recovery_index': pd.array(np.where(recovered, recovery_bar, 0), dtype='Int64'),
+        'depth': -depth,
+        'decline_bars': trough_bar - peak_bar,
+        'recovery_bars': pd.array(recovery_bar - trough_bar, dtype='Int64'),
+        'duration_bars': np.where(recovered, recovery_bar, n_bars - 1) - peak_bar,
+        'recovered': recovered
+    })
+    episodes.loc[~recovered, ['recovery_index', 'recovery_bars']] = pd.NA
+
+    if dates is not None:
+        dates = pd.DatetimeIndex(dates)
+        episodes['peak_date'] = dates[peak_bar]
+        episodes['trough_date'] = dates[trough_bar]
+        episodes['recovery_date'] = pd.Series(dates[np.where(recovered, recovery_bar, 0)]).where(recovered)
+    else:
+        episodes['peak_date'] = pd.NaT
+        episodes['trough_date'] = pd.NaT
+        episodes['recovery_date'] = pd.NaT
+
+    return episodes[EPISODE_COLUMNS]
+
+
+def summarize_episodes(episodes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rank curves by their worst and longest drawdown episodes.
+
+    Args:
+        episodes: Output of drawdown_episodes()
+
+    Returns:
+        DataFrame indexed by curve with episode count, worst depth, longest
+        duration and whether the curve is currently in drawdown, sorted by
+        worst depth (deepest first)
+    """
+    if episodes.empty:
+        return pd.DataFrame(columns=['episodes', 'worst_depth', 'average_depth', 'longest_duration_bars', 'in_drawdown'])
+
+    grouped = episodes.groupby('curve', sort=False)
+    summary = pd.DataFrame({
+        'episodes': grouped.size(),
+        'worst_depth': grouped['depth'].max(),
+        'average_depth': grouped['depth'].mean(),
+        'longest_duration_bars': grouped['duration_bars'].max(),
+        'in_drawdown': ~grouped['recovered'].last()
+    })
+    return summary.sort_values(['worst_depth', 'longest_duration_bars'], ascending=False)
@@ -1,10 +1,9 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
 from collections import deque, defaultdict
 import logging
 from datetime import datetime, timedelta
-import queue
 
 from models.strategies.base import BaseStrategy, SignalType
 from infrastructure.utils import DataLoader, Config
@@ -12,7 +11,12 @@ from .events import (
     Event, EventType, MarketEvent, SignalEvent, OrderEvent, FillEvent,
     OrderType, OrderDirection
 )
-from .metrics import PerformanceMetrics
+from .event_bus import EventBus
+from .metrics import OnlineMetrics, compute_metrics, years_between
+from .order_book import OrderBook
+from .panel import MarketPanel, FIELDS
+from .trades import TradeLedger, trade_statistics
+from .vectorized import simulate_target_weights
 
 logger = logging.getLogger(__name__)
 
@@ -20,42 +24,124 @@ class Portfolio:
     """
     Portfolio management for backtesting.
     
-    Tracks positions, cash, and portfolio value over time.
+    Tracks positions, cash, and portfolio value over time. History is recorded
+    into preallocated NumPy arrays (cash, position value, total value and a
+    dense bars x symbols position matrix) that grow by doubling when full.
+    An optional OnlineMetrics accumulator is fed every new portfolio value.
     """
     
-    def __init__(self, initial_capital: float, commission: float = 0.001):
+    HISTORY_COLUMNS = ['cash', 'position_value', 'total_value']
+    
+    def __init__(self,
+                 initial_capital: float,
+                 commission: float = 0.001,
+                 expected_bars: int = 256,
+                 symbols: Optional[List[str]] = None,
+                 online_metrics: Optional[OnlineMetrics] = None):
         self.initial_capital = initial_capital
         self.commission = commission
+        self.online_metrics = online_metrics
         
         # Current state
         self.cash = initial_capital
         self.positions: Dict[str, float] = defaultdict(float)
         self.portfolio_value = initial_capital
         
+        # Dense position state, one column per symbol
+        self.symbols: List[str] = []
+        self.symbol_index: Dict[str, int] = {}
+        self._position_vector = np.zeros(0)
+        
         # History tracking
-        self.history: List[Dict[str, Any]] = []
+        self._n_bars = 0
+        self._timestamps = np.empty(0, dtype='datetime64[ns]')
+        self._values = np.empty((0, len(self.HISTORY_COLUMNS)))
+        self._position_history = np.zeros((0, 0))
+        self.reserve(expected_bars, symbols)
+        
+    def reserve(self, n_bars: int, symbols: Optional[List[str]] = None) -> None:
+        """
+        Preallocate history for a number of bars and register symbol columns.
         
-    def update_market_value(self, current_prices: Dict[str, float], timestamp: pd.Timestamp):
-        """Update portfolio value based on current market prices."""
+        Args:
+            n_bars: Number of bars the history should hold without growing
+            symbols: Symbols to assign position columns to, in order
+        """
+        for symbol in symbols or []:
+            self._column(symbol)
+        if n_bars > len(self._timestamps):
+            self._grow_rows(n_bars)
+            
+    def _grow_rows(self, capacity: int) -> None:
+        """Reallocate history arrays to hold `capacity` bars."""
+        n = self._n_bars
+        timestamps = np.empty(capacity, dtype='datetime64[ns]')
+        values = np.empty((capacity, len(self.HISTORY_COLUMNS)))
+        position_history = np.zeros((capacity, self._position_history.shape[1]))
+        timestamps[:n] = self._timestamps[:n]
+        values[:n] = self._values[:n]
+        position_history[:n] = self._position_history[:n]
+        self._timestamps, self._values, self._position_history = timestamps, values, position_history
+        
+    def _column(self, symbol: str) -> int:
+        """Get the position column for a symbol, adding it if new."""
+        column = self.symbol_index.get(symbol)
+        if column is not None:
+            return column
+            
+        column = len(self.symbols)
+        self.symbols.append(symbol)
+        self.symbol_index[symbol] = column
+        
+        if column >= len(self._position_vector):
+            capacity = max(2 * len(self._position_vector), column + 1)
+            position_vector = np.zeros(capacity)
+            position_vector[:column] = self._position_vector[:column]
+            position_history = np.zeros((self._position_history.shape[0], capacity))
+            position_history[:, :column] = self._position_history[:, :column]
+            self._position_vector, self._position_history = position_vector, position_history
+            
+        return column
+        
+    def update_market_value(self,
+                            current_prices: Union[Dict[str, float], np.ndarray],
+                            timestamp: pd.Timestamp):
+        """
+        Update portfolio value based on current market prices.
+        
+        Args:
+            current_prices: Dict of symbol -> price, or an array of prices aligned
+                with `symbols` (NaN where a symbol has no price)
+            timestamp: Bar timestamp
+        """
         # Calculate position values
-        position_value = 0.0
-        for symbol, quantity in self.positions.items():
-            if symbol in current_prices and quantity != 0:
-                position_value += quantity * current_prices[symbol]
+        if isinstance(current_prices, np.ndarray):
+            n_symbols = len(current_prices)
+            prices = np.where(np.isnan(current_prices), 0.0, current_prices)
+            position_value = float(self._position_vector[:n_symbols] @ prices)
+        else:
+            position_value = 0.0
+            for symbol, quantity in self.positions.items():
+                if symbol in current_prices and quantity != 0:
+                    position_value += quantity * current_prices[symbol]
                 
         self.portfolio_value = self.cash + position_value
         
         # Record history
-        self.history.append({
-            'timestamp': timestamp,
-            'cash': self.cash,
-            'position_value': position_value,
-            'total_value': self.portfolio_value,
-            'positions': dict(self.positions)
-        })
+        n = self._n_bars
+        if n == len(self._timestamps):
+            self._grow_rows(max(2 * n, 1))
+        self._timestamps[n] = pd.Timestamp(timestamp).to_datetime64()
+        self._values[n] = (self.cash, position_value, self.portfolio_value)
+        self._position_history[n] = self._position_vector
+        self._n_bars = n + 1
+        
+        if self.online_metrics is not None:
+            self.online_metrics.update(self.portfolio_value, timestamp)
         
     def execute_fill(self, fill: FillEvent):
         """Execute a fill and update portfolio."""
+        column = self._column(fill.symbol)
         if fill.direction == OrderDirection.BUY:
             # Buy: decrease cash, increase position
             cost = fill.quantity * fill.fill_price + fill.commission
@@ -66,6 +152,7 @@ class Portfolio:
             proceeds = fill.quantity * fill.fill_price - fill.commission
             self.cash += proceeds
             self.positions[fill.symbol] -= fill.quantity
+        self._position_vector[column] = self.positions[fill.symbol]
             
         logger.debug(f"Fill executed: {fill.symbol} {fill.direction.value} "
                     f"{fill.quantity} @ {fill.fill_price}")
@@ -79,22 +166,134 @@ class Portfolio:
             # For sell orders, check if we have enough position
             return self.positions[order.symbol] >= order.quantity
             
+    def reserving_check(self) -> Callable[[OrderEvent, float], bool]:
+        """
+        Get a can_afford() check for a batch of fills that are executed later.
+        
+        Each accepted buy reserves its cost and each accepted sell its
+        quantity, so later fills of the batch only see what is left. Proceeds
+        of sells in the batch are not counted until they are executed.
+        
+        Returns:
+            Function of (order, fill_price) -> accept
+        """
+        reserved_cash = 0.0
+        reserved_positions: Dict[str, float] = defaultdict(float)
+        
+        def accept(order: OrderEvent, fill_price: float) -> bool:
+            nonlocal reserved_cash
+            if order.direction == OrderDirection.BUY:
+                cost = order.quantity * fill_price * (1 + self.commission)
+                if self.cash - reserved_cash < cost:
+                    return False
+                reserved_cash += cost
+            else:
+                if self.positions[order.symbol] - reserved_positions[order.symbol] < order.quantity:
+                    return False
+                reserved_positions[order.symbol] += order.quantity
+            return True
+            
+        return accept
+        
     def get_position(self, symbol: str) -> float:
         """Get current position size for symbol."""
         return self.positions.get(symbol, 0.0)
         
     def get_portfolio_df(self) -> pd.DataFrame:
-        """Get portfolio history as DataFrame."""
-        return pd.DataFrame(self.history)
+        """
+        Get portfolio history as DataFrame.
+        
+        The value columns are a view over the history arrays, not a copy.
+        """
+        n = self._n_bars
+        portfolio_df = pd.DataFrame(self._values[:n], columns=self.HISTORY_COLUMNS, copy=False)
+        portfolio_df.insert(0, 'timestamp', self._timestamps[:n])
+        return portfolio_df
+        
+    def get_positions_df(self) -> pd.DataFrame:
+        """
+        Get position history as a bars x symbols DataFrame.
+        
+        Returns a view over the dense position matrix, not a copy.
+        """
+        n = self._n_bars
+        return pd.DataFrame(
+            self._position_history[:n, :len(self.symbols)],
+            index=pd.DatetimeIndex(self._timestamps[:n], name='timestamp'),
+            columns=self.symbols,
+            copy=False
+        )
 
 class ExecutionHandler:
     """
     Handles order execution with realistic fills, commission, and slippage.
+    
+    Market orders fill at the current close. Limit, stop and stop-limit orders
+    rest in an OrderBook and are matched against the OHLC range of later bars.
     """
     
     def __init__(self, commission: float = 0.001, slippage: float = 0.0005):
         self.commission = commission
         self.slippage = slippage
+        self.order_book = OrderBook(slippage=slippage)
+        
+    def _commission(self, quantity: float, fill_price: float) -> float:
+        """Calculate commission for a fill."""
+        return max(
+            abs(quantity * fill_price) * self.commission,
+            1.0  # Minimum commission
+        )
+        
+    def submit_order(self, order: OrderEvent) -> str:
+        """
+        Rest a limit, stop or stop-limit order in the order book.
+        
+        Args:
+            order: Order to rest
+            
+        Returns:
+            Order id in the book
+        """
+        return self.order_book.add(order)
+        
+    def match_resting_orders(self, market_data: MarketEvent,
+                             accept: Optional[Callable[[OrderEvent, float], bool]] = None) -> List[FillEvent]:
+        """
+        Match resting orders against the current bar.
+        
+        Only symbols with resting orders are visited, and within a symbol
+        only the orders whose trigger level lies in the bar range.
+        
+        Args:
+            market_data: Current market data
+            accept: Optional check called with (order, fill_price) before filling
+            
+        Returns:
+            List of fill events in fill order
+        """
+        fills = []
+        for symbol in self.order_book.symbols():
+            open_price = market_data.get_price(symbol, "open")
+            high_price = market_data.get_price(symbol, "high")
+            low_price = market_data.get_price(symbol, "low")
+            if open_price is None or high_price is None or low_price is None:
+                continue
+                
+            for resting, fill_price in self.order_book.match(symbol, open_price, high_price, low_price, accept):
+                order = resting.order
+                fills.append(FillEvent(
+                    timestamp=market_data.timestamp,
+                    symbol=symbol,
+                    quantity=order.quantity,
+                    direction=order.direction,
+                    fill_price=fill_price,
+                    commission=self._commission(order.quantity, fill_price),
+                    slippage=self.slippage if order.order_type == OrderType.STOP else 0.0,
+                    order_id=resting.order_id,
+                    metadata=order.metadata
+                ))
+                
+        return fills
         
     def execute_order(self, order: OrderEvent, market_data: MarketEvent) -> Optional[FillEvent]:
         """
@@ -120,10 +319,7 @@ class ExecutionHandler:
             fill_price = current_price * (1 - self.slippage)
             
         # Calculate commission
-        commission = max(
-            abs(order.quantity * fill_price) * self.commission,
-            1.0  # Minimum commission
-        )
+        commission = self._commission(order.quantity, fill_price)
         
         # Create fill event
         fill = FillEvent(
@@ -133,7 +329,8 @@ class ExecutionHandler:
             direction=order.direction,
             fill_price=fill_price,
             commission=commission,
-            slippage=self.slippage
+            slippage=self.slippage,
+            metadata=order.metadata
         )
         
         return fill
@@ -150,26 +347,32 @@ class BacktestEngine:
         self.config = config or Config()
         
         # Core components
-        self.data_loader = DataLoader(self.config.data.db_connection)
+        self.data_loader = DataLoader(self.config.data.db_connection, compact=self.config.data.compact)
         self.portfolio = Portfolio(
             initial_capital=self.config.backtest.initial_capital,
-            commission=self.config.backtest.commission
+            commission=self.config.backtest.commission,
+            online_metrics=OnlineMetrics()
         )
         self.execution_handler = ExecutionHandler(
             commission=self.config.backtest.commission,
             slippage=self.config.backtest.slippage
         )
         
-        # Event queue
-        self.events = queue.Queue()
+        # Event bus
+        self.events = EventBus()
+        
+        # Fill ledger for round-trip trade analytics
+        self.trade_ledger = TradeLedger()
         
         # Data and state
         self.market_data: Optional[pd.DataFrame] = None
+        self.panel: Optional[MarketPanel] = None
         self.current_time: Optional[pd.Timestamp] = None
         self.symbols: List[str] = []
         
         # Results
         self.results: Optional[Dict[str, Any]] = None
+        self._use_batch_signals = False
         
     def load_data(self, 
                   symbols: List[str],
@@ -194,13 +397,19 @@ class BacktestEngine:
         if self.market_data.empty:
             raise ValueError("No market data loaded")
             
+        # Pivot once into a dense (dates x symbols x fields) panel
+        self.panel = MarketPanel.from_frame(
+            self.market_data, dtype=np.float32 if self.config.data.compact else np.float64
+        )
+            
         logger.info(f"Loaded {len(self.market_data)} data points for backtesting")
         
     def run(self,
             strategy: BaseStrategy,
             symbols: List[str],
             start_date: str,
-            end_date: str) -> Dict[str, Any]:
+            end_date: str,
+            early_stop: Optional[Callable[[OnlineMetrics], bool]] = None) -> Dict[str, Any]:
         """
         Run a backtest.
         
@@ -209,6 +418,8 @@ class BacktestEngine:
             symbols: List of symbols to trade
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
+            early_stop: Optional callable checked after every bar with the
+                running OnlineMetrics; returning True ends the backtest
             
         Returns:
             Dictionary with backtest results
@@ -220,70 +431,204 @@ class BacktestEngine:
         # Load data
         self.load_data(symbols, start_date, end_date)
         
+        return self.run_panel(strategy, self.panel, early_stop=early_stop)
+        
+    def run_panel(self,
+                  strategy: BaseStrategy,
+                  panel: MarketPanel,
+                  early_stop: Optional[Callable[[OnlineMetrics], bool]] = None) -> Dict[str, Any]:
+        """
+        Run a backtest on an already loaded market panel.
+        
+        Used by parameter sweeps and walk-forward folds, which load the
+        panel once and run many backtests over it.
+        
+        Args:
+            strategy: Trading strategy to test
+            panel: Market panel to replay
+            early_stop: Optional callable checked after every bar with the
+                running OnlineMetrics; returning True ends the backtest
+            
+        Returns:
+            Dictionary with backtest results
+        """
+        # Sweep and walk-forward workers get a panel without loaded market data
+        # (or a fold of it), so the strategy sees the panel's bars
+        if self.market_data is not None and panel is self.panel:
+            data = self.market_data
+        else:
+            data = panel.to_frame()
+        
+        self.panel = panel
+        self.portfolio.reserve(len(panel), panel.symbols)
+        prices_aligned = self.portfolio.symbols[:len(panel.symbols)] == panel.symbols
+        close_column = panel.field_index['close']
+        
         # Initialize strategy
-        strategy.set_data(self.market_data)
+        strategy.set_data(data)
         strategy.initialize()
+        self._register_handlers(strategy)
         
-        # Group data by date for event-driven processing
-        daily_data = self.market_data.groupby('date')
-        
-        # Main backtest loop
-        for date, day_data in daily_data:
+        # Main backtest loop over the pre-pivoted panel
+        stopped_early = False
+        for bar_index, date in enumerate(self.panel.dates):
             self.current_time = date
             
-            # Create market event
-            market_data = {}
-            for _, row in day_data.iterrows():
-                symbol = row['ticker']
-                market_data[symbol] = {
-                    'open': row['open_price'],
-                    'high': row['high_price'], 
-                    'low': row['low_price'],
-                    'close': row['close_price'],
-                    'volume': row['volume']
-                }
-                
-            market_event = MarketEvent(timestamp=date, data=market_data)
+            # Create market event backed by a row view of the panel
+            market_event = MarketEvent(timestamp=date, panel=self.panel, bar_index=bar_index)
             self.events.put(market_event)
             
             # Process events
             self._process_events(strategy)
             
-            # Update portfolio value
-            current_prices = {symbol: data['close'] for symbol, data in market_data.items()}
+            # Update portfolio value from the close column of the bar
+            if prices_aligned:
+                current_prices = market_event.bar[:, close_column]
+            else:
+                current_prices = market_event.get_prices(
+                    [symbol for symbol, quantity in self.portfolio.positions.items() if quantity != 0]
+                )
             self.portfolio.update_market_value(current_prices, date)
             
+            if early_stop is not None and early_stop(self.portfolio.online_metrics):
+                logger.info(f"Early stop triggered at {date} ({bar_index + 1} of {len(self.panel)} bars)")
+                stopped_early = True
+                break
+                
         # Calculate results
         self.results = self._calculate_results(strategy)
+        if self.results:
+            self.results['stopped_early'] = stopped_early
         
         logger.info(f"Backtest completed. Final portfolio value: "
                    f"${self.portfolio.portfolio_value:,.2f}")
         
         return self.results
         
+    def run_vectorized(self,
+                       target_weights: pd.DataFrame,
+                       symbols: Optional[List[str]] = None,
+                       start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       strategy_name: str = "Vectorized",
+                       position_size: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run a vectorized backtest from a full matrix of target weights.
+        
+        Much faster than the event-driven loop, intended for screening large
+        parameter spaces before validating the finalists with run().
+        
+        Args:
+            target_weights: DataFrame indexed by date with one column per symbol.
+                Rows are forward-filled onto the trading calendar.
+            symbols: Symbols to load (defaults to the weight columns). If omitted
+                and data is already loaded, the loaded data is reused.
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            strategy_name: Name reported in the results
+            position_size: If given, target_weights is treated as a signal matrix
+                (1 long, -1 short, 0 flat) scaled by this fraction of the portfolio
+            
+        Returns:
+            Dictionary with backtest results, in the same format as run()
+        """
+        if symbols is not None or self.market_data is None:
+            self.load_data(symbols or list(target_weights.columns), start_date, end_date)
+            
+        close = pd.DataFrame(
+            self.panel.field('close'), index=self.panel.dates, columns=self.panel.symbols
+        )
+        
+        weights = target_weights.copy()
+        weights.index = pd.to_datetime(weights.index)
+        weights = weights.reindex(columns=close.columns).reindex(index=close.index, method='ffill')
+        if position_size is not None:
+            weights = np.sign(weights) * position_size
+            
+        simulation = simulate_target_weights(
+            close.to_numpy(dtype=np.float64),
+            weights.to_numpy(dtype=np.float64),
+            initial_capital=self.config.backtest.initial_capital,
+            commission=self.config.backtest.commission,
+            slippage=self.config.backtest.slippage
+        )
+        
+        portfolio_df = pd.DataFrame({
+            'timestamp': close.index,
+            'cash': simulation['cash'],
+            'position_value': simulation['position_value'],
+            'total_value': simulation['total_value']
+        })
+        
+        metrics = compute_metrics(
+            simulation['total_value'],
+            years_between(close.index[0], close.index[-1])
+        )
+        final_weights = np.nan_to_num(weights.to_numpy(dtype=np.float64)[-1])
+        final_prices = close.ffill().to_numpy(dtype=np.float64)[-1]
+        final_value = float(simulation['total_value'][-1])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            final_quantities = np.where(final_prices > 0, final_weights * final_value / final_prices, 0.0)
+            
+        self.results = {
+            'strategy_name': strategy_name,
+            'start_date': portfolio_df['timestamp'].min(),
+            'end_date': portfolio_df['timestamp'].max(),
+            'initial_capital': self.config.backtest.initial_capital,
+            'final_value': final_value,
+            'total_return': metrics['total_return'],
+            'annualized_return': metrics['annualized_return'],
+            'sharpe_ratio': metrics['sharpe_ratio'],
+            'max_drawdown': metrics['max_drawdown'],
+            'volatility': metrics['volatility'],
+            'calmar_ratio': metrics['calmar_ratio'],
+            'total_trades': int(np.count_nonzero(np.diff(np.nan_to_num(weights.to_numpy()), axis=0, prepend=0.0))),
+            'portfolio_history': portfolio_df,
+            'positions': {
+                symbol: quantity
+                for symbol, quantity in zip(close.columns, final_quantities) if quantity != 0
+            },
+            'signals': []
+        }
+        
+        logger.info(f"Vectorized backtest completed. Final portfolio value: ${final_value:,.2f}")
+        
+        return self.results
+        
+    def _register_handlers(self, strategy: BaseStrategy):
+        """Build the event dispatch table for a run."""
+        self.events.reset()
+        self.events.clear_handlers()
+        self._use_batch_signals = strategy.supports_batch_signals()
+        self.events.subscribe(EventType.MARKET, lambda event: self._handle_market_event(event, strategy))
+        self.events.subscribe(EventType.SIGNAL, self._handle_signal_event)
+        self.events.subscribe(EventType.ORDER, self._handle_order_event)
+        self.events.subscribe(EventType.FILL, lambda event: self._handle_fill_event(event, strategy))
+        
     def _process_events(self, strategy: BaseStrategy):
         """Process all events in the queue."""
-        while not self.events.empty():
-            try:
-                event = self.events.get(False)
-            except queue.Empty:
-                break
-                
-            if event.type == EventType.MARKET:
-                self._handle_market_event(event, strategy)
-            elif event.type == EventType.SIGNAL:
-                self._handle_signal_event(event)
-            elif event.type == EventType.ORDER:
-                self._handle_order_event(event)
-            elif event.type == EventType.FILL:
-                self._handle_fill_event(event, strategy)
+        self.events.dispatch()
                 
     def _handle_market_event(self, event: MarketEvent, strategy: BaseStrategy):
         """Handle market data event."""
+        # Resting orders are matched against the new bar before the strategy sees it;
+        # their fills are executed later, so each accepted fill reserves its cash
+        if len(self.execution_handler.order_book):
+            for fill in self.execution_handler.match_resting_orders(event, self.portfolio.reserving_check()):
+                self.events.put(fill)
+                
+        if self._use_batch_signals and event.panel is not None:
+            self._handle_market_event_batch(event, strategy)
+            return
+            
         # Generate signals from strategy
+        bar = event.bar
         for symbol in event.get_symbols():
-            current_data = pd.Series(event.data[symbol])
-            current_data.name = symbol
+            if bar is not None:
+                current_data = pd.Series(bar[event.panel.symbol_index[symbol]], index=FIELDS, name=symbol)
+            else:
+                current_data = pd.Series(event.data[symbol], name=symbol)
             
             signals = strategy.generate_signals(event.timestamp, current_data)
             
@@ -299,6 +644,25 @@ class BacktestEngine:
                 )
                 self.events.put(signal_event)
                 
+    def _handle_market_event_batch(self, event: MarketEvent, strategy: BaseStrategy):
+        """Generate signals for the whole cross-section with one strategy call."""
+        panel = event.panel
+        bar = event.bar
+        bar_arrays = {field: bar[:, column] for field, column in panel.field_index.items()}
+        
+        batch = strategy.generate_signals_batch(event.timestamp, bar_arrays, panel.symbol_index)
+        if batch is None:
+            return
+            
+        for column in np.flatnonzero(batch.signal_type):
+            self.events.put(SignalEvent(
+                timestamp=event.timestamp,
+                symbol=panel.symbols[column],
+                signal_type=int(batch.signal_type[column]),
+                strength=float(batch.strength[column]) if batch.strength is not None else 1.0,
+                price=float(batch.price[column]) if batch.price is not None else float(bar_arrays['close'][column])
+            ))
+            
     def _handle_signal_event(self, event: SignalEvent):
         """Convert signal to order."""
         # Simple position sizing (fixed percentage of portfolio)
@@ -329,37 +693,38 @@ class BacktestEngine:
         else:
             return  # Hold signal
             
-        # Create order
+        # Create order; signal metadata may request a resting order type and
+        # attach bracket exits (stop_loss / take_profit prices)
+        metadata = event.metadata or {}
+        order_type = OrderType(metadata.get('order_type', OrderType.MARKET))
+        bracket = {key: metadata[key] for key in ('stop_loss', 'take_profit') if metadata.get(key) is not None}
+        
+        # Positions only change on fills, so a repeated signal replaces a still
+        # resting entry instead of stacking another one on top of it
+        if order_type != OrderType.MARKET:
+            self._cancel_resting_entries(event.symbol, direction)
+        
         order = OrderEvent(
             timestamp=event.timestamp,
             symbol=event.symbol,
-            order_type=OrderType.MARKET,
+            order_type=order_type,
             quantity=quantity,
-            direction=direction
+            direction=direction,
+            price=metadata.get('limit_price'),
+            stop_price=metadata.get('stop_price'),
+            metadata=bracket or None
         )
         
         self.events.put(order)
         
     def _handle_order_event(self, event: OrderEvent):
         """Execute order."""
-        # Get current market data
-        market_event = None
-        temp_events = []
-        
-        # Find the most recent market event
-        while not self.events.empty():
-            try:
-                temp_event = self.events.get(False)
-                temp_events.append(temp_event)
-                if temp_event.type == EventType.MARKET:
-                    market_event = temp_event
-                    break
-            except queue.Empty:
-                break
-                
-        # Put events back
-        for temp_event in temp_events:
-            self.events.put(temp_event)
+        if event.order_type != OrderType.MARKET:
+            self.execution_handler.submit_order(event)
+            return
+            
+        # Current bar is tracked by the event bus
+        market_event = self.events.current_bar
             
         if market_event is None:
             logger.warning("No market data available for order execution")
@@ -379,7 +744,12 @@ class BacktestEngine:
     def _handle_fill_event(self, event: FillEvent, strategy: BaseStrategy):
         """Handle fill event."""
         self.portfolio.execute_fill(event)
+        current_bar = self.events.current_bar
+        self.trade_ledger.record(event, current_bar.bar_index if current_bar is not None else -1)
         
+        if event.metadata and ('stop_loss' in event.metadata or 'take_profit' in event.metadata):
+            self._place_bracket(event)
+            
         # Notify strategy
         if event.direction == OrderDirection.BUY:
             from models.strategies.base import Position
@@ -395,6 +765,43 @@ class BacktestEngine:
             # Position closing logic would go here
             pass
             
+    def _cancel_resting_entries(self, symbol: str, direction: OrderDirection) -> int:
+        """Cancel resting entry orders (not bracket exits) for a symbol in one direction."""
+        cancelled = 0
+        for resting in self.execution_handler.order_book.open_orders(symbol):
+            is_exit = (resting.order.metadata or {}).get('oco_group') is not None
+            if resting.order.direction == direction and not is_exit:
+                cancelled += self.execution_handler.order_book.cancel(resting.order_id)
+        if cancelled:
+            logger.debug(f"Replaced {cancelled} resting {direction.value} entries for {symbol}")
+        return cancelled
+        
+    def _place_bracket(self, fill: FillEvent):
+        """Rest one-cancels-other exit orders for a filled entry."""
+        exit_direction = OrderDirection.SELL if fill.direction == OrderDirection.BUY else OrderDirection.BUY
+        oco_group = f"bracket-{fill.symbol}-{fill.order_id or id(fill)}"
+        
+        if 'stop_loss' in fill.metadata:
+            self.execution_handler.submit_order(OrderEvent(
+                timestamp=fill.timestamp,
+                symbol=fill.symbol,
+                order_type=OrderType.STOP,
+                quantity=fill.quantity,
+                direction=exit_direction,
+                stop_price=fill.metadata['stop_loss'],
+                metadata={'oco_group': oco_group}
+            ))
+        if 'take_profit' in fill.metadata:
+            self.execution_handler.submit_order(OrderEvent(
+                timestamp=fill.timestamp,
+                symbol=fill.symbol,
+                order_type=OrderType.LIMIT,
+                quantity=fill.quantity,
+                direction=exit_direction,
+                price=fill.metadata['take_profit'],
+                metadata={'oco_group': oco_group}
+            ))
+            
     def _calculate_results(self, strategy: BaseStrategy) -> Dict[str, Any]:
         """Calculate backtest results and performance metrics."""
         portfolio_df = self.portfolio.get_portfolio_df()
@@ -402,8 +809,15 @@ class BacktestEngine:
         if portfolio_df.empty:
             return {}
             
-        # Calculate performance metrics
-        metrics = PerformanceMetrics(portfolio_df)
+        # Pair fills into round trips
+        trades = self.trade_ledger.round_trips(self.panel)
+        
+        # Calculate all scalar metrics in one pass over the value history
+        timestamps = portfolio_df['timestamp']
+        metrics = compute_metrics(
+            portfolio_df['total_value'].to_numpy(dtype=np.float64),
+            years_between(timestamps.iloc[0], timestamps.iloc[-1])
+        )
         
         results = {
             'strategy_name': strategy.name,
@@ -411,16 +825,19 @@ class BacktestEngine:
             'end_date': portfolio_df['timestamp'].max(),
             'initial_capital': self.config.backtest.initial_capital,
             'final_value': self.portfolio.portfolio_value,
-            'total_return': metrics.total_return(),
-            'annualized_return': metrics.annualized_return(),
-            'sharpe_ratio': metrics.sharpe_ratio(),
-            'max_drawdown': metrics.max_drawdown(),
-            'volatility': metrics.volatility(),
-            'calmar_ratio': metrics.calmar_ratio(),
+            'total_return': metrics['total_return'],
+            'annualized_return': metrics['annualized_return'],
+            'sharpe_ratio': metrics['sharpe_ratio'],
+            'max_drawdown': metrics['max_drawdown'],
+            'volatility': metrics['volatility'],
+            'calmar_ratio': metrics['calmar_ratio'],
             'total_trades': len(strategy.signals),
             'portfolio_history': portfolio_df,
             'positions': dict(self.portfolio.positions),
-            'signals': strategy.signals
+            'signals': strategy.signals,
+            'metrics': metrics,
+            'trades': trades,
+            'trade_statistics': trade_statistics(trades)
         }
         
         return results
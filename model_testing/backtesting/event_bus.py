@@ -0,0 +1,96 @@
+"""
+Event Bus
+
+Single-threaded event dispatch for the backtesting engine. Events are held in a
+plain deque (no locking) and routed through per-type dispatch tables. The bus
+also tracks the market event currently being processed so handlers can read
+the current bar without scanning the queue.
+"""
+
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+import logging
+
+from .events import Event, EventType, MarketEvent
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[Event], None]
+
+
+class EventBus:
+    """
+    FIFO event bus with typed dispatch tables.
+
+    Not thread-safe by design: the backtest loop runs in a single thread, so
+    the synchronization done by queue.Queue is pure overhead.
+    """
+
+    def __init__(self):
+        self._events: Deque[Event] = deque()
+        self._handlers: Dict[EventType, List[EventHandler]] = {event_type: [] for event_type in EventType}
+        self.current_bar: Optional[MarketEvent] = None
+
+    def subscribe(self, event_type: EventType, handler: EventHandler) -> None:
+        """
+        Register a handler for an event type.
+
+        Args:
+            event_type: Type of event to handle
+            handler: Callable receiving the event
+        """
+        self._handlers[event_type].append(handler)
+
+    def clear_handlers(self) -> None:
+        """Remove all registered handlers."""
+        for handlers in self._handlers.values():
+            handlers.clear()
+
+    def put(self, event: Event) -> None:
+        """Append an event to the queue."""
+        self._events.append(event)
+
+    def get(self) -> Event:
+        """
+        Pop the oldest event.
+
+        Raises:
+            IndexError: If the bus is empty
+        """
+        return self._events.popleft()
+
+    def empty(self) -> bool:
+        """Check whether there are no pending events."""
+        return not self._events
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def dispatch(self) -> int:
+        """
+        Process events until the queue is empty.
+
+        Handlers may publish new events, which are processed in the same call.
+
+        Returns:
+            Number of events dispatched
+        """
+        events = self._events
+        handlers = self._handlers
+        dispatched = 0
+
+        while events:
+            event = events.popleft()
+            if event.type is EventType.MARKET:
+                self.current_bar = event
+
+            for handler in handlers[event.type]:
+                handler(event)
+            dispatched += 1
+
+        return dispatched
+
+    def reset(self) -> None:
+        """Drop pending events and the current bar reference."""
+        self._events.clear()
+        self.current_bar = None
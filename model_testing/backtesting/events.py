@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Iterable, TYPE_CHECKING
 import pandas as pd
+import numpy as np
+
+if TYPE_CHECKING:
+    from .panel import MarketPanel
 
 class EventType(Enum):
     MARKET = "MARKET"
@@ -25,27 +29,59 @@ class Event(ABC):
     """
     Base class for all events in the event-driven backtesting system.
     """
-    type: EventType
+    type: EventType = field(init=False)
     timestamp: pd.Timestamp
 
 @dataclass  
 class MarketEvent(Event):
     """
     Market data event containing OHLCV data for all symbols.
+    
+    Either carries a nested dict in `data`, or a reference to a MarketPanel
+    and the bar index, in which case prices are read from a zero-copy row view.
     """
-    data: Dict[str, Dict[str, float]]  # {symbol: {open, high, low, close, volume}}
+    data: Optional[Dict[str, Dict[str, float]]] = None  # {symbol: {open, high, low, close, volume}}
+    panel: Optional['MarketPanel'] = None
+    bar_index: int = -1
     
     def __post_init__(self):
         self.type = EventType.MARKET
         
+    @property
+    def bar(self) -> Optional[np.ndarray]:
+        """Zero-copy (symbols x fields) view of this bar, if panel-backed."""
+        if self.panel is None:
+            return None
+        return self.panel.values[self.bar_index]
+        
     def get_price(self, symbol: str, price_type: str = "close") -> Optional[float]:
         """Get price for a specific symbol and price type."""
+        if self.panel is not None:
+            column = self.panel.symbol_index.get(symbol)
+            field_column = self.panel.field_index.get(price_type)
+            if column is None or field_column is None:
+                return None
+            value = self.panel.values[self.bar_index, column, field_column]
+            return None if np.isnan(value) else float(value)
+            
         if symbol in self.data and price_type in self.data[symbol]:
             return self.data[symbol][price_type]
         return None
         
-    def get_symbols(self) -> list:
+    def get_prices(self, symbols: Iterable[str], price_type: str = "close") -> Dict[str, float]:
+        """Get prices for the given symbols, skipping symbols without data."""
+        prices = {}
+        for symbol in symbols:
+            price = self.get_price(symbol, price_type)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+        
+    def get_symbols(self) -> List[str]:
         """Get list of available symbols."""
+        if self.panel is not None:
+            closes = self.panel.values[self.bar_index, :, self.panel.field_index['close']]
+            return [self.panel.symbols[i] for i in np.flatnonzero(~np.isnan(closes))]
         return list(self.data.keys())
 
 @dataclass
@@ -1,10 +1,175 @@
 import pandas as pd
 import numpy as np
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 import logging
+import warnings
+
+from .drawdowns import drawdown_episodes, underwater_curve
 
 logger = logging.getLogger(__name__)
 
+TRADING_DAYS_PER_YEAR = 252
+
+
+METRIC_KEYS = [
+    'total_return', 'annualized_return', 'volatility', 'sharpe_ratio', 'sortino_ratio',
+    'max_drawdown', 'calmar_ratio', 'value_at_risk_5pct', 'conditional_var_5pct',
+    'winning_percentage', 'average_win', 'average_loss', 'profit_factor'
+]
+
+
+def years_between(start: pd.Timestamp, end: pd.Timestamp) -> float:
+    """Length of a period in years, as used for annualization."""
+    return (end - start).days / 365.25
+
+
+def compute_metrics_batch(total_values: np.ndarray,
+                          years: Union[float, np.ndarray],
+                          risk_free_rate: float = 0.02,
+                          confidence_level: float = 0.05) -> Dict[str, np.ndarray]:
+    """
+    Compute every scalar metric for a matrix of equity curves.
+    
+    Each column is one curve; all statistics are vectorized along the column
+    axis using masked sums, so missing values in one column do not affect the
+    others. Per column the results match the individual PerformanceMetrics
+    methods exactly: returns as pct_change() computes them, sample standard
+    deviations (ddof=1), linearly interpolated VaR and the same edge-case values.
+    
+    Args:
+        total_values: Array of portfolio values with shape (time, curves)
+        years: Length of the period in years, scalar or one per curve
+        risk_free_rate: Annual risk-free rate
+        confidence_level: VaR/CVaR tail probability
+        
+    Returns:
+        Dictionary of metric name -> array with one value per curve
+    """
+    values = np.asarray(total_values, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError(f"Expected a (time x curves) array, got shape {values.shape}")
+        
+    n_bars, n_curves = values.shape
+    if n_bars < 2:
+        return {key: np.zeros(n_curves) for key in METRIC_KEYS}
+        
+    # Returns over forward-filled values, as pct_change() computes them
+    valid = ~np.isnan(values)
+    if not valid.all():
+        fill_index = np.maximum.accumulate(np.where(valid, np.arange(n_bars)[:, None], 0), axis=0)
+        filled = np.take_along_axis(values, fill_index, axis=0)
+    else:
+        filled = values
+        
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        
+        returns = filled[1:] / filled[:-1] - 1
+        has_return = ~np.isnan(returns)
+        n = has_return.sum(axis=0)
+        returns_or_zero = np.where(has_return, returns, 0.0)
+        
+        # Return metrics
+        total_return = (values[-1] - values[0]) / values[0]
+        years = np.broadcast_to(np.asarray(years, dtype=np.float64), (n_curves,))
+        annualized_return = np.where(years > 0, (1 + total_return) ** (1 / years) - 1, 0.0)
+        excess_return = annualized_return - risk_free_rate
+        
+        # Volatility and Sharpe (sample standard deviation)
+        mean = returns_or_zero.sum(axis=0) / n
+        deviations = np.where(has_return, returns - mean, 0.0)
+        daily_vol = np.where(n > 1, np.sqrt((deviations ** 2).sum(axis=0) / (n - 1)), np.nan)
+        volatility = daily_vol * np.sqrt(TRADING_DAYS_PER_YEAR)
+        sharpe_ratio = np.where(volatility == 0, 0.0, excess_return / volatility)
+        
+        # Win/loss partition shared by Sortino, win rate and profit factor
+        win_mask = has_return & (returns > 0)
+        loss_mask = has_return & (returns < 0)
+        n_wins = win_mask.sum(axis=0)
+        n_losses = loss_mask.sum(axis=0)
+        win_sum = np.where(win_mask, returns, 0.0).sum(axis=0)
+        loss_sum = np.where(loss_mask, returns, 0.0).sum(axis=0)
+        
+        loss_mean = loss_sum / n_losses
+        loss_deviations = np.where(loss_mask, returns - loss_mean, 0.0)
+        downside = np.where(n_losses > 1, np.sqrt((loss_deviations ** 2).sum(axis=0) / (n_losses - 1)), np.nan)
+        downside = downside * np.sqrt(TRADING_DAYS_PER_YEAR)
+        sortino_ratio = np.select(
+            [n_losses == 0, downside == 0],
+            [np.inf, 0.0],
+            excess_return / downside
+        )
+        
+        # Drawdown
+        running_max = np.fmax.accumulate(values, axis=0)
+        max_drawdown = np.abs(np.nanmin((values - running_max) / running_max, axis=0))
+        calmar_ratio = np.where(
+            max_drawdown == 0,
+            np.where(annualized_return > 0, np.inf, 0.0),
+            annualized_return / max_drawdown
+        )
+        
+        # Tail risk
+        if has_return.all():
+            value_at_risk = np.quantile(returns, confidence_level, axis=0)
+        else:
+            value_at_risk = np.nanquantile(np.where(has_return, returns, np.nan), confidence_level, axis=0)
+        tail_mask = has_return & (returns <= value_at_risk)
+        n_tail = tail_mask.sum(axis=0)
+        conditional_var = np.where(n_tail > 0, np.where(tail_mask, returns, 0.0).sum(axis=0) / n_tail, 0.0)
+        
+        # Win/loss statistics
+        win_pct = n_wins / n
+        average_win = np.where(n_wins > 0, win_sum / n_wins, 0.0)
+        average_loss = np.where(n_losses > 0, loss_sum / n_losses, 0.0)
+        
+        avg_loss = np.abs(average_loss)
+        profit_factor = np.select(
+            [avg_loss == 0, 1 - win_pct == 0],
+            [np.where(average_win > 0, np.inf, 0.0), np.inf],
+            (average_win * win_pct) / (avg_loss * (1 - win_pct))
+        )
+        
+    return {
+        'total_return': total_return,
+        'annualized_return': annualized_return,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'max_drawdown': max_drawdown,
+        'calmar_ratio': calmar_ratio,
+        'value_at_risk_5pct': value_at_risk,
+        'conditional_var_5pct': conditional_var,
+        'winning_percentage': win_pct * 100,
+        'average_win': average_win,
+        'average_loss': average_loss,
+        'profit_factor': profit_factor
+    }
+
+
+def compute_metrics(total_value: np.ndarray,
+                    years: float,
+                    risk_free_rate: float = 0.02,
+                    confidence_level: float = 0.05) -> Dict[str, float]:
+    """
+    Compute every scalar metric from one contiguous array of portfolio values.
+    
+    Single-curve form of compute_metrics_batch.
+    
+    Args:
+        total_value: Portfolio values in time order
+        years: Length of the period in years (for annualization)
+        risk_free_rate: Annual risk-free rate
+        confidence_level: VaR/CVaR tail probability
+        
+    Returns:
+        Dictionary with the same keys as PerformanceMetrics.get_all_metrics()
+    """
+    values = np.asarray(total_value, dtype=np.float64).reshape(-1, 1)
+    metrics = compute_metrics_batch(values, years, risk_free_rate, confidence_level)
+    return {key: float(metrics[key][0]) for key in METRIC_KEYS}
+
+
 class PerformanceMetrics:
     """
     Calculate performance metrics for backtesting results.
@@ -32,6 +197,47 @@ class PerformanceMetrics:
         # Calculate returns
         self._calculate_returns()
         
+    @classmethod
+    def batch(cls,
+              equity_curves: Union[np.ndarray, pd.DataFrame],
+              timestamps: Optional[pd.DatetimeIndex] = None,
+              years: Optional[Union[float, np.ndarray]] = None,
+              names: Optional[List[Any]] = None,
+              risk_free_rate: float = 0.02) -> pd.DataFrame:
+        """
+        Calculate all metrics for many equity curves of the same length at once.
+        
+        The curves are evaluated together by compute_metrics_batch, without
+        building a PerformanceMetrics object (and DataFrame copy) per curve.
+        
+        Args:
+            equity_curves: (time x curves) array, or DataFrame with one column
+                per curve and (optionally) a DatetimeIndex
+            timestamps: Dates of the rows, used to annualize returns
+            years: Period length in years, overrides timestamps
+            names: Curve labels (defaults to the DataFrame columns or 0..n-1)
+            risk_free_rate: Annual risk-free rate
+            
+        Returns:
+            DataFrame with one row of metrics per curve
+        """
+        if isinstance(equity_curves, pd.DataFrame):
+            if names is None:
+                names = list(equity_curves.columns)
+            if timestamps is None and isinstance(equity_curves.index, pd.DatetimeIndex):
+                timestamps = equity_curves.index
+            values = equity_curves.to_numpy(dtype=np.float64)
+        else:
+            values = np.asarray(equity_curves, dtype=np.float64)
+            
+        if years is None:
+            if timestamps is None:
+                raise ValueError("Either timestamps or years is required to annualize returns")
+            years = years_between(pd.Timestamp(timestamps[0]), pd.Timestamp(timestamps[-1])) if len(timestamps) else 0.0
+            
+        metrics = compute_metrics_batch(values, years, risk_free_rate=risk_free_rate)
+        return pd.DataFrame(metrics, index=names, columns=METRIC_KEYS)
+        
     def _calculate_returns(self):
         """Calculate daily returns from portfolio values."""
         if 'total_value' not in self.portfolio_history.columns:
@@ -150,6 +356,21 @@ class PerformanceMetrics:
             
         return annual_ret / max_dd
         
+    def drawdown_episodes(self) -> pd.DataFrame:
+        """List every drawdown episode (peak, trough, recovery, depth, durations)."""
+        return drawdown_episodes(
+            self.portfolio_history['total_value'].to_numpy(dtype=np.float64),
+            dates=self.portfolio_history['timestamp'] if 'timestamp' in self.portfolio_history.columns else None
+        )
+        
+    def underwater_curve(self) -> pd.Series:
+        """Drawdown from the running peak at every bar (values <= 0)."""
+        return pd.Series(
+            underwater_curve(self.portfolio_history['total_value'].to_numpy(dtype=np.float64)),
+            index=self.portfolio_history.index,
+            name='underwater'
+        )
+        
     def value_at_risk(self, confidence_level: float = 0.05) -> float:
         """
         Calculate Value at Risk (VaR).
@@ -255,7 +476,7 @@ class PerformanceMetrics:
         return excess_returns.mean() * 252 / tracking_error
         
     def winning_percentage(self) -> float:
-        """Calculate percentage of winning trades/periods."""
+        """Calculate percentage of winning periods (see trades.trade_statistics for per-trade figures)."""
         if len(self.portfolio_history) < 2:
             return 0.0
             
@@ -301,24 +522,33 @@ class PerformanceMetrics:
         return (avg_win * win_pct) / (avg_loss * loss_pct)
         
     def get_all_metrics(self) -> Dict[str, float]:
-        """Get all performance metrics as a dictionary."""
-        metrics = {
-            'total_return': self.total_return(),
-            'annualized_return': self.annualized_return(),
-            'volatility': self.volatility(),
-            'sharpe_ratio': self.sharpe_ratio(),
-            'sortino_ratio': self.sortino_ratio(),
-            'max_drawdown': self.max_drawdown(),
-            'calmar_ratio': self.calmar_ratio(),
-            'value_at_risk_5pct': self.value_at_risk(0.05),
-            'conditional_var_5pct': self.conditional_value_at_risk(0.05),
-            'winning_percentage': self.winning_percentage(),
-            'average_win': self.average_win(),
-            'average_loss': self.average_loss(),
-            'profit_factor': self.profit_factor()
-        }
+        """Get all performance metrics as a dictionary, computed in a single pass."""
+        years = 0.0
+        if len(self.portfolio_history) >= 2:
+            years = years_between(self.portfolio_history['timestamp'].iloc[0],
+                                  self.portfolio_history['timestamp'].iloc[-1])
+            
+        return compute_metrics(
+            self.portfolio_history['total_value'].to_numpy(dtype=np.float64),
+            years,
+            risk_free_rate=self.risk_free_rate
+        )
+        
+    def bootstrap(self, n_samples: int = 10000, **kwargs) -> pd.DataFrame:
+        """
+        Bootstrap confidence intervals for Sharpe ratio, CAGR and max drawdown.
+        
+        Args:
+            n_samples: Number of resamples
+            **kwargs: Passed to bootstrap_metrics (block_size, method, seed, ...)
+            
+        Returns:
+            DataFrame of estimates and confidence intervals per metric
+        """
+        from .bootstrap import bootstrap_metrics
         
-        return metrics
+        kwargs.setdefault('risk_free_rate', self.risk_free_rate)
+        return bootstrap_metrics(self.portfolio_history['daily_return'].to_numpy(), n_samples=n_samples, **kwargs)
         
     def print_summary(self):
         """Print a summary of all performance metrics."""
@@ -341,4 +571,217 @@ class PerformanceMetrics:
         print(f"Average Win:         {metrics['average_win']:.2%}")
         print(f"Average Loss:        {metrics['average_loss']:.2%}")
         print(f"Profit Factor:       {metrics['profit_factor']:.2f}")
-        print("="*50)
\ No newline at end of file
+        print("="*50)
+
+class OnlineMetrics:
+    """
+    Streaming companion to PerformanceMetrics.
+    
+    Updates return, volatility (Welford), Sharpe, Sortino, running maximum
+    drawdown and win/loss statistics in O(1) per portfolio value, without
+    keeping the history. Values match compute_metrics for the same series;
+    VaR and CVaR need the full return distribution and are not tracked.
+    """
+    
+    def __init__(self, risk_free_rate: float = 0.02):
+        """
+        Initialize the accumulator.
+        
+        Args:
+            risk_free_rate: Annual risk-free rate for Sharpe and Sortino ratios
+        """
+        self.risk_free_rate = risk_free_rate
+        self.reset()
+        
+    def reset(self) -> None:
+        """Clear all accumulated state."""
+        self.n_values = 0
+        self.initial_value = np.nan
+        self.final_value = np.nan
+        self.last_value = np.nan  # Last non-missing value
+        self.first_timestamp: Optional[pd.Timestamp] = None
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        
+        # Welford accumulators for all returns and for losing returns
+        self.n_returns = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._loss_mean = 0.0
+        self._loss_m2 = 0.0
+        
+        self.n_wins = 0
+        self.n_losses = 0
+        self.win_sum = 0.0
+        self.loss_sum = 0.0
+        
+        self.peak = np.nan
+        self._max_drawdown = np.nan
+        
+    def update(self, value: float, timestamp: Optional[pd.Timestamp] = None) -> None:
+        """
+        Add the next portfolio value.
+        
+        Args:
+            value: Portfolio value
+            timestamp: Timestamp of the value, used to annualize returns
+        """
+        if self.n_values == 0:
+            self.initial_value = value
+            self.first_timestamp = timestamp
+        self.n_values += 1
+        self.last_timestamp = timestamp
+        self.final_value = value
+        
+        if np.isnan(value):
+            # Missing values are padded forward, as pct_change() does
+            if np.isnan(self.last_value):
+                return
+            value_for_return = self.last_value
+        else:
+            value_for_return = value
+            
+            # Running maximum drawdown
+            if np.isnan(self.peak) or value > self.peak:
+                self.peak = value
+            drawdown = (self.peak - value) / self.peak
+            if np.isnan(self._max_drawdown) or drawdown > self._max_drawdown:
+                self._max_drawdown = drawdown
+                
+        previous = self.last_value
+        self.last_value = value_for_return
+        if np.isnan(previous):
+            return
+            
+        ret = value_for_return / previous - 1
+        self.n_returns += 1
+        delta = ret - self._mean
+        self._mean += delta / self.n_returns
+        self._m2 += delta * (ret - self._mean)
+        
+        if ret > 0:
+            self.n_wins += 1
+            self.win_sum += ret
+        elif ret < 0:
+            self.n_losses += 1
+            self.loss_sum += ret
+            delta = ret - self._loss_mean
+            self._loss_mean += delta / self.n_losses
+            self._loss_m2 += delta * (ret - self._loss_mean)
+
+    @property
+    def years(self) -> float:
+        """Elapsed time in years between the first and last timestamp."""
+        if self.first_timestamp is None or self.last_timestamp is None:
+            return 0.0
+        return years_between(pd.Timestamp(self.first_timestamp), pd.Timestamp(self.last_timestamp))
+        
+    def total_return(self) -> float:
+        """Total return since the first value."""
+        if self.n_values < 2:
+            return 0.0
+        return (self.final_value - self.initial_value) / self.initial_value
+        
+    def annualized_return(self) -> float:
+        """Annualized return."""
+        years = self.years
+        if self.n_values < 2 or years <= 0:
+            return 0.0
+        with np.errstate(invalid='ignore'):
+            return float(np.float64(1 + self.total_return()) ** (1 / years) - 1)
+            
+    def volatility(self, annualized: bool = True) -> float:
+        """Sample standard deviation of returns."""
+        if self.n_values < 2:
+            return 0.0
+        if self.n_returns < 2:
+            return np.nan
+        daily_vol = np.sqrt(self._m2 / (self.n_returns - 1))
+        return daily_vol * np.sqrt(TRADING_DAYS_PER_YEAR) if annualized else daily_vol
+        
+    def sharpe_ratio(self) -> float:
+        """Sharpe ratio."""
+        if self.n_values < 2:
+            return 0.0
+        annual_vol = self.volatility()
+        if annual_vol == 0:
+            return 0.0
+        return (self.annualized_return() - self.risk_free_rate) / annual_vol
+        
+    def sortino_ratio(self) -> float:
+        """Sortino ratio (downside deviation of losing returns)."""
+        if self.n_values < 2:
+            return 0.0
+        if self.n_losses == 0:
+            return np.inf
+        if self.n_losses < 2:
+            return np.nan
+        downside = np.sqrt(self._loss_m2 / (self.n_losses - 1)) * np.sqrt(TRADING_DAYS_PER_YEAR)
+        if downside == 0:
+            return 0.0
+        return (self.annualized_return() - self.risk_free_rate) / downside
+        
+    def max_drawdown(self) -> float:
+        """Maximum drawdown so far."""
+        if self.n_values < 2:
+            return 0.0
+        return self._max_drawdown
+        
+    def current_drawdown(self) -> float:
+        """Drawdown of the latest value from the running peak."""
+        if np.isnan(self.peak) or np.isnan(self.last_value):
+            return 0.0
+        return (self.peak - self.last_value) / self.peak
+        
+    def calmar_ratio(self) -> float:
+        """Calmar ratio (annual return / max drawdown)."""
+        annual_ret = self.annualized_return()
+        max_dd = self.max_drawdown()
+        if max_dd == 0:
+            return np.inf if annual_ret > 0 else 0.0
+        return annual_ret / max_dd
+        
+    def winning_percentage(self) -> float:
+        """Percentage of positive returns."""
+        if self.n_values < 2:
+            return 0.0
+        if self.n_returns == 0:
+            return np.nan
+        return self.n_wins / self.n_returns * 100
+        
+    def average_win(self) -> float:
+        """Average positive return."""
+        return self.win_sum / self.n_wins if self.n_wins else 0.0
+        
+    def average_loss(self) -> float:
+        """Average negative return."""
+        return self.loss_sum / self.n_losses if self.n_losses else 0.0
+        
+    def profit_factor(self) -> float:
+        """Profit factor, with the same definition as PerformanceMetrics."""
+        if self.n_values < 2:
+            return 0.0
+        avg_win = self.average_win()
+        avg_loss = abs(self.average_loss())
+        if avg_loss == 0:
+            return np.inf if avg_win > 0 else 0.0
+        win_pct = self.winning_percentage() / 100
+        loss_pct = 1 - win_pct
+        if loss_pct == 0:
+            return np.inf
+        return (avg_win * win_pct) / (avg_loss * loss_pct)
+        
+    def get_metrics(self) -> Dict[str, float]:
+        """Get the current value of every tracked metric."""
+        return {
+            'total_return': self.total_return(),
+            'annualized_return': self.annualized_return(),
+            'volatility': self.volatility(),
+            'sharpe_ratio': self.sharpe_ratio(),
+            'sortino_ratio': self.sortino_ratio(),
+            'max_drawdown': self.max_drawdown(),
+            'calmar_ratio': self.calmar_ratio(),
+            'winning_percentage': self.winning_percentage(),
+            'average_win': self.average_win(),
+            'average_loss': self.average_loss(),
+            'profit_factor': self.profit_factor()
+        }
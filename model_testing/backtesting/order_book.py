@@ -0,0 +1,322 @@
+"""
+Resting Order Book
+
+Holds limit, stop and stop-limit orders between bars and matches them against
+each new bar's OHLC range. Orders are kept per symbol in ladders sorted by
+trigger price, so the orders touched by a bar are always the ones at the top
+of a ladder. Matching a bar costs O(log n) per triggered order, and adding or
+cancelling an order O(log n) amortized, however many orders are resting.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import heapq
+import itertools
+import logging
+
+from .events import OrderEvent, OrderType, OrderDirection
+
+logger = logging.getLogger(__name__)
+
+# Called with (order, fill_price) before a fill is accepted
+FillFilter = Callable[[OrderEvent, float], bool]
+
+# Cancelled entries a ladder tolerates before it is compacted, however few orders are live
+_MIN_DEAD_ENTRIES = 32
+
+
+@dataclass
+class RestingOrder:
+    """An order waiting in the book."""
+    order_id: str
+    sequence: int
+    order: OrderEvent
+    level: float  # Trigger level in the ladder holding the order
+    is_stop: bool  # True while waiting for a stop trigger
+    ladder: Optional['_Ladder'] = field(default=None, repr=False, compare=False)  # Ladder holding the order
+
+
+class _Ladder:
+    """
+    Resting orders in a heap keyed by trigger level.
+
+    A ladder fires either when the bar trades down to a level (buy limits,
+    sell stops) or up to it (sell limits, buy stops). The heap is keyed so
+    that the order nearest to firing is always on top: adding an order and
+    popping each touched order cost O(log n).
+
+    Cancelled orders are detached from the ladder but left in the heap; the
+    heap is rebuilt once they outnumber the live orders, so dead entries
+    never make up more than about half of it.
+    """
+
+    def __init__(self, fires_below: bool):
+        self.fires_below = fires_below
+        self.heap: List[Tuple[float, int, RestingOrder]] = []
+        self.live = 0
+
+    def _key(self, level: float) -> float:
+        return -level if self.fires_below else level
+
+    def add(self, resting: RestingOrder) -> None:
+        """Insert an order (ties at a level fire in submission order)."""
+        heapq.heappush(self.heap, (self._key(resting.level), resting.sequence, resting))
+        resting.ladder = self
+        self.live += 1
+
+    def remove(self, resting: RestingOrder) -> None:
+        """Detach a cancelled order, compacting the heap when dead entries dominate."""
+        resting.ladder = None
+        self.live -= 1
+        if len(self.heap) - self.live > max(self.live, _MIN_DEAD_ENTRIES):
+            self.heap = [entry for entry in self.heap if entry[2].ladder is self]
+            heapq.heapify(self.heap)
+
+    def pop_touched(self, low: float, high: float) -> List[RestingOrder]:
+        """Remove and return the live orders whose level lies within the bar range."""
+        bound = self._key(low if self.fires_below else high)
+        touched = []
+        while self.heap and self.heap[0][0] <= bound:
+            resting = heapq.heappop(self.heap)[2]
+            if resting.ladder is self:
+                resting.ladder = None
+                self.live -= 1
+                touched.append(resting)
+        return touched
+
+    def orders(self) -> List[RestingOrder]:
+        """Live orders, in no particular order."""
+        return [entry[2] for entry in self.heap if entry[2].ladder is self]
+
+    def __len__(self) -> int:
+        return self.live
+
+
+class _SymbolBook:
+    """Limit and stop ladders for one symbol."""
+
+    def __init__(self):
+        self.buy_limits = _Ladder(fires_below=True)
+        self.sell_limits = _Ladder(fires_below=False)
+        self.buy_stops = _Ladder(fires_below=False)
+        self.sell_stops = _Ladder(fires_below=True)
+
+    def ladder_for(self, resting: RestingOrder) -> _Ladder:
+        """Get the ladder an order rests in."""
+        if resting.order.direction == OrderDirection.BUY:
+            return self.buy_stops if resting.is_stop else self.buy_limits
+        return self.sell_stops if resting.is_stop else self.sell_limits
+
+    def __len__(self) -> int:
+        return len(self.buy_limits) + len(self.sell_limits) + len(self.buy_stops) + len(self.sell_stops)
+
+
+class OrderBook:
+    """
+    Resting order book for limit, stop and stop-limit orders.
+
+    Fill rules for a bar with range [low, high]:
+        - Limit orders fill at the limit price, or at the open if the bar
+          gaps through the limit.
+        - Stop orders trigger at the stop price, or at the open on a gap,
+          and fill as market orders with slippage.
+        - Stop-limit orders fill at the trigger price if the limit is
+          marketable there; otherwise they rest as limit orders from the
+          next bar on.
+
+    Orders sharing `metadata['oco_group']` are one-cancels-other: once one
+    of them fills, the rest of the group is cancelled. When several orders of
+    a symbol trigger on the same bar, they are filled in order of distance of
+    their fill price from the open, i.e. the order in which the price path
+    would have reached them.
+
+    Cancelled orders leave the book's counts immediately; their heap entries
+    are discarded when touched or when the ladder is compacted.
+    """
+
+    def __init__(self, slippage: float = 0.0005):
+        """
+        Initialize the book.
+
+        Args:
+            slippage: Slippage applied to stop fills (as fraction of price)
+        """
+        self.slippage = slippage
+        self._books: Dict[str, _SymbolBook] = {}
+        self._active: Dict[str, RestingOrder] = {}
+        self._oco_groups: Dict[str, Set[str]] = {}
+        self._sequence = itertools.count()
+
+    def add(self, order: OrderEvent) -> str:
+        """
+        Add a limit, stop or stop-limit order to the book.
+
+        Args:
+            order: Order to rest
+
+        Returns:
+            Order id, usable with cancel()
+        """
+        if order.order_type == OrderType.MARKET:
+            raise ValueError("Market orders are executed immediately and cannot rest in the book")
+        if order.order_type in (OrderType.LIMIT, OrderType.STOP_LIMIT) and order.price is None:
+            raise ValueError(f"{order.order_type.value} order for {order.symbol} requires a limit price")
+        if order.order_type in (OrderType.STOP, OrderType.STOP_LIMIT) and order.stop_price is None:
+            raise ValueError(f"{order.order_type.value} order for {order.symbol} requires a stop price")
+
+        sequence = next(self._sequence)
+        order_id = str(sequence)
+        is_stop = order.order_type != OrderType.LIMIT
+        resting = RestingOrder(
+            order_id=order_id,
+            sequence=sequence,
+            order=order,
+            level=order.stop_price if is_stop else order.price,
+            is_stop=is_stop
+        )
+
+        book = self._books.get(order.symbol)
+        if book is None:
+            book = self._books[order.symbol] = _SymbolBook()
+        book.ladder_for(resting).add(resting)
+        self._active[order_id] = resting
+
+        oco_group = (order.metadata or {}).get('oco_group')
+        if oco_group is not None:
+            self._oco_groups.setdefault(oco_group, set()).add(order_id)
+
+        return order_id
+
+    def cancel(self, order_id: str) -> bool:
+        """
+        Cancel a resting order.
+
+        Args:
+            order_id: Id returned by add()
+
+        Returns:
+            True if the order was active
+        """
+        resting = self._active.pop(order_id, None)
+        if resting is None:
+            return False
+
+        if resting.ladder is not None:
+            resting.ladder.remove(resting)
+            book = self._books.get(resting.order.symbol)
+            if book is not None and not len(book):
+                del self._books[resting.order.symbol]
+
+        oco_group = (resting.order.metadata or {}).get('oco_group')
+        if oco_group is not None:
+            group = self._oco_groups.get(oco_group)
+            if group is not None:
+                group.discard(order_id)
+                if not group:
+                    del self._oco_groups[oco_group]
+        return True
+
+    def cancel_symbol(self, symbol: str) -> int:
+        """Cancel all resting orders for a symbol and return how many were cancelled."""
+        book = self._books.pop(symbol, None)
+        if book is None:
+            return 0
+
+        cancelled = 0
+        for ladder in (book.buy_limits, book.sell_limits, book.buy_stops, book.sell_stops):
+            for resting in ladder.orders():
+                cancelled += self.cancel(resting.order_id)
+        return cancelled
+
+    def symbols(self) -> List[str]:
+        """Get the symbols that have resting orders."""
+        return list(self._books.keys())
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[RestingOrder]:
+        """Get active resting orders, optionally for one symbol, in submission order."""
+        orders = [r for r in self._active.values() if symbol is None or r.order.symbol == symbol]
+        return sorted(orders, key=lambda r: r.sequence)
+
+    def match(self,
+              symbol: str,
+              open_price: float,
+              high_price: float,
+              low_price: float,
+              accept: Optional[FillFilter] = None) -> List[Tuple[RestingOrder, float]]:
+        """
+        Match one symbol's resting orders against a bar.
+
+        Args:
+            symbol: Symbol of the bar
+            open_price: Bar open
+            high_price: Bar high
+            low_price: Bar low
+            accept: Optional check called with (order, fill_price); rejected
+                orders are dropped from the book without cancelling their OCO group
+
+        Returns:
+            List of (resting order, fill price) in fill order
+        """
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+
+        candidates: List[Tuple[RestingOrder, float]] = []
+        converted: List[RestingOrder] = []
+
+        for resting in book.buy_limits.pop_touched(low_price, high_price):
+            candidates.append((resting, min(open_price, resting.level)))
+        for resting in book.sell_limits.pop_touched(low_price, high_price):
+            candidates.append((resting, max(open_price, resting.level)))
+
+        for resting in book.buy_stops.pop_touched(low_price, high_price) + book.sell_stops.pop_touched(low_price, high_price):
+            if resting.order_id not in self._active:
+                continue
+            is_buy = resting.order.direction == OrderDirection.BUY
+            trigger_price = max(open_price, resting.level) if is_buy else min(open_price, resting.level)
+
+            if resting.order.order_type == OrderType.STOP:
+                slipped = trigger_price * (1 + self.slippage) if is_buy else trigger_price * (1 - self.slippage)
+                candidates.append((resting, min(max(slipped, low_price), high_price)))
+                continue
+
+            limit_price = resting.order.price
+            if (is_buy and trigger_price <= limit_price) or (not is_buy and trigger_price >= limit_price):
+                candidates.append((resting, trigger_price))
+            else:
+                # Triggered but not marketable: becomes a plain limit order
+                resting.is_stop = False
+                resting.level = limit_price
+                converted.append(resting)
+
+        candidates.sort(key=lambda c: (abs(c[1] - open_price), c[0].sequence))
+
+        fills = []
+        for resting, fill_price in candidates:
+            if resting.order_id not in self._active:
+                continue
+            if accept is not None and not accept(resting.order, fill_price):
+                self.cancel(resting.order_id)
+                continue
+
+            oco_group = (resting.order.metadata or {}).get('oco_group')
+            siblings = self._oco_groups.get(oco_group, ()) if oco_group is not None else ()
+            for sibling_id in list(siblings):
+                self.cancel(sibling_id)
+            self.cancel(resting.order_id)
+            fills.append((resting, fill_price))
+
+        for resting in converted:
+            if resting.order_id in self._active:
+                book.ladder_for(resting).add(resting)
+
+        # Cancelling OCO siblings may already have removed the book
+        if len(book):
+            self._books[symbol] = book
+        else:
+            self._books.pop(symbol, None)
+
+        return fills
+
+    def __len__(self) -> int:
+        return len(self._active)
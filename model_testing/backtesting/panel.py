@@ -0,0 +1,180 @@
+"""
+Columnar Market Panel
+
+Pre-pivots long-format market data once into a contiguous
+(dates x symbols x fields) float64 (or, in compact mode, float32) array so
+the backtest loop can hand out zero-copy bar views instead of building
+per-row dictionaries.
+"""
+
+import pandas as pd
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from infrastructure.utils.compact import from_day_numbers
+
+logger = logging.getLogger(__name__)
+
+# Panel fields and the DataLoader columns they are read from
+FIELDS: Tuple[str, ...] = ('open', 'high', 'low', 'close', 'volume')
+SOURCE_COLUMNS: Dict[str, str] = {
+    'open': 'open_price',
+    'high': 'high_price',
+    'low': 'low_price',
+    'close': 'close_price',
+    'volume': 'volume'
+}
+
+
+class MarketPanel:
+    """
+    Dense OHLCV panel indexed by (date, symbol, field).
+
+    Missing bars are stored as NaN. Symbols and fields are mapped to array
+    columns through `symbol_index` and `field_index`.
+    """
+
+    def __init__(self, dates: pd.DatetimeIndex, symbols: List[str], values: np.ndarray):
+        """
+        Initialize the panel from pre-built arrays.
+
+        Args:
+            dates: Sorted trading dates (first axis)
+            symbols: Symbols (second axis)
+            values: Array with shape (len(dates), len(symbols), len(FIELDS)),
+                stored as float64 unless it is float32
+        """
+        expected_shape = (len(dates), len(symbols), len(FIELDS))
+        if values.shape != expected_shape:
+            raise ValueError(f"Panel values have shape {values.shape}, expected {expected_shape}")
+
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.values = np.ascontiguousarray(values, dtype=np.float32 if values.dtype == np.float32 else np.float64)
+        self.symbol_index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.field_index: Dict[str, int] = {field: i for i, field in enumerate(FIELDS)}
+
+    @classmethod
+    def from_frame(cls,
+                   market_data: pd.DataFrame,
+                   date_column: str = 'date',
+                   symbol_column: str = 'ticker',
+                   columns: Optional[Dict[str, str]] = None,
+                   dtype: type = np.float64) -> 'MarketPanel':
+        """
+        Pivot long-format market data into a panel in a single scatter.
+
+        Args:
+            market_data: DataFrame with one row per (date, symbol)
+            date_column: Name of the date column
+            symbol_column: Name of the symbol column
+            columns: Mapping of panel field -> source column (defaults to DataLoader names)
+            dtype: np.float64, or np.float32 to halve the panel size
+
+        Returns:
+            MarketPanel instance
+        """
+        columns = columns or SOURCE_COLUMNS
+
+        date_codes, dates = pd.factorize(market_data[date_column], sort=True)
+        symbol_codes, symbols = pd.factorize(market_data[symbol_column], sort=True)
+
+        values = np.full((len(dates), len(symbols), len(FIELDS)), np.nan, dtype=dtype)
+        values[date_codes, symbol_codes, :] = market_data[[columns[f] for f in FIELDS]].to_numpy(dtype=dtype)
+
+        # Compact frames store dates as int32 day numbers
+        dates = from_day_numbers(dates) if pd.api.types.is_integer_dtype(dates) else pd.DatetimeIndex(dates)
+
+        logger.debug(f"Built market panel: {len(dates)} dates x {len(symbols)} symbols")
+        return cls(dates, list(symbols), values)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """Panel shape as (dates, symbols, fields)."""
+        return self.values.shape
+
+    def bar(self, index: int) -> np.ndarray:
+        """Get a zero-copy (symbols x fields) view of one date."""
+        return self.values[index]
+
+    def field(self, name: str) -> np.ndarray:
+        """Get a (dates x symbols) view of one field."""
+        return self.values[:, :, self.field_index[name]]
+
+    def slice(self, start: int, stop: int) -> 'MarketPanel':
+        """
+        Get a zero-copy panel over a contiguous range of dates.
+
+        Args:
+            start: First bar index (inclusive)
+            stop: Last bar index (exclusive)
+
+        Returns:
+            MarketPanel viewing the same underlying array
+        """
+        return MarketPanel(self.dates[start:stop], self.symbols, self.values[start:stop])
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Convert back to long format in the transformer input layout.
+
+        Returns:
+            DataFrame with columns [symbol, date, open, high, low, close, volume],
+            sorted by symbol then date, without missing bars
+        """
+        date_idx, symbol_idx = np.nonzero(~np.isnan(self.values[:, :, self.field_index['close']]))
+        order = np.lexsort((date_idx, symbol_idx))
+        date_idx, symbol_idx = date_idx[order], symbol_idx[order]
+
+        frame = pd.DataFrame({
+            'symbol': np.asarray(self.symbols, dtype=object)[symbol_idx],
+            'date': self.dates[date_idx]
+        })
+        bars = self.values[date_idx, symbol_idx, :]
+        for i, field in enumerate(FIELDS):
+            frame[field] = bars[:, i]
+        return frame
+
+    def to_shared_memory(self) -> Tuple[SharedMemory, Dict[str, Any]]:
+        """
+        Copy the panel values into a new shared memory block.
+
+        The caller owns the block and must close() and unlink() it when done.
+
+        Returns:
+            Tuple of (shared memory block, picklable spec for from_shared_memory)
+        """
+        shm = SharedMemory(create=True, size=max(self.values.nbytes, 1))
+        shared_values = np.ndarray(self.values.shape, dtype=self.values.dtype, buffer=shm.buf)
+        shared_values[:] = self.values
+
+        spec = {
+            'name': shm.name,
+            'shape': self.values.shape,
+            'dtype': self.values.dtype.str,
+            'dates': self.dates,
+            'symbols': self.symbols
+        }
+        return shm, spec
+
+    @classmethod
+    def from_shared_memory(cls, spec: Dict[str, Any]) -> Tuple['MarketPanel', SharedMemory]:
+        """
+        Attach to a panel published with to_shared_memory without copying.
+
+        The returned block must stay referenced for as long as the panel is used.
+
+        Args:
+            spec: Spec returned by to_shared_memory
+
+        Returns:
+            Tuple of (panel viewing the shared block, shared memory handle)
+        """
+        shm = SharedMemory(name=spec['name'])
+        values = np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+        return cls(spec['dates'], spec['symbols'], values), shm
+
+    def __len__(self) -> int:
+        return len(self.dates)
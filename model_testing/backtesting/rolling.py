@@ -0,0 +1,315 @@
+"""
+Rolling-Window Performance Metrics
+
+Computes rolling volatility, Sharpe ratio, beta and drawdown for many equity
+curves and several window lengths at once. Window sums come from cumulative
+sums and window extremes from van Herk/Gil-Werman block scans, so every
+window length costs O(n) per curve regardless of its size; the scalar
+PerformanceMetrics methods are never re-run over slices.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Union
+import logging
+import warnings
+
+from sqlalchemy import text
+
+from .metrics import TRADING_DAYS_PER_YEAR
+
+logger = logging.getLogger(__name__)
+
+# Column order of the tidy output (names follow the model_performance table)
+ROLLING_COLUMNS = [
+    'model_id', 'evaluation_date', 'evaluation_period_days', 'total_return', 'avg_return',
+    'win_rate', 'volatility', 'sharpe_ratio', 'beta', 'max_drawdown', 'current_drawdown'
+]
+
+# One row per run, evaluation date and window; re-running a day replaces its rows
+MODEL_PERFORMANCE_UPSERT = f"""
+INSERT INTO model_performance (run_date, {', '.join(ROLLING_COLUMNS)})
+VALUES (:run_date, {', '.join(':' + column for column in ROLLING_COLUMNS)})
+ON CONFLICT (model_id, run_date, evaluation_date, evaluation_period_days)
+DO UPDATE SET
+    {', '.join(f'{column} = EXCLUDED.{column}' for column in ROLLING_COLUMNS[3:])},
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Sum over the trailing `window` rows of each column (NaN before the first full window)."""
+    cumulative = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=cumulative[1:])
+    sums = np.full(x.shape, np.nan)
+    sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+    return sums
+
+
+def _blocks(x: np.ndarray, size: int) -> np.ndarray:
+    """Pad rows with NaN to a multiple of `size` and reshape to (blocks, size, columns)."""
+    n_rows, n_cols = x.shape
+    n_blocks = -(-n_rows // size)
+    padded = np.full((n_blocks * size, n_cols), np.nan)
+    padded[:n_rows] = x
+    return padded.reshape(n_blocks, size, n_cols)
+
+
+def _block_scan(ufunc: np.ufunc, blocks: np.ndarray, reverse: bool = False) -> np.ndarray:
+    """Accumulate a ufunc within each block, forwards or backwards, returned as flat rows."""
+    if reverse:
+        scanned = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1]
+    else:
+        scanned = ufunc.accumulate(blocks, axis=1)
+    return scanned.reshape(-1, blocks.shape[2])
+
+
+def rolling_extreme_and_drawdown(values: np.ndarray, length: int) -> Dict[str, np.ndarray]:
+    """
+    Rolling maximum and maximum drawdown over windows of `length` values.
+
+    Uses the van Herk/Gil-Werman decomposition: with blocks of `length` rows,
+    every window is either one whole block or a suffix of one block followed
+    by a prefix of the next. Prefix and suffix scans of the block give the
+    window maximum in O(1) per window, and the same decomposition gives the
+    exact maximum drawdown: the larger of the suffix drawdown, the prefix
+    drawdown and the drop from the suffix peak to the prefix trough.
+
+    Args:
+        values: Array of positive values with shape (time, curves)
+        length: Number of values per window
+
+    Returns:
+        Dictionary with 'rolling_max' and 'max_drawdown' arrays of shape
+        (time, curves), NaN before the first full window
+    """
+    n_rows = values.shape[0]
+    result = {
+        'rolling_max': np.full(values.shape, np.nan),
+        'max_drawdown': np.full(values.shape, np.nan)
+    }
+    if n_rows < length:
+        return result
+
+    blocks = _blocks(values, length)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prefix_max = _block_scan(np.fmax, blocks)
+        prefix_min = _block_scan(np.fmin, blocks)
+        suffix_max = _block_scan(np.fmax, blocks, reverse=True)
+
+        # Drawdown of a prefix: deepest drop below its own running peak
+        flat = blocks.reshape(-1, blocks.shape[2])
+        prefix_drawdown = np.fmax(_block_scan(np.fmax, (1 - flat / prefix_max).reshape(blocks.shape)), 0.0)
+
+        # Drawdown of a suffix [s, block end]: best of starting the peak at s or later
+        suffix_min_after = np.full(blocks.shape, np.nan)
+        suffix_min_after[:, :-1] = _block_scan(np.fmin, blocks, reverse=True).reshape(blocks.shape)[:, 1:]
+        # Negative on rising values (or NaN for one value), where there is no drawdown
+        suffix_drawdown = np.fmax(_block_scan(np.fmax, 1 - suffix_min_after / blocks, reverse=True), 0.0)
+
+        ends = np.arange(length - 1, n_rows)
+        starts = ends - length + 1
+        aligned = (starts % length == 0)[:, None]
+
+        cross_drawdown = np.fmax(1 - prefix_min[ends] / suffix_max[starts], 0.0)
+        result['rolling_max'][ends] = np.where(aligned, suffix_max[starts], np.fmax(suffix_max[starts], prefix_max[ends]))
+        result['max_drawdown'][ends] = np.where(
+            aligned,
+            suffix_drawdown[starts],
+            np.fmax(np.fmax(suffix_drawdown[starts], prefix_drawdown[ends]), cross_drawdown)
+        )
+        # Windows without any value have no drawdown either
+        result['max_drawdown'][np.isnan(result['rolling_max'])] = np.nan
+
+    return result
+
+
+class RollingMetrics:
+    """
+    Rolling-window metrics for a set of equity curves.
+
+    For each window length (in bars) and each bar with a full window, reports
+    total return, average daily return, win rate, annualized volatility,
+    Sharpe ratio, beta against an optional benchmark, maximum drawdown inside
+    the window and the current drawdown from the window's peak.
+
+    Example:
+        rolling = RollingMetrics(equity, windows=[63, 126, 252], benchmark_returns=spy_returns)
+        performance = rolling.compute()
+    """
+
+    def __init__(self,
+                 equity_curves: Union[pd.DataFrame, pd.Series],
+                 windows: Sequence[int] = (63, 126, 252),
+                 benchmark_returns: Optional[pd.Series] = None,
+                 risk_free_rate: float = 0.02):
+        """
+        Initialize the calculator.
+
+        Args:
+            equity_curves: Portfolio values indexed by date, one column per model
+            windows: Window lengths in bars (number of returns per window)
+            benchmark_returns: Benchmark returns indexed by date, for beta
+            risk_free_rate: Annual risk-free rate for the Sharpe ratio
+        """
+        if isinstance(equity_curves, pd.Series):
+            equity_curves = equity_curves.to_frame()
+
+        self.dates = pd.DatetimeIndex(equity_curves.index)
+        self.model_ids = list(equity_curves.columns)
+        self.windows = [int(w) for w in windows]
+        self.risk_free_rate = risk_free_rate
+
+        if any(w < 2 for w in self.windows):
+            raise ValueError("Window lengths must be at least 2 bars")
+
+        # Values are padded forward and returns derived once, as pct_change() does
+        self.values = equity_curves.ffill().to_numpy(dtype=np.float64)
+        self.returns = np.full(self.values.shape, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.returns[1:] = self.values[1:] / self.values[:-1] - 1
+
+        self.benchmark = None
+        if benchmark_returns is not None:
+            self.benchmark = benchmark_returns.reindex(self.dates).to_numpy(dtype=np.float64)
+
+    def window_metrics(self, window: int) -> Dict[str, np.ndarray]:
+        """
+        Compute every rolling metric for one window length.
+
+        Args:
+            window: Number of returns per window
+
+        Returns:
+            Dictionary of metric name -> (time, curves) array, NaN where the
+            window is not yet full or contains missing returns
+        """
+        returns = self.returns
+        valid = ~np.isnan(returns)
+
+        with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+
+            # Centre returns on their column mean so window sums of squares stay accurate
+            center = np.nanmean(returns, axis=0)
+            centered = np.where(valid, returns - center, 0.0)
+
+            n = _window_sums(valid.astype(np.float64), window)
+            full = n == window
+            sums = _window_sums(centered, window)
+            squares = _window_sums(centered ** 2, window)
+            wins = _window_sums((valid & (returns > 0)).astype(np.float64), window)
+
+            avg_return = sums / n + center
+            variance = (squares - sums ** 2 / n) / (n - 1)
+            volatility = np.sqrt(np.maximum(variance, 0.0)) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+            total_return = np.full(self.values.shape, np.nan)
+            total_return[window:] = self.values[window:] / self.values[:-window] - 1
+            annualized_return = (1 + total_return) ** (TRADING_DAYS_PER_YEAR / window) - 1
+            sharpe_ratio = np.where(volatility == 0, 0.0, (annualized_return - self.risk_free_rate) / volatility)
+
+            beta = np.full(self.values.shape, np.nan)
+            if self.benchmark is not None:
+                both = valid & ~np.isnan(self.benchmark)[:, None]
+                bench = np.where(both, self.benchmark[:, None] - np.nanmean(self.benchmark), 0.0)
+                port = np.where(both, centered, 0.0)
+                n_joint = _window_sums(both.astype(np.float64), window)
+                sum_port = _window_sums(port, window)
+                sum_bench = _window_sums(bench, window)
+                covariance = _window_sums(port * bench, window) - sum_port * sum_bench / n_joint
+                bench_variance = _window_sums(bench ** 2, window) - sum_bench ** 2 / n_joint
+                beta = np.where(bench_variance > 0, covariance / bench_variance, 0.0)
+                beta[n_joint < 2] = np.nan
+
+            extremes = rolling_extreme_and_drawdown(self.values, window + 1)
+            current_drawdown = 1 - self.values / extremes['rolling_max']
+
+        metrics = {
+            'total_return': total_return,
+            'avg_return': avg_return,
+            'win_rate': wins / n,
+            'volatility': volatility,
+            'sharpe_ratio': sharpe_ratio,
+            'beta': beta,
+            'max_drawdown': extremes['max_drawdown'],
+            'current_drawdown': current_drawdown
+        }
+        for key in metrics:
+            metrics[key] = np.where(full, metrics[key], np.nan)
+
+        return metrics
+
+    def compute(self) -> pd.DataFrame:
+        """
+        Compute all window lengths as one tidy DataFrame.
+
+        Returns:
+            DataFrame with one row per (model_id, evaluation_period_days,
+            evaluation_date) that has a full window, columns as in ROLLING_COLUMNS
+        """
+        frames: List[pd.DataFrame] = []
+        n_dates, n_models = self.values.shape
+
+        for window in self.windows:
+            metrics = self.window_metrics(window)
+
+            # Flatten column-major so rows are grouped by model, then date
+            frame = pd.DataFrame({
+                'model_id': np.repeat(np.asarray(self.model_ids, dtype=object), n_dates),
+                'evaluation_date': np.tile(self.dates.to_numpy(), n_models),
+                'evaluation_period_days': window
+            })
+            for key, array in metrics.items():
+                frame[key] = array.ravel(order='F')
+
+            frames.append(frame[~np.isnan(metrics['total_return'].ravel(order='F'))])
+
+        if not frames:
+            return pd.DataFrame(columns=ROLLING_COLUMNS)
+
+        result = pd.concat(frames, ignore_index=True)[ROLLING_COLUMNS]
+        logger.debug(f"Computed rolling metrics: {len(result)} rows for {n_models} curves x {len(self.windows)} windows")
+        return result.sort_values(['model_id', 'evaluation_period_days', 'evaluation_date'], kind='stable').reset_index(drop=True)
+
+
+def model_performance_rows(performance: pd.DataFrame, run_date: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Convert RollingMetrics.compute() output to model_performance rows.
+
+    Args:
+        performance: Rolling metrics frame; model_id must hold models.id values
+        run_date: Run date of the rows (defaults to today)
+
+    Returns:
+        List of parameter dicts for MODEL_PERFORMANCE_UPSERT, with NaN as None
+    """
+    run_date = run_date or date.today()
+    frame = performance[ROLLING_COLUMNS].astype(object)
+    frame = frame.where(performance[ROLLING_COLUMNS].notna(), None)
+    frame['evaluation_date'] = pd.to_datetime(performance['evaluation_date']).dt.date
+    frame['model_id'] = performance['model_id'].astype(int)
+    frame['evaluation_period_days'] = performance['evaluation_period_days'].astype(int)
+    frame['run_date'] = run_date
+    return frame.to_dict('records')
+
+
+def write_model_performance(performance: pd.DataFrame, connection, run_date: Optional[date] = None) -> int:
+    """
+    Upsert rolling metrics into the model_performance table.
+
+    Args:
+        performance: RollingMetrics.compute() output
+        connection: SQLAlchemy connection (the caller commits)
+        run_date: Run date of the rows (defaults to today)
+
+    Returns:
+        Number of rows written
+    """
+    rows = model_performance_rows(performance, run_date)
+    if rows:
+        connection.execute(text(MODEL_PERFORMANCE_UPSERT), rows)
+    logger.info(f"Wrote {len(rows)} model_performance rows")
+    return len(rows)
@@ -0,0 +1,228 @@
+"""
+Parallel Parameter Sweeps
+
+Runs a strategy over a grid of parameter combinations on a process pool.
+The market panel is loaded once and published through shared memory, so
+workers attach to a single copy instead of each reloading from Postgres.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type, Union
+import logging
+
+import pandas as pd
+
+from models.strategies.base import BaseStrategy
+from infrastructure.utils import Config
+from .engine import BacktestEngine
+from .metrics import OnlineMetrics
+from .panel import MarketPanel
+
+logger = logging.getLogger(__name__)
+
+# Scalar result keys reported for every combination
+RESULT_KEYS = [
+    'total_return', 'annualized_return', 'sharpe_ratio', 'max_drawdown',
+    'volatility', 'calmar_ratio', 'final_value', 'total_trades', 'stopped_early'
+]
+
+# Per-process state populated by _init_worker
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(panel_spec: Dict[str, Any],
+                 strategy_class: Type[BaseStrategy],
+                 strategy_kwargs: Dict[str, Any],
+                 config: Config,
+                 features: Optional[pd.DataFrame] = None,
+                 early_stop: Optional[Callable[[OnlineMetrics], bool]] = None) -> None:
+    """Attach a pool worker to the shared market panel."""
+    panel, shm = MarketPanel.from_shared_memory(panel_spec)
+    _WORKER_STATE.update({
+        'panel': panel,
+        'shm': shm,
+        'strategy_class': strategy_class,
+        'strategy_kwargs': strategy_kwargs,
+        'config': config,
+        'features': features,
+        'early_stop': early_stop
+    })
+
+
+def _run_backtest(parameters: Dict[str, Any],
+                  panel: MarketPanel,
+                  strategy_class: Type[BaseStrategy],
+                  strategy_kwargs: Dict[str, Any],
+                  config: Config,
+                  features: Optional[pd.DataFrame] = None,
+                  early_stop: Optional[Callable[[OnlineMetrics], bool]] = None) -> Dict[str, Any]:
+    """Run one event-driven backtest and return its full results."""
+    strategy = strategy_class(parameters=dict(parameters), **strategy_kwargs)
+    if features is not None:
+        strategy.set_features(features)
+    engine = BacktestEngine(config)
+    return engine.run_panel(strategy, panel, early_stop=early_stop)
+
+
+def _run_combination(combination_id: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Pool task: backtest one parameter combination on the shared panel."""
+    row = {'combination_id': combination_id, **parameters}
+    try:
+        results = _run_backtest(
+            parameters,
+            _WORKER_STATE['panel'],
+            _WORKER_STATE['strategy_class'],
+            _WORKER_STATE['strategy_kwargs'],
+            _WORKER_STATE['config'],
+            _WORKER_STATE.get('features'),
+            _WORKER_STATE.get('early_stop')
+        )
+        row.update({key: results.get(key) for key in RESULT_KEYS})
+        row['error'] = None
+    except Exception as e:
+        logger.error(f"Sweep combination {combination_id} failed: {e}")
+        row['error'] = str(e)
+    return row
+
+
+class ParameterSweep:
+    """
+    Grid search over strategy parameters with shared-memory market data.
+
+    Example:
+        sweep = ParameterSweep(EnhancedMomentumStrategy, {
+            'short_ma_period': [5, 10, 15],
+            'long_ma_period': [20, 30, 50],
+        })
+        sweep.load_data(['AAPL', 'MSFT'], '2020-01-01', '2023-12-31')
+        results = sweep.run()
+    """
+
+    def __init__(self,
+                 strategy_class: Type[BaseStrategy],
+                 param_grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]],
+                 config: Optional[Config] = None,
+                 max_workers: Optional[int] = None,
+                 strategy_kwargs: Optional[Dict[str, Any]] = None,
+                 early_stop: Optional[Callable[[OnlineMetrics], bool]] = None):
+        """
+        Initialize the sweep.
+
+        Args:
+            strategy_class: Strategy class, constructed as strategy_class(parameters=..., **strategy_kwargs)
+            param_grid: Dict of parameter -> candidate values, or an explicit list of combinations
+            config: Platform configuration (defaults to Config())
+            max_workers: Pool size (defaults to performance.max_workers, then CPU count)
+            strategy_kwargs: Extra keyword arguments for the strategy constructor
+            early_stop: Optional picklable callable receiving the running OnlineMetrics
+                after every bar; returning True abandons that combination early
+        """
+        self.strategy_class = strategy_class
+        self.combinations = self.expand_grid(param_grid)
+        self.config = config or Config()
+        self.strategy_kwargs = strategy_kwargs or {}
+        self.early_stop = early_stop
+        self.max_workers = max_workers or self.config.custom.get('performance', {}).get('max_workers') or os.cpu_count()
+        self.panel: Optional[MarketPanel] = None
+        self.features: Optional[pd.DataFrame] = None
+
+    @staticmethod
+    def expand_grid(param_grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Expand a parameter grid into the list of combinations.
+
+        Args:
+            param_grid: Dict of parameter -> candidate values, or a list of combinations
+
+        Returns:
+            List of parameter dictionaries
+        """
+        if isinstance(param_grid, list):
+            return [dict(combination) for combination in param_grid]
+
+        keys = list(param_grid.keys())
+        return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[k] for k in keys))]
+
+    def load_data(self, symbols: List[str], start_date: str, end_date: str) -> None:
+        """
+        Load the market panel once for the whole sweep.
+
+        Args:
+            symbols: List of symbols to trade
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+        """
+        engine = BacktestEngine(self.config)
+        engine.load_data(symbols, start_date, end_date)
+        self.panel = engine.panel
+
+    def set_panel(self, panel: MarketPanel) -> None:
+        """Use an already loaded market panel."""
+        self.panel = panel
+
+    def set_features(self, features: pd.DataFrame) -> None:
+        """Set precomputed features passed to every strategy via set_features()."""
+        self.features = features
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """
+        Run the sweep, yielding one result row per combination as it completes.
+
+        Yields:
+            Dictionary of parameters plus scalar backtest results
+        """
+        if self.panel is None:
+            raise ValueError("No market data loaded. Call load_data() or set_panel() first")
+
+        logger.info(f"Starting parameter sweep: {len(self.combinations)} combinations "
+                    f"on {self.max_workers} workers")
+
+        if self.max_workers <= 1:
+            _WORKER_STATE.update({
+                'panel': self.panel,
+                'strategy_class': self.strategy_class,
+                'strategy_kwargs': self.strategy_kwargs,
+                'config': self.config,
+                'features': self.features,
+                'early_stop': self.early_stop
+            })
+            for combination_id, parameters in enumerate(self.combinations):
+                yield _run_combination(combination_id, parameters)
+            return
+
+        shm, spec = self.panel.to_shared_memory()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(spec, self.strategy_class, self.strategy_kwargs, self.config, self.features, self.early_stop)
+            ) as executor:
+                futures = [
+                    executor.submit(_run_combination, combination_id, parameters)
+                    for combination_id, parameters in enumerate(self.combinations)
+                ]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def run(self) -> pd.DataFrame:
+        """
+        Run the sweep and collect all results.
+
+        Returns:
+            DataFrame with one row per combination, ordered by combination_id
+        """
+        rows = list(self.iter_results())
+        results = pd.DataFrame(rows)
+        if results.empty:
+            return results
+
+        failed = results['error'].notna().sum()
+        if failed:
+            logger.warning(f"{failed} of {len(results)} sweep combinations failed")
+
+        return results.sort_values('combination_id').reset_index(drop=True)
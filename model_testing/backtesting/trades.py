@@ -0,0 +1,304 @@
+"""
+Trade Ledger
+
+Records fills into growable columnar arrays and pairs them into round-trip
+trades with FIFO lot matching per symbol. Matching is vectorized: fills are
+split into opening and closing quantities from the running position, and
+FIFO pairing reduces to intersecting the cumulative opened and closed
+quantity intervals, so no Python work is done per fill.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+import logging
+
+from .events import FillEvent, OrderDirection
+
+if TYPE_CHECKING:
+    from .panel import MarketPanel
+
+logger = logging.getLogger(__name__)
+
+# Matched quantities smaller than this are floating-point residue
+QUANTITY_TOLERANCE = 1e-9
+
+TRADE_COLUMNS = [
+    'symbol', 'direction', 'quantity', 'entry_time', 'exit_time', 'entry_price', 'exit_price',
+    'entry_bar', 'exit_bar', 'holding_bars', 'holding_period', 'pnl', 'return_pct', 'mae', 'mfe'
+]
+
+
+class TradeLedger:
+    """
+    Columnar fill ledger with FIFO round-trip matching.
+
+    Fills are appended into preallocated arrays that grow by doubling.
+    Round trips are one row per matched lot piece: an entry fill, the exit
+    fill that (partly) closed it, and the matched quantity. A fill that
+    reverses a position closes the old side and opens the new one.
+    """
+
+    def __init__(self, expected_fills: int = 1024):
+        """
+        Initialize the ledger.
+
+        Args:
+            expected_fills: Initial capacity of the fill arrays
+        """
+        self.symbols: List[str] = []
+        self.symbol_index: Dict[str, int] = {}
+        self._n_fills = 0
+        self._timestamps = np.empty(0, dtype='datetime64[ns]')
+        self._bars = np.empty(0, dtype=np.int64)
+        self._symbol_codes = np.empty(0, dtype=np.int32)
+        self._quantities = np.empty(0)  # Signed: positive buys, negative sells
+        self._prices = np.empty(0)
+        self._commissions = np.empty(0)
+        self._grow(expected_fills)
+
+    def _grow(self, capacity: int) -> None:
+        """Resize the fill arrays to a new capacity."""
+        n = self._n_fills
+        for name in ('_timestamps', '_bars', '_symbol_codes', '_quantities', '_prices', '_commissions'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
+    def record(self, fill: FillEvent, bar_index: int = -1) -> None:
+        """
+        Append a fill.
+
+        Args:
+            fill: Executed fill
+            bar_index: Index of the bar the fill happened on (for MAE/MFE)
+        """
+        n = self._n_fills
+        if n == len(self._quantities):
+            self._grow(max(2 * n, 1))
+
+        code = self.symbol_index.get(fill.symbol)
+        if code is None:
+            code = self.symbol_index[fill.symbol] = len(self.symbols)
+            self.symbols.append(fill.symbol)
+
+        self._timestamps[n] = pd.Timestamp(fill.timestamp).to_datetime64()
+        self._bars[n] = bar_index
+        self._symbol_codes[n] = code
+        self._quantities[n] = fill.quantity if fill.direction == OrderDirection.BUY else -fill.quantity
+        self._prices[n] = fill.fill_price
+        self._commissions[n] = fill.commission
+        self._n_fills = n + 1
+
+    def __len__(self) -> int:
+        return self._n_fills
+
+    def get_fills_df(self) -> pd.DataFrame:
+        """Get the recorded fills as a DataFrame."""
+        n = self._n_fills
+        return pd.DataFrame({
+            'timestamp': self._timestamps[:n],
+            'bar_index': self._bars[:n],
+            'symbol': np.asarray(self.symbols, dtype=object)[self._symbol_codes[:n]],
+            'quantity': self._quantities[:n],
+            'price': self._prices[:n],
+            'commission': self._commissions[:n]
+        })
+
+    def _match_side(self, fills: np.ndarray, opened: np.ndarray, closed: np.ndarray) -> np.ndarray:
+        """
+        FIFO-match one symbol side.
+
+        Args:
+            fills: Fill indices of the symbol, in time order
+            opened: Quantity each fill opens on this side
+            closed: Quantity each fill closes on this side
+
+        Returns:
+            Array of (entry fill, exit fill, quantity) rows
+        """
+        open_fills = fills[opened > 0]
+        close_fills = fills[closed > 0]
+        if len(open_fills) == 0 or len(close_fills) == 0:
+            return np.empty((0, 3))
+
+        open_ends = np.cumsum(opened[opened > 0])
+        close_ends = np.cumsum(closed[closed > 0])
+        matched = min(open_ends[-1], close_ends[-1])
+
+        # Every breakpoint of either cumulative sequence starts a new matched piece
+        breaks = np.unique(np.concatenate(([0.0], open_ends, close_ends)))
+        breaks = breaks[breaks <= matched + QUANTITY_TOLERANCE]
+        lengths = np.diff(breaks)
+        keep = lengths > QUANTITY_TOLERANCE
+        midpoints = (breaks[:-1] + lengths / 2)[keep]
+
+        entry = open_fills[np.searchsorted(open_ends, midpoints)]
+        exit_ = close_fills[np.searchsorted(close_ends, midpoints)]
+        return np.column_stack((entry, exit_, lengths[keep]))
+
+    def round_trips(self, panel: Optional['MarketPanel'] = None) -> pd.DataFrame:
+        """
+        Pair fills into round-trip trades.
+
+        Args:
+            panel: Market panel the fills' bar indices refer to; when given,
+                MAE and MFE are computed from the high/low range held over
+
+        Returns:
+            DataFrame with one row per matched lot, columns as in TRADE_COLUMNS.
+            pnl is net of the entry and exit commissions allocated pro rata by
+            quantity; mae/mfe are the worst/best excursions as returns on the
+            entry price.
+        """
+        n = self._n_fills
+        if n == 0:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+
+        quantities = self._quantities[:n]
+        codes = self._symbol_codes[:n]
+
+        # Running position per symbol, before and after each fill
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        position_after = np.cumsum(quantities[order])
+        group_start = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        group_offset = np.repeat(position_after[group_start] - quantities[order][group_start],
+                                 np.diff(np.r_[group_start, n]))
+        position_after -= group_offset
+        position_before = position_after - quantities[order]
+
+        # Split each fill into opening and closing parts per side
+        long_before, long_after = np.maximum(position_before, 0), np.maximum(position_after, 0)
+        short_before, short_after = np.maximum(-position_before, 0), np.maximum(-position_after, 0)
+        sides = {
+            1: (np.maximum(long_after - long_before, 0), np.maximum(long_before - long_after, 0)),
+            -1: (np.maximum(short_after - short_before, 0), np.maximum(short_before - short_after, 0))
+        }
+
+        pieces = []
+        bounds = np.r_[group_start, n]
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            for sign, (opened, closed) in sides.items():
+                matched = self._match_side(order[start:stop], opened[start:stop], closed[start:stop])
+                if len(matched):
+                    pieces.append(np.column_stack((matched, np.full(len(matched), sign))))
+
+        if not pieces:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+
+        matched = np.concatenate(pieces)
+        entry = matched[:, 0].astype(np.int64)
+        exit_ = matched[:, 1].astype(np.int64)
+        quantity = matched[:, 2]
+        sign = matched[:, 3]
+
+        # Sort trades by exit, then entry
+        trade_order = np.lexsort((entry, exit_))
+        entry, exit_, quantity, sign = entry[trade_order], exit_[trade_order], quantity[trade_order], sign[trade_order]
+
+        entry_price = self._prices[entry]
+        exit_price = self._prices[exit_]
+        commission = (self._commissions[entry] * quantity / np.abs(quantities[entry]) +
+                      self._commissions[exit_] * quantity / np.abs(quantities[exit_]))
+        entry_bar = self._bars[entry]
+        exit_bar = self._bars[exit_]
+        entry_time = self._timestamps[entry]
+        exit_time = self._timestamps[exit_]
+
+        trades = pd.DataFrame({
+            'symbol': np.asarray(self.symbols, dtype=object)[self._symbol_codes[entry]],
+            'direction': np.where(sign > 0, 'LONG', 'SHORT'),
+            'quantity': quantity,
+            'entry_time': entry_time,
+            'exit_time': exit_time,
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'entry_bar': entry_bar,
+            'exit_bar': exit_bar,
+            'holding_bars': exit_bar - entry_bar,
+            'holding_period': exit_time - entry_time,
+            'pnl': sign * quantity * (exit_price - entry_price) - commission,
+            'return_pct': sign * (exit_price / entry_price - 1),
+            'mae': np.nan,
+            'mfe': np.nan
+        })
+
+        if panel is not None and (entry_bar >= 0).all():
+            mae, mfe = self._excursions(panel, entry, entry_bar, exit_bar, entry_price, sign)
+            trades['mae'] = mae
+            trades['mfe'] = mfe
+
+        return trades
+
+    def _excursions(self,
+                    panel: 'MarketPanel',
+                    entry: np.ndarray,
+                    entry_bar: np.ndarray,
+                    exit_bar: np.ndarray,
+                    entry_price: np.ndarray,
+                    sign: np.ndarray) -> tuple:
+        """Maximum adverse and favorable excursion of each trade over its holding bars."""
+        n_bars = len(panel)
+        columns = np.array([panel.symbol_index.get(s, -1) for s in self.symbols])[self._symbol_codes[entry]]
+        if (columns < 0).any():
+            return np.full(len(entry), np.nan), np.full(len(entry), np.nan)
+
+        # Ranges [entry_bar, exit_bar] in the symbol-major flattened field arrays
+        starts = columns * n_bars + entry_bar
+        stops = columns * n_bars + exit_bar + 1
+        bounds = np.column_stack((starts, stops)).ravel()
+
+        lows = np.append(np.ascontiguousarray(panel.field('low').T).ravel(), np.nan)
+        highs = np.append(np.ascontiguousarray(panel.field('high').T).ravel(), np.nan)
+        with np.errstate(invalid='ignore'):
+            range_low = np.fmin.reduceat(lows, bounds)[::2]
+            range_high = np.fmax.reduceat(highs, bounds)[::2]
+
+        worst = np.where(sign > 0, range_low, range_high)
+        best = np.where(sign > 0, range_high, range_low)
+        mae = sign * (worst / entry_price - 1)
+        mfe = sign * (best / entry_price - 1)
+        return mae, mfe
+
+
+def trade_statistics(trades: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Summary statistics over round-trip trades.
+
+    Args:
+        trades: Output of TradeLedger.round_trips()
+
+    Returns:
+        Dictionary of trade-level statistics (win rate and profit factor per
+        trade, unlike the per-period PerformanceMetrics equivalents)
+    """
+    pnl = trades['pnl'].to_numpy(dtype=np.float64) if len(trades) else np.empty(0)
+    n_trades = len(pnl)
+    if n_trades == 0:
+        return {'total_trades': 0}
+
+    wins = pnl > 0
+    losses = pnl < 0
+    gross_profit = pnl[wins].sum()
+    gross_loss = -pnl[losses].sum()
+    returns = trades['return_pct'].to_numpy(dtype=np.float64)
+
+    return {
+        'total_trades': n_trades,
+        'long_trades': int((trades['direction'] == 'LONG').sum()),
+        'short_trades': int((trades['direction'] == 'SHORT').sum()),
+        'win_rate': wins.sum() / n_trades,
+        'average_win': pnl[wins].mean() if wins.any() else 0.0,
+        'average_loss': pnl[losses].mean() if losses.any() else 0.0,
+        'largest_win': pnl.max(),
+        'largest_loss': pnl.min(),
+        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else (np.inf if gross_profit > 0 else 0.0),
+        'expectancy': pnl.mean(),
+        'total_pnl': pnl.sum(),
+        'average_return': returns.mean(),
+        'average_holding_bars': trades['holding_bars'].to_numpy(dtype=np.float64).mean(),
+        'average_mae': np.nanmean(trades['mae'].to_numpy(dtype=np.float64)) if trades['mae'].notna().any() else np.nan,
+        'average_mfe': np.nanmean(trades['mfe'].to_numpy(dtype=np.float64)) if trades['mfe'].notna().any() else np.nan
+    }
@@ -0,0 +1,361 @@
+"""
+Walk-Forward Optimization
+
+Rolls in-sample/out-of-sample windows over a cached market panel, optimizes
+strategy parameters on each in-sample window, evaluates the winner
+out-of-sample and stitches the out-of-sample equity curves together.
+
+The panel is loaded once and shared with pool workers through shared memory.
+Features are computed once over the full history and handed to every fold, so
+overlapping windows reuse the same indicator values instead of recomputing them.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Type, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+from models.strategies.base import BaseStrategy
+from infrastructure.utils import Config
+from data_layer.transformers import BaseTransformer, FeatureStore
+from .engine import BacktestEngine
+from .metrics import PerformanceMetrics
+from .panel import MarketPanel
+from .sweep import ParameterSweep, RESULT_KEYS, _WORKER_STATE, _init_worker, _run_backtest
+
+logger = logging.getLogger(__name__)
+
+
+def _run_window(parameters: Dict[str, Any], start: int, stop: int) -> Dict[str, Any]:
+    """Backtest one parameter set on a window of the worker's panel."""
+    return _run_backtest(
+        parameters,
+        _WORKER_STATE['panel'].slice(start, stop),
+        _WORKER_STATE['strategy_class'],
+        _WORKER_STATE['strategy_kwargs'],
+        _WORKER_STATE['config'],
+        _WORKER_STATE.get('features')
+    )
+
+
+def _run_in_sample(fold_id: int, combination_id: int, parameters: Dict[str, Any],
+                   start: int, stop: int) -> Dict[str, Any]:
+    """Pool task: score one parameter combination on a fold's in-sample window."""
+    row = {'fold': fold_id, 'combination_id': combination_id, **parameters}
+    try:
+        results = _run_window(parameters, start, stop)
+        row.update({key: results.get(key) for key in RESULT_KEYS})
+        row['error'] = None
+    except Exception as e:
+        logger.error(f"Fold {fold_id} combination {combination_id} failed: {e}")
+        row['error'] = str(e)
+    return row
+
+
+def _run_out_of_sample(fold_id: int, parameters: Dict[str, Any], start: int, stop: int) -> Dict[str, Any]:
+    """Pool task: evaluate the selected parameters on a fold's out-of-sample window."""
+    results = _run_window(parameters, start, stop)
+    history = results['portfolio_history']
+    return {
+        'fold': fold_id,
+        'summary': {key: results.get(key) for key in RESULT_KEYS},
+        'timestamp': history['timestamp'].to_numpy(),
+        'total_value': history['total_value'].to_numpy(dtype=np.float64)
+    }
+
+
+class WalkForwardOptimizer:
+    """
+    Walk-forward parameter optimization on top of BacktestEngine.
+
+    Example:
+        optimizer = WalkForwardOptimizer(
+            EnhancedMomentumStrategy,
+            param_grid={'short_ma_period': [5, 10], 'long_ma_period': [20, 50]},
+            train_bars=504,
+            test_bars=126
+        )
+        optimizer.load_data(['AAPL', 'MSFT'], '2015-01-01', '2023-12-31')
+        optimizer.compute_features(TechnicalIndicators())
+        results = optimizer.run()
+    """
+
+    def __init__(self,
+                 strategy_class: Type[BaseStrategy],
+                 param_grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]],
+                 train_bars: int = 252,
+                 test_bars: int = 63,
+                 step_bars: Optional[int] = None,
+                 anchored: bool = False,
+                 optimization_metric: str = 'sharpe_ratio',
+                 maximize: bool = True,
+                 config: Optional[Config] = None,
+                 max_workers: Optional[int] = None,
+                 strategy_kwargs: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the optimizer.
+
+        Args:
+            strategy_class: Strategy class, constructed as strategy_class(parameters=..., **strategy_kwargs)
+            param_grid: Dict of parameter -> candidate values, or an explicit list of combinations
+            train_bars: In-sample window length in bars
+            test_bars: Out-of-sample window length in bars
+            step_bars: Bars between fold starts (defaults to test_bars; must be
+                at least test_bars so out-of-sample windows do not overlap)
+            anchored: If True, every in-sample window starts at the first bar
+            optimization_metric: Result key used to pick the in-sample winner
+            maximize: Whether higher values of the metric are better
+            config: Platform configuration (defaults to Config())
+            max_workers: Pool size (defaults to performance.max_workers, then CPU count)
+            strategy_kwargs: Extra keyword arguments for the strategy constructor
+        """
+        if train_bars <= 0 or test_bars <= 0:
+            raise ValueError("train_bars and test_bars must be positive")
+        if step_bars is not None and step_bars < test_bars:
+            # Overlapping out-of-sample windows would compound the same bars twice when stitched
+            raise ValueError(f"step_bars ({step_bars}) must be at least test_bars ({test_bars})")
+
+        self.strategy_class = strategy_class
+        self.combinations = ParameterSweep.expand_grid(param_grid)
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step_bars = step_bars or test_bars
+        self.anchored = anchored
+        self.optimization_metric = optimization_metric
+        self.maximize = maximize
+        self.config = config or Config()
+        self.strategy_kwargs = strategy_kwargs or {}
+        self.max_workers = max_workers or self.config.custom.get('performance', {}).get('max_workers') or os.cpu_count()
+
+        self.panel: Optional[MarketPanel] = None
+        self.features: Optional[pd.DataFrame] = None
+
+    def load_data(self, symbols: List[str], start_date: str, end_date: str) -> None:
+        """
+        Load the market panel once for all folds.
+
+        Args:
+            symbols: List of symbols to trade
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+        """
+        engine = BacktestEngine(self.config)
+        engine.load_data(symbols, start_date, end_date)
+        self.panel = engine.panel
+
+    def set_panel(self, panel: MarketPanel) -> None:
+        """Use an already loaded market panel."""
+        self.panel = panel
+
+    def set_features(self, features: pd.DataFrame) -> None:
+        """Set precomputed features passed to every strategy via set_features()."""
+        self.features = features
+
+    def compute_features(self,
+                         transformer: BaseTransformer,
+                         feature_store: Optional[FeatureStore] = None) -> pd.DataFrame:
+        """
+        Compute features once over the full panel history.
+
+        Indicators are causal, so values read at a given date are the same as
+        recomputing them per fold, and later folds start with warmed-up values.
+
+        Args:
+            transformer: Transformer applied to the panel in long format
+            feature_store: Cache to read features from; only partitions whose
+                input bars changed since the last run are recomputed
+
+        Returns:
+            Feature DataFrame shared by all folds
+        """
+        if self.panel is None:
+            raise ValueError("No market data loaded. Call load_data() or set_panel() first")
+
+        if feature_store is not None:
+            self.features = feature_store.get(transformer, self.panel.to_frame())
+        else:
+            self.features = transformer.transform_safe(self.panel.to_frame())
+        return self.features
+
+    def generate_folds(self) -> List[Dict[str, int]]:
+        """
+        Build the in-sample/out-of-sample windows as bar index ranges.
+
+        Returns:
+            List of dicts with fold, train_start, train_end, test_start, test_end
+            (end indices are exclusive)
+        """
+        if self.panel is None:
+            raise ValueError("No market data loaded. Call load_data() or set_panel() first")
+
+        n_bars = len(self.panel)
+        folds = []
+        offset = 0
+
+        while offset + self.train_bars < n_bars:
+            train_start = 0 if self.anchored else offset
+            train_end = offset + self.train_bars
+            folds.append({
+                'fold': len(folds),
+                'train_start': train_start,
+                'train_end': train_end,
+                'test_start': train_end,
+                'test_end': min(train_end + self.test_bars, n_bars)
+            })
+            offset += self.step_bars
+
+        return folds
+
+    def _select_best(self, fold_results: pd.DataFrame) -> Optional[int]:
+        """Pick the best combination_id from one fold's in-sample results."""
+        scores = pd.to_numeric(fold_results[self.optimization_metric], errors='coerce')
+        scores = scores.replace([np.inf, -np.inf], np.nan).dropna()
+        if scores.empty:
+            return None
+
+        best_row = scores.idxmax() if self.maximize else scores.idxmin()
+        return int(fold_results.loc[best_row, 'combination_id'])
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the walk-forward study.
+
+        Returns:
+            Dictionary with:
+                folds: one row per fold with windows, selected parameters and
+                    in-sample/out-of-sample scores
+                in_sample_results: every (fold, combination) in-sample result
+                equity_curve: stitched out-of-sample equity curve
+                metrics: performance metrics of the stitched curve
+        """
+        folds = self.generate_folds()
+        if not folds:
+            raise ValueError(f"Not enough data for a {self.train_bars}-bar training window")
+
+        logger.info(f"Starting walk-forward optimization: {len(folds)} folds x "
+                    f"{len(self.combinations)} combinations on {self.max_workers} workers")
+
+        if self.max_workers <= 1:
+            _WORKER_STATE.update({
+                'panel': self.panel,
+                'strategy_class': self.strategy_class,
+                'strategy_kwargs': self.strategy_kwargs,
+                'config': self.config,
+                'features': self.features
+            })
+            in_sample_rows = [
+                _run_in_sample(f['fold'], cid, params, f['train_start'], f['train_end'])
+                for f in folds for cid, params in enumerate(self.combinations)
+            ]
+            selected = self._select_all(folds, in_sample_rows)
+            out_of_sample = [
+                _run_out_of_sample(f['fold'], self.combinations[selected[f['fold']]],
+                                   f['test_start'], f['test_end'])
+                for f in folds if selected[f['fold']] is not None
+            ]
+        else:
+            shm, spec = self.panel.to_shared_memory()
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(spec, self.strategy_class, self.strategy_kwargs, self.config, self.features)
+                ) as executor:
+                    futures = [
+                        executor.submit(_run_in_sample, f['fold'], cid, params, f['train_start'], f['train_end'])
+                        for f in folds for cid, params in enumerate(self.combinations)
+                    ]
+                    in_sample_rows = [future.result() for future in as_completed(futures)]
+                    selected = self._select_all(folds, in_sample_rows)
+
+                    futures = [
+                        executor.submit(_run_out_of_sample, f['fold'], self.combinations[selected[f['fold']]],
+                                        f['test_start'], f['test_end'])
+                        for f in folds if selected[f['fold']] is not None
+                    ]
+                    out_of_sample = [future.result() for future in as_completed(futures)]
+            finally:
+                shm.close()
+                shm.unlink()
+
+        in_sample_results = pd.DataFrame(in_sample_rows).sort_values(['fold', 'combination_id'])
+        out_of_sample = sorted(out_of_sample, key=lambda r: r['fold'])
+
+        equity_curve = self._stitch(out_of_sample)
+
+        return {
+            'folds': self._fold_summary(folds, selected, in_sample_results, out_of_sample),
+            'in_sample_results': in_sample_results.reset_index(drop=True),
+            'equity_curve': equity_curve,
+            'metrics': PerformanceMetrics(equity_curve).get_all_metrics() if len(equity_curve) > 1 else {}
+        }
+
+    def _select_all(self, folds: List[Dict[str, int]],
+                    in_sample_rows: List[Dict[str, Any]]) -> Dict[int, Optional[int]]:
+        """Select the winning combination_id for every fold."""
+        results = pd.DataFrame(in_sample_rows)
+        selected = {}
+        for fold in folds:
+            fold_results = results[(results['fold'] == fold['fold']) & results['error'].isna()]
+            selected[fold['fold']] = self._select_best(fold_results) if not fold_results.empty else None
+            if selected[fold['fold']] is None:
+                logger.warning(f"Fold {fold['fold']}: no valid in-sample result, skipping out-of-sample run")
+        return selected
+
+    def _fold_summary(self, folds: List[Dict[str, int]],
+                      selected: Dict[int, Optional[int]],
+                      in_sample_results: pd.DataFrame,
+                      out_of_sample: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Build the per-fold summary table."""
+        oos_by_fold = {result['fold']: result['summary'] for result in out_of_sample}
+        dates = self.panel.dates
+        rows = []
+
+        for fold in folds:
+            fold_id = fold['fold']
+            combination_id = selected[fold_id]
+            row = {
+                'fold': fold_id,
+                'train_start': dates[fold['train_start']],
+                'train_end': dates[fold['train_end'] - 1],
+                'test_start': dates[fold['test_start']],
+                'test_end': dates[fold['test_end'] - 1],
+                'parameters': self.combinations[combination_id] if combination_id is not None else None
+            }
+            if combination_id is not None:
+                best = in_sample_results[(in_sample_results['fold'] == fold_id) &
+                                         (in_sample_results['combination_id'] == combination_id)]
+                row[f'in_sample_{self.optimization_metric}'] = best[self.optimization_metric].iloc[0]
+            for key, value in oos_by_fold.get(fold_id, {}).items():
+                row[f'out_of_sample_{key}'] = value
+            rows.append(row)
+
+        return pd.DataFrame(rows)
+
+    def _stitch(self, out_of_sample: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Chain out-of-sample equity curves, compounding each fold from the previous end value."""
+        timestamps, values, fold_ids = [], [], []
+        initial_capital = self.config.backtest.initial_capital
+        capital = initial_capital
+
+        for result in out_of_sample:
+            fold_values = result['total_value']
+            if len(fold_values) == 0:
+                continue
+            scaled = fold_values * (capital / initial_capital)
+            timestamps.append(result['timestamp'])
+            values.append(scaled)
+            fold_ids.append(np.full(len(scaled), result['fold']))
+            capital = scaled[-1]
+
+        if not values:
+            return pd.DataFrame(columns=['timestamp', 'total_value', 'fold'])
+
+        return pd.DataFrame({
+            'timestamp': np.concatenate(timestamps),
+            'total_value': np.concatenate(values),
+            'fold': np.concatenate(fold_ids)
+        })
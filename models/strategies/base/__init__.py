@@ -1,4 +1,9 @@
-from .base_strategy import BaseStrategy
-from .strategy_registry import StrategyRegistry
+from .base_strategy import BaseStrategy, Signal, SignalType, SignalBatch, Position, collect_required_features
 
-__all__ = ['BaseStrategy', 'StrategyRegistry']
\ No newline at end of file
+try:
+    from .strategy_registry import StrategyRegistry
+except ImportError:
+    # The registry module is not part of this tree yet
+    StrategyRegistry = None
+
+__all__ = ['BaseStrategy', 'Signal', 'SignalType', 'SignalBatch', 'Position', 'StrategyRegistry', 'collect_required_features']
\ No newline at end of file
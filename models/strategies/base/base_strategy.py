@@ -32,6 +32,18 @@ class Position:
     unrealized_pnl: float = 0.0
     metadata: Optional[Dict[str, Any]] = None
 
+@dataclass
+class SignalBatch:
+    """
+    Cross-sectional signals in columnar form.
+    
+    Arrays are aligned with the symbol columns passed to
+    generate_signals_batch; a signal_type of 0 means no signal.
+    """
+    signal_type: np.ndarray  # 1 for buy, -1 for sell, 0 for hold
+    strength: Optional[np.ndarray] = None
+    price: Optional[np.ndarray] = None
+
 class BaseStrategy(ABC):
     """
     Abstract base class for all trading strategies.
@@ -95,6 +107,31 @@ class BaseStrategy(ABC):
         """
         pass
         
+    def generate_signals_batch(self, current_time: pd.Timestamp,
+                               bar_arrays: Dict[str, np.ndarray],
+                               symbol_index: Dict[str, int]) -> Optional[SignalBatch]:
+        """
+        Generate signals for the whole cross-section at once (optional).
+        
+        Strategies that can evaluate the universe with array operations should
+        override this; the backtest engine then calls it once per bar instead of
+        calling generate_signals once per symbol.
+        
+        Args:
+            current_time: Current timestamp
+            bar_arrays: Dictionary of field (open, high, low, close, volume) ->
+                array of values for every symbol, NaN where a symbol has no bar
+            symbol_index: Dictionary of symbol -> position in the arrays
+            
+        Returns:
+            SignalBatch aligned with the arrays, or None for no signals
+        """
+        return None
+        
+    def supports_batch_signals(self) -> bool:
+        """Check whether this strategy overrides generate_signals_batch."""
+        return type(self).generate_signals_batch is not BaseStrategy.generate_signals_batch
+        
     def on_signal(self, signal: Signal) -> None:
         """
         Handle a generated signal.
@@ -231,4 +268,24 @@ class BaseStrategy(ABC):
         return f"{self.__class__.__name__}(name='{self.name}')"
         
     def __repr__(self) -> str:
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+
+def collect_required_features(strategies: List[BaseStrategy]) -> List[str]:
+    """
+    Union of the features required by a set of strategies.
+
+    Pass the result to TechnicalIndicators(features=...) or
+    TransformationPipeline(..., features=...) so only these are computed.
+
+    Args:
+        strategies: Strategy instances (e.g. all active models)
+
+    Returns:
+        Feature names in order of first appearance
+    """
+    features: Dict[str, None] = {}
+    for strategy in strategies:
+        for name in strategy.get_required_features():
+            features.setdefault(name, None)
+    return list(features)
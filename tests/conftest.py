@@ -0,0 +1,35 @@
+"""Shared fixtures for the test suite."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Make the top-level packages (data_layer, infrastructure, ...) importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_market_data(n_symbols: int = 3, n_bars: int = 300, seed: int = 0,
+                     start: str = '2021-06-01') -> pd.DataFrame:
+    """Random-walk OHLCV bars in long format, grouped by symbol and sorted by date."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+        frames.append(pd.DataFrame({
+            'symbol': f'SYM{i}',
+            'date': pd.bdate_range(start, periods=n_bars),
+            'open': close * (1 + rng.normal(0, 0.002, n_bars)),
+            'high': close * (1 + rng.uniform(0, 0.02, n_bars)),
+            'low': close * (1 - rng.uniform(0, 0.02, n_bars)),
+            'close': close,
+            'volume': rng.integers(100_000, 1_000_000, n_bars).astype(float)
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def market_data() -> pd.DataFrame:
+    return make_market_data()
@@ -0,0 +1,74 @@
+"""Compact (float32 / categorical / day-number) mode of the technical indicators."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_layer.transformers import TechnicalIndicators
+from infrastructure.utils.compact import (
+    FLOAT32_TOLERANCE, compact_frame, expand_frame, from_day_numbers, relative_errors, to_day_numbers
+)
+
+
+def test_day_numbers_round_trip():
+    dates = pd.Series(pd.to_datetime(['1970-01-01', '2024-02-29', None]))
+    days = to_day_numbers(dates)
+    assert days.dtype == np.int32
+    assert days[0] == 0
+    restored = from_day_numbers(days)
+    assert restored[1] == pd.Timestamp('2024-02-29')
+    assert pd.isna(restored[2])
+
+
+def test_compact_frame_round_trip(market_data):
+    compact = compact_frame(market_data)
+    assert compact['close'].dtype == np.float32
+    assert isinstance(compact['symbol'].dtype, pd.CategoricalDtype)
+    assert compact['date'].dtype == np.int32
+
+    expanded = expand_frame(compact)
+    assert (expanded['date'] == market_data['date']).all()
+    assert (expanded['symbol'] == market_data['symbol']).all()
+    assert max(relative_errors(market_data, expanded).values()) < FLOAT32_TOLERANCE
+
+
+def test_compact_indicators_within_tolerance(market_data):
+    reference = TechnicalIndicators().transform(market_data)
+    compact = TechnicalIndicators(compact=True).transform(market_data)
+
+    assert (compact.dtypes.iloc[2:] == np.float32).all()
+    assert (from_day_numbers(compact['date']) == pd.DatetimeIndex(reference['date'])).all()
+    errors = relative_errors(reference, compact)
+    assert errors and max(errors.values()) < FLOAT32_TOLERANCE
+
+
+def test_compact_stream_matches_transform(market_data):
+    transformer = TechnicalIndicators(compact=True)
+    full = transformer.transform(market_data)
+    chunks = (market_data.iloc[start:start + 100] for start in range(0, len(market_data), 100))
+    streamed = pd.concat(list(transformer.transform_stream(chunks)), ignore_index=True)
+
+    assert len(streamed) == len(full)
+    assert (streamed['date'].to_numpy() == full['date'].to_numpy()).all()
+    assert max(relative_errors(expand_frame(full), expand_frame(streamed)).values()) < FLOAT32_TOLERANCE
+
+
+def test_compact_feature_store(market_data, tmp_path):
+    pytest.importorskip('pyarrow')
+    from data_layer.transformers import FeatureStore
+
+    transformer = TechnicalIndicators(compact=True)
+    store = FeatureStore(tmp_path)
+
+    first = store.get(transformer, market_data)
+    assert store.last_run['recomputed_partitions'] == store.last_run['partitions']
+    assert len(first) == len(market_data)
+
+    second = store.get(transformer, market_data)
+    assert store.last_run['recomputed_partitions'] == 0
+    assert len(second) == len(market_data)
+    assert isinstance(second['symbol'].dtype, pd.CategoricalDtype)
+    assert second['date'].dtype == np.int32
+
+    recent = store.get(transformer, market_data, start_date='2022-01-01')
+    assert from_day_numbers(recent['date']).min() >= pd.Timestamp('2022-01-01')
@@ -0,0 +1,78 @@
+"""IncrementalIndicators against a full TechnicalIndicators recompute."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_layer.transformers import IncrementalIndicators, TechnicalIndicators
+from data_layer.transformers.incremental import IndicatorState
+
+from conftest import make_market_data
+
+TOLERANCE = 1e-9
+
+
+@pytest.fixture
+def bars() -> pd.DataFrame:
+    data = make_market_data(n_symbols=4, n_bars=120, seed=7)
+    # Missing closes in the middle of one history, flat ranges in another
+    gap = data.index[data['symbol'] == 'SYM1'][60:63]
+    data.loc[gap, 'close'] = np.nan
+    flat = data['symbol'] == 'SYM2'
+    data.loc[flat, 'high'] = data.loc[flat, 'low'] = data.loc[flat, 'close']
+    # Staggered listings
+    return data[~((data['symbol'] == 'SYM3') & (data['date'] < data['date'].iloc[40]))].reset_index(drop=True)
+
+
+def _assert_matches(expected: pd.DataFrame, actual: pd.DataFrame) -> None:
+    expected = expected.sort_values(['symbol', 'date']).reset_index(drop=True)
+    actual = actual.sort_values(['symbol', 'date']).reset_index(drop=True)
+    assert (expected['date'].to_numpy() == actual['date'].to_numpy()).all()
+
+    columns = expected.columns[2:]
+    a = expected[columns].to_numpy(dtype=np.float64)
+    b = actual[columns].to_numpy(dtype=np.float64)
+    assert (np.isnan(a) == np.isnan(b)).all()
+    assert np.nanmax(np.abs(a - b) / np.maximum(1, np.abs(a))) < TOLERANCE
+
+
+def test_daily_json_round_trip_matches_full_recompute(bars):
+    full = TechnicalIndicators().transform(bars)
+
+    state = {}
+    outputs = []
+    for _, day in bars.groupby('date'):
+        indicators = IncrementalIndicators.from_state(json.loads(json.dumps(state)))
+        outputs.append(indicators.update(day))
+        state = indicators.get_state()
+
+    _assert_matches(full, pd.concat(outputs, ignore_index=True))
+
+
+def test_rerunning_a_day_is_skipped(bars):
+    first_days = bars[bars['date'] <= bars['date'].iloc[50]]
+    indicators = IncrementalIndicators()
+    indicators.update(first_days)
+    before = json.dumps(indicators.get_state())
+
+    assert indicators.update(first_days[first_days['date'] == first_days['date'].max()]).empty
+    assert json.dumps(indicators.get_state()) == before
+
+
+def test_bootstrap_then_append_matches_full_recompute(bars):
+    cutoff = bars['date'].iloc[80]
+    indicators = IncrementalIndicators()
+    history = indicators.update(bars[bars['date'] <= cutoff])
+    restored = IncrementalIndicators.from_state(indicators.get_state())
+    recent = restored.update(bars[bars['date'] > cutoff])
+
+    _assert_matches(TechnicalIndicators().transform(bars), pd.concat([history, recent], ignore_index=True))
+
+
+def test_unknown_state_version_is_rejected():
+    state = IndicatorState().to_dict()
+    state['version'] = -1
+    with pytest.raises(ValueError):
+        IndicatorState.from_dict(state)
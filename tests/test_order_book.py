@@ -0,0 +1,204 @@
+"""Resting order book matching, OCO brackets and cash-reserving fills."""
+
+import pandas as pd
+import pytest
+
+from model_testing.backtesting import engine as engine_module
+from model_testing.backtesting.engine import BacktestEngine, Portfolio
+from model_testing.backtesting.events import OrderDirection, OrderEvent, OrderType, SignalEvent
+from model_testing.backtesting.order_book import OrderBook
+
+TIMESTAMP = pd.Timestamp('2021-06-01')
+BUY, SELL = OrderDirection.BUY, OrderDirection.SELL
+
+
+def make_order(direction, order_type, price=None, stop_price=None, quantity=10.0, symbol='SYM0', metadata=None):
+    return OrderEvent(
+        timestamp=TIMESTAMP,
+        symbol=symbol,
+        order_type=order_type,
+        quantity=quantity,
+        direction=direction,
+        price=price,
+        stop_price=stop_price,
+        metadata=metadata
+    )
+
+
+def fill_prices(fills):
+    return [(resting.order_id, price) for resting, price in fills]
+
+
+@pytest.fixture
+def book() -> OrderBook:
+    return OrderBook(slippage=0.01)
+
+
+@pytest.fixture
+def engine(monkeypatch) -> BacktestEngine:
+    # Signal handling needs no data; skip the database connection
+    monkeypatch.setattr(engine_module, 'DataLoader', lambda *args, **kwargs: None)
+    return BacktestEngine()
+
+
+def test_limits_fill_when_touched(book):
+    buy = book.add(make_order(BUY, OrderType.LIMIT, price=99.0))
+    sell = book.add(make_order(SELL, OrderType.LIMIT, price=103.0))
+
+    assert book.match('SYM0', 100.0, 102.0, 99.5) == []
+    assert fill_prices(book.match('SYM0', 100.0, 102.0, 99.0)) == [(buy, 99.0)]
+    assert fill_prices(book.match('SYM0', 101.0, 103.0, 100.0)) == [(sell, 103.0)]
+    assert len(book) == 0
+
+
+def test_limits_fill_at_gapped_open(book):
+    buy = book.add(make_order(BUY, OrderType.LIMIT, price=99.0))
+    sell = book.add(make_order(SELL, OrderType.LIMIT, price=103.0))
+
+    assert fill_prices(book.match('SYM0', 97.0, 98.0, 96.0)) == [(buy, 97.0)]
+    assert fill_prices(book.match('SYM0', 105.0, 106.0, 104.0)) == [(sell, 105.0)]
+
+
+def test_stops_trigger_with_slippage_clipped_to_bar(book):
+    buy = book.add(make_order(BUY, OrderType.STOP, stop_price=102.0))
+    sell = book.add(make_order(SELL, OrderType.STOP, stop_price=98.0))
+
+    assert book.match('SYM0', 100.0, 101.0, 99.0) == []
+    assert fill_prices(book.match('SYM0', 100.0, 110.0, 99.0)) == [(buy, pytest.approx(102.0 * 1.01))]
+    # Slipped price 97.02 lies below the bar, so the fill is clipped to the low
+    assert fill_prices(book.match('SYM0', 99.0, 99.5, 97.5)) == [(sell, 97.5)]
+
+
+def test_stops_fill_from_gapped_open(book):
+    sell = book.add(make_order(SELL, OrderType.STOP, stop_price=98.0))
+
+    assert fill_prices(book.match('SYM0', 90.0, 91.0, 85.0)) == [(sell, pytest.approx(90.0 * 0.99))]
+
+
+def test_stop_limit_fills_at_trigger_when_marketable(book):
+    order_id = book.add(make_order(BUY, OrderType.STOP_LIMIT, price=103.0, stop_price=102.0))
+
+    assert fill_prices(book.match('SYM0', 100.0, 104.0, 99.0)) == [(order_id, 102.0)]
+
+
+def test_stop_limit_rests_as_limit_after_gap(book):
+    order_id = book.add(make_order(BUY, OrderType.STOP_LIMIT, price=103.0, stop_price=102.0))
+
+    # Gaps over the limit: triggered but not marketable
+    assert book.match('SYM0', 105.0, 106.0, 104.0) == []
+    resting, = book.open_orders('SYM0')
+    assert not resting.is_stop and resting.level == 103.0
+
+    assert fill_prices(book.match('SYM0', 104.0, 104.5, 102.5)) == [(order_id, 103.0)]
+
+
+def test_fills_in_order_of_distance_from_open(book):
+    far = book.add(make_order(BUY, OrderType.LIMIT, price=95.0))
+    near = book.add(make_order(BUY, OrderType.LIMIT, price=99.0))
+
+    assert fill_prices(book.match('SYM0', 100.0, 100.0, 94.0)) == [(near, 99.0), (far, 95.0)]
+
+
+def test_oco_bracket_cancels_other_leg(book):
+    metadata = {'oco_group': 'bracket-SYM0-1'}
+    stop = book.add(make_order(SELL, OrderType.STOP, stop_price=95.0, metadata=metadata))
+    target = book.add(make_order(SELL, OrderType.LIMIT, price=110.0, metadata=metadata))
+
+    assert fill_prices(book.match('SYM0', 100.0, 111.0, 99.0)) == [(target, 110.0)]
+    assert len(book) == 0
+    assert book.cancel(stop) is False
+    assert book.match('SYM0', 100.0, 100.0, 90.0) == []
+
+
+def test_oco_first_leg_reached_wins(book):
+    metadata = {'oco_group': 'bracket-SYM0-1'}
+    stop = book.add(make_order(SELL, OrderType.STOP, stop_price=99.0, metadata=metadata))
+    book.add(make_order(SELL, OrderType.LIMIT, price=110.0, metadata=metadata))
+
+    # Both legs are inside the bar; the stop is closer to the open
+    fills = book.match('SYM0', 100.0, 111.0, 98.0)
+    assert [resting.order_id for resting, _ in fills] == [stop]
+    assert len(book) == 0
+
+
+def test_reserving_check_rejects_unaffordable_second_fill(book):
+    portfolio = Portfolio(initial_capital=1500.0, commission=0.0)
+    first = book.add(make_order(BUY, OrderType.LIMIT, price=99.0, quantity=10.0))
+    book.add(make_order(BUY, OrderType.LIMIT, price=98.0, quantity=10.0))
+
+    fills = book.match('SYM0', 100.0, 100.0, 97.0, accept=portfolio.reserving_check())
+    assert fill_prices(fills) == [(first, 99.0)]
+    # Rejected fills are dropped from the book
+    assert len(book) == 0
+
+
+def test_reserving_check_limits_sells_to_position():
+    portfolio = Portfolio(initial_capital=0.0, commission=0.0)
+    portfolio.positions['SYM0'] = 15.0
+    accept = portfolio.reserving_check()
+
+    assert accept(make_order(SELL, OrderType.LIMIT, price=100.0, quantity=10.0), 100.0)
+    assert not accept(make_order(SELL, OrderType.LIMIT, price=100.0, quantity=10.0), 100.0)
+    assert accept(make_order(SELL, OrderType.LIMIT, price=100.0, quantity=5.0), 100.0)
+
+
+def test_cancel(book):
+    order_id = book.add(make_order(BUY, OrderType.LIMIT, price=99.0))
+    other = book.add(make_order(BUY, OrderType.LIMIT, price=98.0))
+
+    assert book.cancel(order_id) is True
+    assert book.cancel(order_id) is False
+    assert [resting.order_id for resting in book.open_orders()] == [other]
+    assert fill_prices(book.match('SYM0', 100.0, 100.0, 90.0)) == [(other, 98.0)]
+
+
+def test_cancel_symbol(book):
+    book.add(make_order(BUY, OrderType.LIMIT, price=99.0))
+    book.add(make_order(SELL, OrderType.STOP, stop_price=95.0))
+    kept = book.add(make_order(BUY, OrderType.LIMIT, price=99.0, symbol='SYM1'))
+
+    assert book.cancel_symbol('SYM0') == 2
+    assert book.cancel_symbol('SYM0') == 0
+    assert book.symbols() == ['SYM1']
+    assert book.match('SYM0', 100.0, 100.0, 90.0) == []
+    assert [resting.order_id for resting in book.open_orders()] == [kept]
+
+
+def test_market_orders_cannot_rest(book):
+    with pytest.raises(ValueError):
+        book.add(make_order(BUY, OrderType.MARKET))
+    with pytest.raises(ValueError):
+        book.add(make_order(BUY, OrderType.LIMIT))
+
+
+def test_repeated_entry_signals_replace_resting_entry(engine):
+    book = engine.execution_handler.order_book
+
+    for limit_price in (99.0, 98.0, 97.0):
+        engine._handle_signal_event(SignalEvent(
+            timestamp=TIMESTAMP,
+            symbol='SYM0',
+            signal_type=1,
+            price=100.0,
+            metadata={'order_type': 'LIMIT', 'limit_price': limit_price}
+        ))
+        engine._handle_order_event(engine.events.get())
+
+    resting, = book.open_orders('SYM0')
+    assert resting.order.price == 97.0
+
+
+def test_entry_signals_keep_bracket_exits(engine):
+    book = engine.execution_handler.order_book
+    book.add(make_order(SELL, OrderType.STOP, stop_price=95.0, metadata={'oco_group': 'bracket-SYM0-1'}))
+
+    engine._handle_signal_event(SignalEvent(
+        timestamp=TIMESTAMP,
+        symbol='SYM0',
+        signal_type=-1,
+        price=100.0,
+        metadata={'order_type': 'LIMIT', 'limit_price': 101.0}
+    ))
+    engine._handle_order_event(engine.events.get())
+
+    assert len(book.open_orders('SYM0')) == 2
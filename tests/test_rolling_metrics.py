@@ -0,0 +1,63 @@
+"""Rolling metrics against a pandas brute force over every window."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_testing.backtesting.metrics import TRADING_DAYS_PER_YEAR
+from model_testing.backtesting.rolling import RollingMetrics, rolling_extreme_and_drawdown
+
+N_BARS = 300
+
+
+def brute_max_drawdown(values: pd.Series, length: int) -> pd.Series:
+    return values.rolling(length).apply(lambda v: np.max(1 - v / np.maximum.accumulate(v)), raw=True)
+
+
+def equity_curves(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2021-06-01', periods=N_BARS)
+    return pd.DataFrame({
+        'random': 100 * np.cumprod(1 + rng.normal(0, 0.01, N_BARS)),
+        'rising': 100 * np.cumprod(1 + np.full(N_BARS, 0.002)),
+        'falling': 100 * np.cumprod(1 - np.full(N_BARS, 0.002)),
+        'flat': np.full(N_BARS, 100.0)
+    }, index=dates)
+
+
+@pytest.mark.parametrize('length', [1, 2, 5, 6, 7, 50, 64, 300])
+def test_rolling_extreme_and_drawdown(length):
+    curves = equity_curves()
+    result = rolling_extreme_and_drawdown(curves.to_numpy(), length)
+
+    for column, name in enumerate(curves.columns):
+        expected_max = curves[name].rolling(length).max()
+        expected_drawdown = brute_max_drawdown(curves[name], length)
+        np.testing.assert_allclose(result['rolling_max'][:, column], expected_max, rtol=1e-12, err_msg=name)
+        np.testing.assert_allclose(result['max_drawdown'][:, column], expected_drawdown, atol=1e-12, err_msg=name)
+
+
+def test_rising_prices_have_no_drawdown():
+    values = np.cumprod(1 + np.full(N_BARS, 0.002))[:, None]
+    drawdown = rolling_extreme_and_drawdown(values, 6)['max_drawdown']
+
+    assert np.all(drawdown[5:] == 0.0)
+
+
+@pytest.mark.parametrize('window', [5, 20, 59])
+def test_window_metrics_match_pandas(window):
+    curves = equity_curves(seed=1)
+    benchmark = pd.Series(np.random.default_rng(2).normal(0, 0.01, N_BARS), index=curves.index)
+    metrics = RollingMetrics(curves, windows=[window], benchmark_returns=benchmark).window_metrics(window)
+    returns = curves.pct_change()
+
+    for column, name in enumerate(curves.columns):
+        volatility = returns[name].rolling(window).std() * np.sqrt(TRADING_DAYS_PER_YEAR)
+        beta = returns[name].rolling(window).cov(benchmark) / benchmark.rolling(window).var()
+        max_drawdown = brute_max_drawdown(curves[name], window + 1)
+        current_drawdown = 1 - curves[name] / curves[name].rolling(window + 1).max()
+
+        np.testing.assert_allclose(metrics['volatility'][:, column], volatility, rtol=1e-6, atol=1e-10, err_msg=name)
+        np.testing.assert_allclose(metrics['max_drawdown'][:, column], max_drawdown, atol=1e-12, err_msg=name)
+        np.testing.assert_allclose(metrics['current_drawdown'][:, column], current_drawdown, atol=1e-12, err_msg=name)
+        np.testing.assert_allclose(metrics['beta'][:, column], beta, rtol=1e-6, atol=1e-8, err_msg=name)
@@ -0,0 +1,38 @@
+"""Backtests run directly on a panel, as sweep and walk-forward workers do."""
+
+import pytest
+
+from conftest import make_market_data
+from model_testing.backtesting import engine as engine_module
+from model_testing.backtesting.engine import BacktestEngine
+from model_testing.backtesting.panel import FIELDS, MarketPanel
+from models.strategies.base import BaseStrategy
+
+
+class RecordingStrategy(BaseStrategy):
+    """Records the data it was initialized with and never trades."""
+
+    def initialize(self) -> None:
+        self.initial_data = self.data
+
+    def generate_signals(self, current_time, current_data):
+        return []
+
+
+@pytest.fixture
+def engine(monkeypatch) -> BacktestEngine:
+    # Panels are built in memory; skip the database connection
+    monkeypatch.setattr(engine_module, 'DataLoader', lambda *args, **kwargs: None)
+    return BacktestEngine()
+
+
+def test_strategy_sees_panel_data_without_loaded_market_data(engine):
+    market_data = make_market_data(n_bars=50)
+    panel = MarketPanel.from_frame(market_data, symbol_column='symbol', columns={f: f for f in FIELDS})
+    strategy = RecordingStrategy('recording')
+
+    engine.run_panel(strategy, panel)
+
+    assert strategy.initial_data is not None
+    assert len(strategy.initial_data) == len(market_data)
+    assert strategy.initial_data['date'].max() == panel.dates[-1]
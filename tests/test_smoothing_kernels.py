@@ -0,0 +1,151 @@
+"""Smoothing kernels and Wilder-smoothed indicators against reference implementations."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_layer.transformers import TechnicalIndicators, kernels
+
+# Largest absolute deviation allowed on prices around 100
+TOLERANCE = 1e-9
+
+
+def _random_walks(n_bars: int = 400, n_symbols: int = 8, seed: int = 0) -> np.ndarray:
+    """Price paths with ragged starts and scattered missing bars."""
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, n_symbols)), axis=0))
+    prices[rng.random(prices.shape) < 0.02] = np.nan
+    starts = rng.integers(0, n_bars // 2, n_symbols)
+    prices[np.arange(n_bars)[:, None] < starts] = np.nan
+    return prices
+
+
+def _reference_wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing of one series bar by bar, skipping and carrying through missing bars."""
+    result = np.full(len(x), np.nan)
+    rows = np.flatnonzero(~np.isnan(x))
+    if len(rows) < period:
+        return result
+    smoothed = x[rows[:period]].mean()
+    result[rows[period - 1]] = smoothed
+    for row in rows[period:]:
+        smoothed += (x[row] - smoothed) / period
+        result[row] = smoothed
+    return pd.Series(result).where(np.arange(len(x)) < rows[period - 1], pd.Series(result).ffill()).to_numpy()
+
+
+def _reference_kama(x: np.ndarray, period: int = 10, fast: int = 2, slow: int = 30) -> np.ndarray:
+    """KAMA of one series bar by bar over its observed bars."""
+    fast_factor, slow_factor = 2.0 / (fast + 1), 2.0 / (slow + 1)
+    rows = np.flatnonzero(~np.isnan(x))
+    observed = x[rows]
+    smoothed = np.full(len(observed), np.nan)
+    if len(observed) > period:
+        smoothed[period - 1] = observed[period - 1]
+        for t in range(period, len(observed)):
+            volatility = np.abs(np.diff(observed[t - period:t + 1])).sum()
+            efficiency = abs(observed[t] - observed[t - period]) / volatility if volatility > 0 else 0.0
+            constant = (efficiency * (fast_factor - slow_factor) + slow_factor) ** 2
+            smoothed[t] = smoothed[t - 1] + constant * (observed[t] - smoothed[t - 1])
+    result = pd.Series(np.nan, index=range(len(x)))
+    result.iloc[rows] = smoothed
+    return result.ffill().where(np.arange(len(x)) >= rows[0]).to_numpy()
+
+
+def _assert_close(actual: np.ndarray, expected: np.ndarray) -> None:
+    assert actual.shape == expected.shape
+    assert (np.isnan(actual) == np.isnan(expected)).all()
+    assert np.nanmax(np.abs(actual - expected), initial=0.0) < TOLERANCE
+
+
+@pytest.fixture
+def prices() -> np.ndarray:
+    return _random_walks()
+
+
+def test_ema_matches_pandas(prices):
+    frame = pd.DataFrame(prices)
+    _assert_close(kernels.ema(prices, span=20), frame.ewm(span=20).mean().to_numpy())
+    _assert_close(kernels.ema(prices, alpha=0.3), frame.ewm(alpha=0.3).mean().to_numpy())
+    _assert_close(kernels.ema(prices, span=20, adjust=False),
+                  frame.ewm(span=20, adjust=False, ignore_na=True).mean().to_numpy())
+
+
+def test_ema_accepts_one_dimensional_input(prices):
+    series = prices[:, 0]
+    _assert_close(kernels.ema(series, span=10), pd.Series(series).ewm(span=10).mean().to_numpy())
+
+
+def test_dema_and_tema_match_pandas(prices):
+    first = pd.DataFrame(prices).ewm(span=15).mean()
+    second = first.ewm(span=15).mean()
+    third = second.ewm(span=15).mean()
+    _assert_close(kernels.dema(prices, 15), (2 * first - second).to_numpy())
+    _assert_close(kernels.tema(prices, 15), (3 * first - 3 * second + third).to_numpy())
+
+
+@pytest.mark.parametrize('period', [1, 5, 14])
+def test_wilder_matches_reference(prices, period):
+    expected = np.column_stack([_reference_wilder(prices[:, i], period) for i in range(prices.shape[1])])
+    _assert_close(kernels.wilder(prices, period), expected)
+
+
+def test_wilder_without_gaps_matches_seeded_recursion():
+    x = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, 200)))
+    seeded = np.r_[x[:14].mean(), x[14:]]
+    expected = np.r_[np.full(13, np.nan), pd.Series(seeded).ewm(alpha=1 / 14, adjust=False).mean()]
+    _assert_close(kernels.wilder(x, 14), expected)
+
+
+def test_kama_matches_reference(prices):
+    expected = np.column_stack([_reference_kama(prices[:, i]) for i in range(prices.shape[1])])
+    _assert_close(kernels.kama(prices, 10), expected)
+
+
+def test_invalid_parameters_are_rejected(prices):
+    with pytest.raises(ValueError):
+        kernels.ema(prices)
+    with pytest.raises(ValueError):
+        kernels.ema(prices, alpha=1.5)
+    with pytest.raises(ValueError):
+        kernels.wilder(prices, 0)
+
+
+def test_wilder_indicators_match_reference(market_data):
+    output = TechnicalIndicators(smoothing='wilder').transform(market_data)
+    period = 14
+
+    for symbol, bars in market_data.groupby('symbol', sort=False):
+        rows = output[output['symbol'] == symbol]
+        high, low, close = (bars[field].to_numpy() for field in ('high', 'low', 'close'))
+
+        change = np.diff(close, prepend=np.nan)
+        gain = np.where(np.isnan(change), np.nan, np.maximum(change, 0))
+        loss = np.where(np.isnan(change), np.nan, np.maximum(-change, 0))
+        rsi = 100 - 100 / (1 + _reference_wilder(gain, period) / _reference_wilder(loss, period))
+
+        previous_close = np.r_[np.nan, close[:-1]]
+        true_range = np.fmax(np.fmax(high - low, np.abs(high - previous_close)), np.abs(low - previous_close))
+        atr = _reference_wilder(true_range, period)
+
+        up_move = np.r_[np.nan, np.diff(high)]
+        down_move = np.r_[np.nan, -np.diff(low)]
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+        plus_di = 100 * _reference_wilder(plus_dm, period) / atr
+        minus_di = 100 * _reference_wilder(minus_dm, period) / atr
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = _reference_wilder(dx, period)
+
+        _assert_close(rows['rsi_14'].to_numpy(), rsi)
+        _assert_close(rows['atr_14'].to_numpy(), atr)
+        _assert_close(rows['adx_14'].to_numpy(), adx)
+
+
+def test_default_smoothing_is_unchanged(market_data):
+    default = TechnicalIndicators().transform(market_data)
+    explicit = TechnicalIndicators(smoothing='sma').transform(market_data)
+    pd.testing.assert_frame_equal(default, explicit)
+
+    with pytest.raises(ValueError):
+        TechnicalIndicators(smoothing='ema')
@@ -0,0 +1,58 @@
+"""Output validation, with and without the pandas block-manager fast path."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_layer.transformers import validation
+from data_layer.transformers.validation import validate_frame
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n_rows = 1000
+    data = pd.DataFrame({
+        'symbol': 'SYM0',
+        'date': pd.bdate_range('2020-01-01', periods=n_rows),
+        'close': rng.normal(100, 1, n_rows),
+        'sparse': np.where(rng.random(n_rows) < 0.8, np.nan, 1.0),
+        'volume': rng.integers(0, 1000, n_rows),
+        'ratio': np.float32(1.0),
+        'nullable': pd.array([1, None] * (n_rows // 2), dtype='Int64'),
+        'label': 'text'
+    })
+    data.loc[[3, 5], 'close'] = [np.inf, -np.inf]
+    data.loc[7, 'close'] = np.nan
+    return data
+
+
+def test_report_counts(frame):
+    report = validate_frame(frame, schema={'close': 'DECIMAL(12,4)', 'label': 'DECIMAL(8,4)'})
+
+    assert report.n_rows == len(frame)
+    assert report.null_ratio['close'] == pytest.approx(1 / len(frame))
+    assert report.null_ratio['volume'] == 0.0
+    assert report.null_ratio['nullable'] == pytest.approx(0.5)
+    assert report.inf_count == {'close': 2}
+    assert set(report.sparse_columns) == {'sparse'}
+    assert report.dtype_mismatches == {'label': 'object'}
+    assert not report.is_valid
+
+
+def test_public_api_fallback_matches_internal_path(frame, monkeypatch):
+    expected = validate_frame(frame)
+    monkeypatch.setattr(validation, '_internal_blocks', lambda data: None)
+    assert validate_frame(frame) == expected
+
+
+def test_sampled_validation(frame):
+    report = validate_frame(frame, sample_rows=100, seed=1)
+    assert report.n_sampled == 100
+    assert 0.5 < report.null_ratio['sparse'] < 1.0
+
+
+def test_empty_frame_is_invalid():
+    report = validate_frame(pd.DataFrame({'close': pd.Series([], dtype=float)}))
+    assert report.n_rows == 0
+    assert not report.is_valid
@@ -84,6 +84,17 @@ CREATE TABLE IF NOT EXISTS technical_indicators (
     UNIQUE(symbol, date)
 );
 
+-- Incremental indicator state (one row per symbol and feature set), so the
+-- nightly indicator job only needs yesterday's state plus the new bars
+CREATE TABLE IF NOT EXISTS indicator_state (
+    symbol VARCHAR(10) NOT NULL,
+    feature_set VARCHAR(50) NOT NULL,
+    as_of_date DATE NOT NULL,
+    state JSONB NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (symbol, feature_set)
+);
+
 -- UPDATED: Models Table with corrected column names
 CREATE TABLE IF NOT EXISTS models (
     id SERIAL PRIMARY KEY,
@@ -133,12 +144,23 @@ CREATE TABLE IF NOT EXISTS model_performance (
     profit_factor DECIMAL(8,4),
     prediction_accuracy DECIMAL(5,4),
     total_trades INTEGER,
-    evaluation_period_days INTEGER,
+    evaluation_period_days INTEGER NOT NULL,
+    beta DECIMAL(6,4),
+    current_drawdown DECIMAL(6,4),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(model_id, run_date)
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Rolling metrics store several evaluation dates and window lengths per run.
+-- Migrates databases created with the old UNIQUE(model_id, run_date) key.
+ALTER TABLE model_performance ADD COLUMN IF NOT EXISTS beta DECIMAL(6,4);
+ALTER TABLE model_performance ADD COLUMN IF NOT EXISTS current_drawdown DECIMAL(6,4);
+UPDATE model_performance SET evaluation_period_days = 30 WHERE evaluation_period_days IS NULL;
+ALTER TABLE model_performance ALTER COLUMN evaluation_period_days SET NOT NULL;
+ALTER TABLE model_performance DROP CONSTRAINT IF EXISTS model_performance_model_id_run_date_key;
+CREATE UNIQUE INDEX IF NOT EXISTS model_performance_evaluation_key
+    ON model_performance(model_id, run_date, evaluation_date, evaluation_period_days);
+
 -- Model Runs Table (for tracking individual model executions)
 CREATE TABLE IF NOT EXISTS model_runs (
     id SERIAL PRIMARY KEY,